@@ -0,0 +1,53 @@
+import json
+import logging
+
+import azure.functions as func
+from shared.batch_ingestion_handler import BatchIngestionHandler, get_blob_source
+
+logger = logging.getLogger("BatchHTTPTriggerInit")
+
+
+def main(req: func.HttpRequest) -> func.HttpResponse:
+    """HTTP Trigger function that ingests many blobs of the source container at once,
+    e.g. to backfill or replay days of events
+
+    Request body:
+        prefix (str): ingest the blobs whose name starts with the prefix
+        blobs (list[str]): or ingest these blobs
+        checkpoint (str): optional checkpoint name, a request with the same checkpoint resumes
+            with the blobs that were not ingested yet
+
+    Args:
+        req (func.HttpRequest): HTTP Request object.
+
+    Returns:
+        func.HttpResponse: 200 with the ingestion stats, 202 if blobs remain for the next request with
+            the same checkpoint, 400 for an invalid body
+    """
+
+    logger.info("Batch HTTP Trigger Function Starting")
+
+    try:
+        body = req.get_json()
+    except ValueError:
+        body = None
+    if not isinstance(body, dict) or not (body.get("prefix") or body.get("blobs")):
+        return func.HttpResponse("Request body needs a `prefix` or a `blobs` list", status_code=400)
+    blobs = body.get("blobs")
+    if blobs is not None and not (isinstance(blobs, list) and all(isinstance(name, str) for name in blobs)):
+        return func.HttpResponse("`blobs` must be a list of blob names", status_code=400)
+    if not blobs and not isinstance(body["prefix"], str):
+        return func.HttpResponse("`prefix` must be a string", status_code=400)
+
+    source = get_blob_source()
+    blob_names = blobs or source.list_blobs(prefix=body["prefix"])
+    checkpoint = source.get_checkpoint(body["checkpoint"]) if body.get("checkpoint") else None
+    stats = BatchIngestionHandler(source, blob_names, checkpoint=checkpoint).handle()
+
+    logger.info("Batch HTTP Trigger Function Completing")
+
+    return func.HttpResponse(
+        json.dumps(stats),
+        status_code=202 if stats["remaining"] else 200,
+        mimetype="application/json",
+    )
@@ -0,0 +1,97 @@
+"""Benchmark parse cost when one blob fans out to many transforms.
+
+Compares handing every transform the raw JSON string (each one parses and
+normalizes the blob again) with sharing one EventContext between them.
+
+    cd functions
+    python -m benchmarks.bench_fan_out --events 20000 --tables 1 2 4 8
+"""
+import argparse
+import json
+import os
+import time
+from typing import Union
+from unittest.mock import patch
+
+from transformations.event_context import EventContext
+from transformations.index import get_transformations
+from transformations.transform import Transform
+
+EVENT = {
+    "event_id": "12312343354546",
+    "event": {
+        "type": "playback_start",
+        "formatted_timestamp": 1660176375708,
+        "attributes": {"startup_duration_content_ms": 506},
+    },
+    "user_details": {"app_session_id": "5555555", "content_session_id": "98877666544321"},
+    "device": {"browser_name": "Windows Explorer", "os_name": "Windows"},
+    "geo_location": {"country": "United States", "city": "New York"},
+    "network": {"asn": "8333"},
+}
+
+
+def get_slow_start_transform(json_data: Union[str, EventContext]) -> Transform:
+    """Create the transform of the `slow_start` definition
+
+    Args:
+        json_data (Union[str, EventContext]): blob content or shared context
+
+    Returns:
+        Transform: slow start transform
+    """
+    slow_start_transform, = get_transformations(json_data)
+    return slow_start_transform
+
+
+def run_per_table(json_string: str, tables: int) -> float:
+    """Every transform parses the JSON string on its own
+
+    Args:
+        json_string (str): blob content
+        tables (int): number of transforms
+
+    Returns:
+        float: seconds
+    """
+    start = time.perf_counter()
+    for _ in range(tables):
+        get_slow_start_transform(json_string).get_dataframe()
+    return time.perf_counter() - start
+
+
+def run_shared(json_string: str, tables: int) -> float:
+    """The JSON string is parsed once and the context is shared
+
+    Args:
+        json_string (str): blob content
+        tables (int): number of transforms
+
+    Returns:
+        float: seconds
+    """
+    start = time.perf_counter()
+    context = EventContext.from_json_string(json_string)
+    for _ in range(tables):
+        get_slow_start_transform(context).get_dataframe()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=20000, help="events per blob")
+    parser.add_argument("--tables", type=int, nargs="+", default=[1, 2, 4, 8], help="transforms per blob")
+    args = parser.parse_args()
+
+    json_string = json.dumps([EVENT] * args.events)
+
+    print(f"{'tables':>6} {'per table (s)':>14} {'shared (s)':>11} {'speedup':>8}")
+    with patch.dict(os.environ, {"SLOW_START_TABLE": "slow_start"}):
+        for tables in args.tables:
+            per_table = run_per_table(json_string, tables)
+            shared = run_shared(json_string, tables)
+            print(f"{tables:>6} {per_table:>14.3f} {shared:>11.3f} {per_table / shared:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
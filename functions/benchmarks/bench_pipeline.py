@@ -0,0 +1,163 @@
+"""Benchmark every stage of the transform and ingestion pipeline on synthetic events.
+
+Stages: parse (JSON to events), normalize (all events to a flat DataFrame), filter
+(route the transform's event types and extract its columns), prepare_result,
+serialize (ingestion payload) and the full TransformHandler#handle_transform_request()
+path against a local fake Kusto ingest endpoint, for the whole blob and ingesting streamed batches. Peak memory of each stage is measured
+with tracemalloc in a separate run so it does not skew the timings.
+
+    cd functions
+    python -m benchmarks.bench_pipeline --events 100000 500000
+    python -m benchmarks.bench_pipeline --events 1000000 --mix playback_start=1,heartbeat=3 --width 8 --format parquet
+"""
+import argparse
+import gc
+import os
+import time
+import tracemalloc
+from typing import Callable, Tuple
+from unittest.mock import patch
+
+import azure.functions as func
+from azure.kusto.data.data_format import DataFormat
+from shared.kusto_service_client import KustoServiceClient
+from shared.transform_handler import TransformHandler
+from transformations.event_context import EventContext
+from transformations.index import get_transformations
+from transformations.transform import Transform
+
+from .fake_kusto import DB_NAME, FakeKustoServer, fake_kusto_ingestion
+from .synthetic_events import DEFAULT_EVENT_TYPE_MIX, dumps_events, parse_event_type_mix
+
+TABLE = "slow_start"
+
+
+def get_slow_start_transform(context: EventContext) -> Transform:
+    """Create the transform of the `slow_start` definition, SLOW_START_TABLE is set by `main`
+
+    Args:
+        context (EventContext): parsed events
+
+    Returns:
+        Transform: slow start transform
+    """
+    slow_start_transform, = get_transformations(context)
+    return slow_start_transform
+
+
+def measure(function: Callable[[], object], memory: bool) -> Tuple[object, float, float]:
+    """Time a stage and optionally measure its peak memory
+
+    Args:
+        function (Callable[[], object]): stage
+        memory (bool): run the stage a second time under tracemalloc
+
+    Returns:
+        Tuple[object, float, float]: stage result, seconds and peak MiB (0 if not measured)
+    """
+    gc.collect()
+    start = time.perf_counter()
+    result = function()
+    seconds = time.perf_counter() - start
+
+    peak = 0.0
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        function()
+        peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+
+    return result, seconds, peak
+
+
+def run(events: int, json_string: str, data_format: str, memory: bool) -> None:
+    """Run and print all stages for one blob
+
+    Args:
+        events (int): number of events in the blob
+        json_string (str): blob content
+        data_format (str): `csv` or `parquet`
+        memory (bool): measure peak memory
+    """
+    context_result, parse_seconds, parse_peak = measure(
+        lambda: EventContext.from_json_string(json_string), memory)
+
+    def normalize():
+        # a fresh context, the result of `get_normalized_df` is cached per context
+        return EventContext(context_result.events).get_normalized_df()
+
+    def filter_events():
+        return get_slow_start_transform(EventContext(context_result.events)).create_mapped_df()
+
+    _, normalize_seconds, normalize_peak = measure(normalize, memory)
+    mapped_df, filter_seconds, filter_peak = measure(filter_events, memory)
+    transform = get_slow_start_transform(context_result)
+    result_df, prepare_seconds, prepare_peak = measure(lambda: transform.prepare_result(mapped_df), memory)
+
+    with FakeKustoServer() as server, fake_kusto_ingestion(server), \
+            patch("shared.transform_handler.PARQUET_INGESTION_TABLES", [TABLE] if data_format == "parquet" else []):
+        client = KustoServiceClient(
+            cluster_uri=server.uri,
+            client_id="",
+            db_name=DB_NAME,
+            table_name=TABLE,
+            data_format=DataFormat.PARQUET if data_format == "parquet" else DataFormat.CSV,
+            column_types=transform.column_types,
+        )
+        (payload, _), serialize_seconds, serialize_peak = measure(
+            lambda: client.serialize_data_frame(result_df), memory)
+
+        blob = json_string.encode("utf-8")
+
+        def handle():
+            blob_input = func.blob.InputStream(data=blob, name="benchmark.json")
+            TransformHandler(blob_input).handle_transform_request()
+
+        _, handle_seconds, handle_peak = measure(handle, memory)
+        with patch("shared.transform_handler.STREAM_BLOB_INPUT", True), \
+                patch("shared.transform_handler.STREAM_INGEST_BATCHES", True):
+            _, batches_seconds, batches_peak = measure(handle, memory)
+        stats = server.get_stats()
+
+    stages = [
+        ("parse", parse_seconds, parse_peak),
+        ("normalize", normalize_seconds, normalize_peak),
+        ("filter", filter_seconds, filter_peak),
+        ("prepare_result", prepare_seconds, prepare_peak),
+        ("serialize", serialize_seconds, serialize_peak),
+        ("handle_transform_request", handle_seconds, handle_peak),
+        ("handle_streamed_batches", batches_seconds, batches_peak),
+    ]
+    print(f"\n{events} events, {len(blob) / 2 ** 20:.1f} MiB blob, {len(result_df.index)} rows to {TABLE}, "
+          f"{payload.getbuffer().nbytes / 2 ** 20:.2f} MiB {data_format} payload, "
+          f"{stats['requests']} ingest requests")
+    print(f"{'stage':<26} {'seconds':>9} {'events/s':>12} {'peak MiB':>9}")
+    for stage, seconds, peak in stages:
+        peak_text = f"{peak:>9.1f}" if memory else f"{'-':>9}"
+        print(f"{stage:<26} {seconds:>9.3f} {events / seconds:>12,.0f} {peak_text}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, nargs="+", default=[10000, 100000], help="events per blob")
+    parser.add_argument(
+        "--mix",
+        type=parse_event_type_mix,
+        default=DEFAULT_EVENT_TYPE_MIX,
+        help="event type weights, e.g. playback_start=1,heartbeat=3",
+    )
+    parser.add_argument("--width", type=int, default=0, help="extra keys per nested object")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv", help="ingestion data format")
+    parser.add_argument("--seed", type=int, default=0, help="random seed of the generator")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak memory runs")
+    args = parser.parse_args()
+
+    with patch.dict(os.environ, {"SLOW_START_TABLE": TABLE}):
+        for events in args.events:
+            json_string = dumps_events(events, args.mix, args.width, args.seed)
+            run(events, json_string, args.format, not args.no_memory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Local stand-in for the Kusto streaming ingest endpoint.
+
+Accepts `POST /v1/rest/ingest/{database}/{table}` requests and only counts them, so the
+full TransformHandler#handle_transform_request() path, including the HTTP upload, runs offline.
+
+    with FakeKustoServer() as server, fake_kusto_ingestion(server):
+        TransformHandler(blob_input).handle_transform_request()
+    print(server.get_stats())
+"""
+import json
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, Union
+from unittest.mock import patch
+
+from azure.kusto.data import KustoConnectionStringBuilder
+from shared.kusto_client_pool import kusto_client_pool
+
+DB_NAME = "benchmark"
+
+# V1 response of a successful streaming ingestion
+INGEST_RESPONSE = json.dumps({
+    "Tables": [{
+        "TableName": "Table_0",
+        "Columns": [{"ColumnName": "ConsumedRecordsCount", "DataType": "Int64", "ColumnType": "long"}],
+        "Rows": [[0]],
+    }]
+}).encode("utf-8")
+
+
+class FakeKustoServer:
+    """Threaded HTTP server recording the ingest requests it receives"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        """Constructor
+
+        Args:
+            host (str): interface to listen on
+            port (int): port, 0 picks a free port
+        """
+        self.requests = 0
+        self.bytes_received = 0
+        self.requests_by_table: Dict[str, int] = {}
+        self.__lock = threading.Lock()
+        self.__server = ThreadingHTTPServer((host, port), self.__get_request_handler())
+        self.__thread = threading.Thread(target=self.__server.serve_forever, daemon=True)
+
+    @property
+    def uri(self) -> str:
+        """Cluster URI of the server"""
+        host, port = self.__server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "FakeKustoServer":
+        self.__thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.__server.shutdown()
+        self.__server.server_close()
+
+    def get_stats(self) -> dict:
+        """Get request counters
+
+        Returns:
+            dict: requests, bytes received and requests per table
+        """
+        with self.__lock:
+            return {
+                "requests": self.requests,
+                "bytes": self.bytes_received,
+                "tables": dict(self.requests_by_table),
+            }
+
+    def record(self, table: str, size: int) -> None:
+        """Count an ingest request
+
+        Args:
+            table (str): destination table
+            size (int): payload bytes
+        """
+        with self.__lock:
+            self.requests += 1
+            self.bytes_received += size
+            self.requests_by_table[table] = self.requests_by_table.get(table, 0) + 1
+
+    def __get_request_handler(self) -> type:
+        """Create the request handler class bound to this server
+
+        Returns:
+            type: BaseHTTPRequestHandler subclass
+        """
+        server = self
+
+        class IngestRequestHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                size = int(self.headers.get("Content-Length", 0))
+                self.rfile.read(size)
+                table = self.path.split("?")[0].rstrip("/").split("/")[-1]
+                server.record(table, size)
+
+                body = INGEST_RESPONSE
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return IngestRequestHandler
+
+
+@contextmanager
+def fake_kusto_ingestion(server: Union[FakeKustoServer, str]) -> Iterator[None]:
+    """Point the TransformHandler ingestion at a FakeKustoServer
+
+    Args:
+        server (Union[FakeKustoServer, str]): running server, or its URI when it runs in another process
+    """
+    uri = server if isinstance(server, str) else server.uri
+    kusto_client_pool.clear()
+    with patch("shared.transform_handler.CLUSTER_URI", uri), \
+            patch("shared.transform_handler.DB_NAME", DB_NAME), \
+            patch(
+                "shared.kusto_service_client.KustoConnectionStringBuilder"
+                ".with_aad_managed_service_identity_authentication",
+                lambda cluster_uri, client_id: KustoConnectionStringBuilder.with_aad_application_token_authentication(
+                    cluster_uri, "benchmark-token"
+                ),
+            ):
+        try:
+            yield
+        finally:
+            kusto_client_pool.clear()
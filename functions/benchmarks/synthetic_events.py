@@ -0,0 +1,136 @@
+"""Synthetic player events following the schema of samples/test_sample.json.
+
+    events = generate_events(100000, event_type_mix={"playback_start": 0.2, "playback_stall": 0.8})
+    write_events("events.json", 1000000)
+"""
+import json
+import random
+from typing import Dict, Iterator, Optional
+
+DEFAULT_EVENT_TYPE_MIX = {
+    "playback_start": 0.25,
+    "playback_stall": 0.25,
+    "bitrate_change": 0.25,
+    "heartbeat": 0.25,
+}
+
+BROWSERS = ["Windows Explorer", "Chrome", "Firefox", "Safari", "Edge"]
+OPERATING_SYSTEMS = ["Windows", "macOS", "Linux", "Android", "iOS"]
+LOCATIONS = [
+    ("United States", "New York"),
+    ("United States", "Seattle"),
+    ("United Kingdom", "London"),
+    ("Germany", "Berlin"),
+    ("Japan", "Tokyo"),
+]
+ASNS = ["8333", "7922", "3320", "2516", "15169"]
+
+FIRST_TIMESTAMP = 1660176375708
+
+
+def parse_event_type_mix(value: str) -> Dict[str, float]:
+    """Parse an event type mix argument
+
+    Args:
+        value (str): comma separated `type=weight` pairs, e.g. `playback_start=1,heartbeat=3`
+
+    Returns:
+        Dict[str, float]: {event_type: weight}
+    """
+    mix = {}
+    for pair in value.split(","):
+        event_type, _, weight = pair.partition("=")
+        mix[event_type.strip()] = float(weight or 1)
+    return mix
+
+
+def generate_events(
+    count: int,
+    event_type_mix: Optional[Dict[str, float]] = None,
+    nesting_width: int = 0,
+    seed: int = 0,
+) -> Iterator[dict]:
+    """Generate events lazily so millions of events can be written without holding them in memory
+
+    Args:
+        count (int): number of events
+        event_type_mix (Optional[Dict[str, float]]): relative weight of each event.type
+        nesting_width (int): extra keys added to every nested object, to widen the normalized DataFrame
+        seed (int): random seed, the same arguments always generate the same events
+
+    Returns:
+        Iterator[dict]: events
+    """
+    mix = event_type_mix or DEFAULT_EVENT_TYPE_MIX
+    event_types, weights = list(mix.keys()), list(mix.values())
+    rng = random.Random(seed)
+
+    for index in range(count):
+        event_type = rng.choices(event_types, weights)[0]
+        country, city = rng.choice(LOCATIONS)
+        event = {
+            "configuration_id": "98877666544321",
+            "event_id": str(12312343354546 + index),
+            "event": {
+                "type": event_type,
+                "formatted_timestamp": FIRST_TIMESTAMP + index * 10,
+                "attributes": {"startup_duration_content_ms": rng.randint(100, 5000)},
+            },
+            "user_details": {
+                "app_session_id": str(rng.randint(1000000, 9999999)),
+                "content_session_id": str(rng.randint(10 ** 13, 10 ** 14 - 1)),
+            },
+            "device": {"browser_name": rng.choice(BROWSERS), "os_name": rng.choice(OPERATING_SYSTEMS)},
+            "geo_location": {"country": country, "city": city},
+            "network": {"asn": rng.choice(ASNS)},
+        }
+        for key in range(nesting_width):
+            for nested in (event["event"]["attributes"], event["device"], event["network"]):
+                nested[f"extra_{key}"] = rng.random()
+
+        yield event
+
+
+def dumps_events(
+    count: int,
+    event_type_mix: Optional[Dict[str, float]] = None,
+    nesting_width: int = 0,
+    seed: int = 0,
+) -> str:
+    """Serialize generated events to a JSON array blob
+
+    Args:
+        count (int): number of events
+        event_type_mix (Optional[Dict[str, float]]): relative weight of each event.type
+        nesting_width (int): extra keys added to every nested object
+        seed (int): random seed
+
+    Returns:
+        str: JSON array
+    """
+    return json.dumps(list(generate_events(count, event_type_mix, nesting_width, seed)))
+
+
+def write_events(
+    path: str,
+    count: int,
+    event_type_mix: Optional[Dict[str, float]] = None,
+    nesting_width: int = 0,
+    seed: int = 0,
+) -> None:
+    """Write generated events to a JSON array file one event at a time
+
+    Args:
+        path (str): output file
+        count (int): number of events
+        event_type_mix (Optional[Dict[str, float]]): relative weight of each event.type
+        nesting_width (int): extra keys added to every nested object
+        seed (int): random seed
+    """
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("[")
+        for index, event in enumerate(generate_events(count, event_type_mix, nesting_width, seed)):
+            if index:
+                file.write(",\n")
+            file.write(json.dumps(event))
+        file.write("]")
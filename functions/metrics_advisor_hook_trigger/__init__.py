@@ -3,6 +3,8 @@ import os
 import azure.functions as func
 from shared.metrics_advisor_hook_handler import HookHandler
 
+logger = logging.getLogger("MetricsAdvisorHookInit")
+
 config = {
     "kusto_metrics_advisor_anomaly_alerts_table": os.getenv("KUSTO_METRICS_ADVISOR_ANOMALY_ALERTS_TABLE"),
     "kusto_cluster_uri": os.getenv("KUSTO_URI"),
@@ -14,7 +16,9 @@ config = {
     # The API key for your Metrics Advisor instance. You can find this in the web portal
     # for Metrics Advisor, in API keys on the left navigation menu.
     "metrics_advisor_api_key": os.getenv("METRICS_ADVISOR_API_KEY"),
-    "metrics_advisor_endpoint": os.getenv("METRICS_ADVISOR_ENDPOINT", "")
+    "metrics_advisor_endpoint": os.getenv("METRICS_ADVISOR_ENDPOINT", ""),
+    # Maximum number of concurrent Metrics Advisor API calls per alert burst
+    "metrics_advisor_max_concurrency": os.getenv("METRICS_ADVISOR_MAX_CONCURRENCY", "8")
 }
 
 
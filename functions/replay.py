@@ -0,0 +1,298 @@
+"""Replay local event files through the transform pipeline outside the Functions host.
+
+Files (.json, .ndjson, .jsonl) are read like blobs: a JSON array, a single event or concatenated (NDJSON)
+events, optionally gzip or zstd compressed, whatever their extension. Every file is transformed in one of
+`--workers` processes and its rows are written to a sink:
+
+    parquet / csv   one file per source file and table under --output, e.g. replay_output/<table>/,
+                    the events are read by the EventStreamReader of streamed blobs
+    fake-kusto      the file is handled as a blob by TransformHandler against a local fake Kusto endpoint,
+                    including its parsing, STREAM_BLOB_INPUT batches and ingestion
+    kusto           the same against KUSTO_URI / KUSTO_DATABASE
+
+Settings are read from the environment and from the `Values` of --settings (local.settings.json),
+tables that are not configured default to the tables of IaC/bicep/kustotablesetup.kql.
+
+    cd functions
+    python replay.py ../samples/test_sample.json
+    python replay.py /data/events --sink fake-kusto --workers 8
+    python replay.py "/data/events/2022-05-31/*.ndjson.gz" --sink csv --output /tmp/replay
+"""
+import argparse
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, nullcontext
+from typing import Dict, List, Optional, Tuple
+
+from utils.compression import COMPRESSED_EXTENSIONS
+
+SINKS = ["parquet", "csv", "fake-kusto", "kusto"]
+EVENT_FILE_EXTENSIONS = (".json", ".ndjson", ".jsonl")
+# tables of IaC/bicep/kustotablesetup.kql
+DEFAULT_TABLES = {
+    "SLOW_START_TABLE": "slow_start_anomaly_detection",
+}
+
+# sink of the worker process, set by `init_worker`
+worker_state: dict = {}
+
+
+def find_event_files(paths: List[str]) -> List[str]:
+    """Expand files, directories (recursively) and glob patterns to event files
+
+    Args:
+        paths (List[str]): command line paths
+
+    Returns:
+        List[str]: sorted event files
+    """
+    files = set()
+    for path in paths:
+        for match in glob.glob(path, recursive=True) or [path]:
+            if os.path.isdir(match):
+                for directory, _, names in os.walk(match):
+                    files.update(
+                        os.path.join(directory, name) for name in names if is_event_file(name)
+                    )
+            elif os.path.isfile(match):
+                files.add(match)
+    return sorted(files)
+
+
+def is_event_file(name: str) -> bool:
+    """Check if a file name has an event file extension
+
+    Args:
+        name (str): file name
+
+    Returns:
+        bool: True for JSON and NDJSON files, compressed or not
+    """
+    return strip_compressed_extension(name).endswith(EVENT_FILE_EXTENSIONS)
+
+
+def strip_compressed_extension(name: str) -> str:
+    """Remove the extension of a compressed file
+
+    Args:
+        name (str): file name
+
+    Returns:
+        str: file name without a `.gz` or `.zst` extension
+    """
+    for extension in COMPRESSED_EXTENSIONS:
+        if name.endswith(extension):
+            return name.removesuffix(extension)
+    return name
+
+
+def read_events(path: str) -> Tuple[list, int]:
+    """Read the events of a file like a streamed blob, gzip or zstd compressed or not
+
+    Args:
+        path (str): event file
+
+    Raises:
+        json.decoder.JSONDecodeError: the file is malformed
+
+    Returns:
+        Tuple[list, int]: events and file size in bytes
+    """
+    from shared.event_stream_reader import EventStreamReader
+
+    with open(path, "rb") as file:
+        reader = EventStreamReader(file)
+        events = [event for batch in reader.iter_batches() for event in batch]
+    return events, reader.bytes_read
+
+
+def load_settings(path: Optional[str]) -> Dict[str, str]:
+    """Get the environment of the replay
+
+    Args:
+        path (Optional[str]): local.settings.json of the function app, its `Values` are used
+            unless already set in the environment
+
+    Returns:
+        Dict[str, str]: settings to add to the environment
+    """
+    settings = dict(DEFAULT_TABLES)
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8") as file:
+            settings.update({key: str(value) for key, value in json.load(file).get("Values", {}).items() if value})
+
+    return {key: value for key, value in settings.items() if not os.environ.get(key)}
+
+
+def init_worker(settings: Dict[str, str], sink: str, output: str, kusto_uri: Optional[str]) -> None:
+    """Prepare a worker process, settings are read when the pipeline modules are first imported
+
+    Args:
+        settings (Dict[str, str]): settings added to the environment
+        sink (str): one of SINKS
+        output (str): output directory of the file sinks
+        kusto_uri (Optional[str]): URI of the fake Kusto server of the `fake-kusto` sink
+    """
+    os.environ.update(settings)
+    exit_stack = ExitStack()
+    if sink == "fake-kusto":
+        from benchmarks.fake_kusto import fake_kusto_ingestion
+
+        exit_stack.enter_context(fake_kusto_ingestion(kusto_uri))
+    worker_state.update(sink=sink, output=output, exit_stack=exit_stack)
+
+
+def replay_file(index: int, path: str) -> dict:
+    """Transform the events of a file and write them to the sink of the worker
+
+    Args:
+        index (int): position of the file, keeps the output file names unique
+        path (str): event file
+
+    Returns:
+        dict: path, bytes, events, rows by table and seconds
+    """
+    start = time.perf_counter()
+    if worker_state["sink"] in ("fake-kusto", "kusto"):
+        events, size, rows = ingest_file(path)
+    else:
+        events, size = read_events(path)
+        stem = f"{index:06d}_{os.path.basename(path).split('.')[0]}"
+        rows = write_events(events, stem, worker_state["sink"], worker_state["output"])
+        events = len(events)
+
+    return {
+        "path": path,
+        "bytes": size,
+        "events": events,
+        "rows": rows,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def ingest_file(path: str) -> Tuple[int, int, Dict[str, int]]:
+    """Handle a file as a blob with TransformHandler, which reads, transforms and ingests it
+    the way the blob trigger does, e.g. in batches with STREAM_BLOB_INPUT
+
+    Args:
+        path (str): event file, the blob name of the invocation
+
+    Returns:
+        Tuple[int, int, Dict[str, int]]: events, file size in bytes and rows by table
+    """
+    import azure.functions as func
+    from shared.transform_handler import TransformHandler
+
+    with open(path, "rb") as file:
+        data = file.read()
+    handler = TransformHandler(func.blob.InputStream(data=data, name=path, length=len(data)))
+    handler.handle_transform_request()
+    metrics = handler.metrics.to_dict()
+    rows = {table: values.get("rows_out", 0) for table, values in metrics["tables"].items()}
+    return metrics["counters"].get("events", 0), len(data), rows
+
+
+def write_events(events: list, stem: str, sink: str, output: str) -> Dict[str, int]:
+    """Transform the events and write the rows of every table to Parquet or CSV files
+
+    Args:
+        events (list): events of the file
+        stem (str): output file name without extension
+        sink (str): `parquet` or `csv`
+        output (str): output directory, one sub directory per table
+
+    Returns:
+        Dict[str, int]: rows by table
+    """
+    from shared.kusto_service_client import CSV_DATE_FORMAT
+    from transformations.event_context import EventContext
+    from transformations.index import get_transformations
+
+    rows = {}
+    for transform in get_transformations(json_data=EventContext(events)):
+        if not transform.table:
+            continue
+        frames = {transform.table: transform.get_dataframe()}
+        if transform.rollup_table and not frames[transform.table].empty:
+            frames[transform.rollup_table] = transform.get_rollup_dataframe(frames[transform.table])
+
+        for table, data_frame in frames.items():
+            rows[table] = len(data_frame.index)
+            if data_frame.empty:
+                continue
+            os.makedirs(os.path.join(output, table), exist_ok=True)
+            if sink == "parquet":
+                data_frame.to_parquet(os.path.join(output, table, f"{stem}.parquet"), index=False)
+            else:
+                data_frame.to_csv(
+                    os.path.join(output, table, f"{stem}.csv.gz"), index=False, date_format=CSV_DATE_FORMAT
+                )
+
+    return rows
+
+
+def print_summary(results: List[dict], seconds: float, kusto_stats: Optional[dict]) -> None:
+    """Print the totals and throughput of the replay
+
+    Args:
+        results (List[dict]): results of `replay_file`
+        seconds (float): wall clock seconds
+        kusto_stats (Optional[dict]): requests received by the fake Kusto server
+    """
+    events = sum(result["events"] for result in results)
+    size = sum(result["bytes"] for result in results)
+    rows: Dict[str, int] = {}
+    for result in results:
+        for table, table_rows in result["rows"].items():
+            rows[table] = rows.get(table, 0) + table_rows
+
+    print(f"{len(results)} files, {size / 2 ** 20:.1f} MiB, {events} events in {seconds:.2f} s")
+    print(f"{events / seconds:,.0f} events/s, {size / 2 ** 20 / seconds:.1f} MiB/s")
+    for table, table_rows in sorted(rows.items()):
+        print(f"{table:<40} {table_rows:>12,} rows")
+    if kusto_stats:
+        print(f"fake kusto: {kusto_stats['requests']} ingest requests, {kusto_stats['bytes'] / 2 ** 20:.2f} MiB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", help="event files, directories or glob patterns")
+    parser.add_argument("--sink", choices=SINKS, default="parquet", help="where the transformed rows go")
+    parser.add_argument("--output", default="replay_output", help="output directory of the parquet and csv sinks")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--settings", default="local.settings.json", help="function app settings file")
+    args = parser.parse_args()
+
+    files = find_event_files(args.paths)
+    if not files:
+        parser.error("no event files found")
+
+    settings = load_settings(args.settings)
+    # before the first import of utils.settings, forked workers inherit the imported modules
+    os.environ.update(settings)
+    if args.sink == "fake-kusto":
+        from benchmarks.fake_kusto import FakeKustoServer
+
+        server_context = FakeKustoServer()
+    else:
+        server_context = nullcontext()
+
+    start = time.perf_counter()
+    with server_context as server:
+        kusto_uri = server.uri if server else None
+        with ProcessPoolExecutor(
+            max_workers=max(1, min(args.workers, len(files))),
+            initializer=init_worker,
+            initargs=(settings, args.sink, args.output, kusto_uri),
+        ) as executor:
+            results = list(executor.map(replay_file, range(len(files)), files))
+        kusto_stats = server.get_stats() if server else None
+
+    print_summary(results, time.perf_counter() - start, kusto_stats)
+
+
+if __name__ == "__main__":
+    main()
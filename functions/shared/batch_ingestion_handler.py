@@ -0,0 +1,179 @@
+import logging
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+import azure.functions as func
+from utils.settings import (
+    BATCH_MAX_EVENTS,
+    BATCH_MAX_SECONDS,
+    BATCH_READ_CONCURRENCY,
+    BATCH_SOURCE_CONTAINER,
+    BATCH_SOURCE_PATH,
+    SOURCE_STORAGE,
+)
+
+from .blob_source import AzureBlobSource, BlobSource, Checkpoint, LocalBlobSource
+from .event_stream_reader import EventStreamReader
+from .transform_handler import TransformHandler
+
+logger = logging.getLogger("BatchIngestionHandler")
+
+
+class BatchIngestionHandler:
+    """Transform and ingest many blobs per invocation, e.g. to backfill or replay days of events.
+
+    Blobs are read concurrently, consecutive blobs are combined until they hold `max_events`
+    events, and each combined batch runs through TransformHandler once, so every table receives
+    a few large ingests instead of one per blob. The names of ingested blobs are saved to the
+    checkpoint after every batch, so a run that hit `max_seconds` or failed resumes with the
+    blobs it did not ingest yet.
+
+    ### Ingest a folder of a local copy of the source container
+    source = LocalBlobSource("/data/source")
+    names = source.list_blobs(prefix="2022/05/31/")
+    BatchIngestionHandler(source, names, checkpoint=source.get_checkpoint("2022-05-31")).handle()
+    """
+
+    def __init__(
+        self,
+        source: BlobSource,
+        blob_names: List[str],
+        checkpoint: Optional[Checkpoint] = None,
+        max_events: int = BATCH_MAX_EVENTS,
+        read_concurrency: int = BATCH_READ_CONCURRENCY,
+        max_seconds: float = BATCH_MAX_SECONDS,
+    ):
+        """Constructor
+
+        Args:
+            source (BlobSource): source of the blobs
+            blob_names (List[str]): blobs to ingest, in order
+            checkpoint (Optional[Checkpoint]): names of the already ingested blobs, None to ingest all blobs
+            max_events (int): events of consecutive blobs transformed and ingested together
+            read_concurrency (int): blobs read at a time
+            max_seconds (float): stop taking new blobs after this many seconds, 0 for no limit
+        """
+        self.source = source
+        self.blob_names = blob_names
+        self.checkpoint = checkpoint
+        self.max_events = max_events
+        self.read_concurrency = max(1, read_concurrency)
+        self.max_seconds = max_seconds
+        self.completed: Set[str] = set()
+        self.stats = {"blobs": len(blob_names), "skipped": 0, "ingested": 0, "remaining": 0, "events": 0, "batches": 0}
+
+    def handle(self) -> Dict[str, int]:
+        """Ingest the blobs that are not in the checkpoint
+
+        Raises:
+            Exception: reading or ingesting a batch failed, the blobs of earlier batches stay checkpointed
+
+        Returns:
+            Dict[str, int]: blobs, skipped (already checkpointed), ingested, remaining (left for the next run),
+                events and batches
+        """
+        self.completed = self.checkpoint.load() if self.checkpoint else set()
+        pending = [name for name in self.blob_names if name not in self.completed]
+        self.stats["skipped"] = len(self.blob_names) - len(pending)
+        deadline = time.monotonic() + self.max_seconds if self.max_seconds else None
+
+        names: List[str] = []
+        events: list = []
+        blob_bytes = 0
+        with ThreadPoolExecutor(max_workers=self.read_concurrency) as executor:
+            reads: Deque[Tuple[str, Future]] = deque()
+            next_names = iter(pending)
+            try:
+                self.__read_ahead(executor, reads, next_names)
+                while reads:
+                    if deadline is not None and time.monotonic() >= deadline:
+                        logger.info(f"Stopping after {self.max_seconds} seconds")
+                        break
+
+                    name, read = reads.popleft()
+                    blob_events, size = read.result()
+                    self.__read_ahead(executor, reads, next_names)
+                    names.append(name)
+                    events.extend(blob_events)
+                    blob_bytes += size
+                    if len(events) >= self.max_events:
+                        self.__ingest_batch(names, events, blob_bytes)
+                        names, events, blob_bytes = [], [], 0
+
+                if names:
+                    self.__ingest_batch(names, events, blob_bytes)
+            finally:
+                for _, read in reads:
+                    read.cancel()
+
+        self.stats["remaining"] = len(pending) - self.stats["ingested"]
+        logger.info(f"Batch Ingestion Completed: {self.stats}")
+        return self.stats
+
+    def __read_ahead(self, executor: ThreadPoolExecutor, reads: Deque[Tuple[str, Future]], next_names) -> None:
+        """Keep up to two reads per thread in flight, so memory is bounded by the read ahead, not the blob count
+
+        Args:
+            executor (ThreadPoolExecutor): reading threads
+            reads (Deque[Tuple[str, Future]]): reads in blob order
+            next_names (Iterator[str]): blobs not read yet
+        """
+        while len(reads) < 2 * self.read_concurrency:
+            name = next(next_names, None)
+            if name is None:
+                return
+            reads.append((name, executor.submit(self.__read_events, name)))
+
+    def __read_events(self, name: str) -> Tuple[list, int]:
+        """Read and parse a blob as it is decompressed, gzip or zstd compressed or not
+
+        Args:
+            name (str): blob name
+
+        Raises:
+            json.decoder.JSONDecodeError: the blob is malformed, its batch is neither ingested nor checkpointed
+
+        Returns:
+            Tuple[list, int]: events and blob size in bytes
+        """
+        with self.source.open_blob(name) as stream:
+            reader = EventStreamReader(stream)
+            events = [event for batch in reader.iter_batches() for event in batch]
+        return events, reader.bytes_read
+
+    def __ingest_batch(self, names: List[str], events: list, blob_bytes: int) -> None:
+        """Transform and ingest the combined events of consecutive blobs, then checkpoint the blobs
+
+        Args:
+            names (List[str]): blob names
+            events (list): events of all blobs
+            blob_bytes (int): size of all blobs
+        """
+        batch_name = names[0] if len(names) == 1 else f"{names[0]}..{names[-1]}"
+        blob_input = func.blob.InputStream(data=b"", name=batch_name, length=blob_bytes)
+        handler = TransformHandler(blob_input=blob_input, events=events)
+        handler.metrics.add("blobs", len(names))
+        handler.metrics.add("blob_bytes", blob_bytes)
+        handler.handle_transform_request()
+
+        self.completed.update(names)
+        if self.checkpoint:
+            self.checkpoint.save(self.completed)
+        self.stats["ingested"] += len(names)
+        self.stats["events"] += len(events)
+        self.stats["batches"] += 1
+        logger.info(f"Ingested {len(names)} blobs, {len(events)} events: {batch_name}")
+
+
+def get_blob_source() -> BlobSource:
+    """Get the source of the batch ingestion entry point
+
+    Returns:
+        BlobSource: `BATCH_SOURCE_PATH` if set, else `BATCH_SOURCE_CONTAINER` of the `source_STORAGE` account
+    """
+    if BATCH_SOURCE_PATH:
+        return LocalBlobSource(BATCH_SOURCE_PATH)
+
+    return AzureBlobSource(SOURCE_STORAGE, BATCH_SOURCE_CONTAINER)
@@ -0,0 +1,206 @@
+import json
+import logging
+import os
+from contextlib import nullcontext
+from typing import IO, ContextManager, List, Set
+
+""" Blob listing, reading and checkpointing of the batch ingestion entry point
+    ### Local directory, e.g. a copy of the source container
+    source = LocalBlobSource("/data/source")
+
+    ### Storage account or Azurite, e.g. "UseDevelopmentStorage=true"
+    source = AzureBlobSource(connection_string, container_name="source")
+
+    names = source.list_blobs(prefix="2022/05/31/")
+    with source.open_blob(names[0]) as stream:
+        chunk = stream.read(2 ** 20)
+"""
+
+logger = logging.getLogger("BlobSource")
+
+
+class Checkpoint:
+    """Names of the blobs a backfill already ingested"""
+
+    def load(self) -> Set[str]:
+        """Load the completed blob names
+
+        Returns:
+            Set[str]: completed blob names, empty if there is no checkpoint yet
+        """
+        raise NotImplementedError("Must Implement #load in Child Class")
+
+    def save(self, completed: Set[str]) -> None:
+        """Store the completed blob names
+
+        Args:
+            completed (Set[str]): completed blob names
+        """
+        raise NotImplementedError("Must Implement #save in Child Class")
+
+    @staticmethod
+    def dumps(completed: Set[str]) -> str:
+        """Serialize completed blob names
+
+        Args:
+            completed (Set[str]): completed blob names
+
+        Returns:
+            str: JSON object
+        """
+        return json.dumps({"completed": sorted(completed)})
+
+    @staticmethod
+    def loads(data: str) -> Set[str]:
+        """Deserialize completed blob names
+
+        Args:
+            data (str): result of #dumps
+
+        Returns:
+            Set[str]: completed blob names
+        """
+        return set(json.loads(data).get("completed", []))
+
+
+class FileCheckpoint(Checkpoint):
+    def __init__(self, path: str) -> None:
+        """Constructor
+
+        Args:
+            path (str): JSON file of the checkpoint
+        """
+        self.path = path
+
+    def load(self) -> Set[str]:
+        if not os.path.exists(self.path):
+            return set()
+        with open(self.path, encoding="utf-8") as file:
+            return self.loads(file.read())
+
+    def save(self, completed: Set[str]) -> None:
+        # replace the file atomically so an interrupted write keeps the previous checkpoint
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            file.write(self.dumps(completed))
+        os.replace(temporary_path, self.path)
+
+
+class BlobCheckpoint(Checkpoint):
+    def __init__(self, container_client, blob_name: str) -> None:
+        """Constructor
+
+        Args:
+            container_client (azure.storage.blob.ContainerClient): container of the checkpoint
+            blob_name (str): JSON blob of the checkpoint
+        """
+        self.container_client = container_client
+        self.blob_name = blob_name
+
+    def load(self) -> Set[str]:
+        from azure.core.exceptions import ResourceNotFoundError
+
+        try:
+            data = self.container_client.download_blob(self.blob_name).readall()
+        except ResourceNotFoundError:
+            return set()
+        return self.loads(data.decode("utf-8"))
+
+    def save(self, completed: Set[str]) -> None:
+        self.container_client.upload_blob(self.blob_name, self.dumps(completed).encode("utf-8"), overwrite=True)
+
+
+class BlobSource:
+    """Blobs read by the batch ingestion entry point"""
+
+    def list_blobs(self, prefix: str = "") -> List[str]:
+        """List blob names
+
+        Args:
+            prefix (str): name prefix, e.g. a date folder
+
+        Returns:
+            List[str]: sorted blob names
+        """
+        raise NotImplementedError("Must Implement #list_blobs in Child Class")
+
+    def open_blob(self, name: str) -> ContextManager[IO[bytes]]:
+        """Open a blob for reading, so it can be read chunk by chunk
+
+        Args:
+            name (str): blob name
+
+        Returns:
+            ContextManager[IO[bytes]]: readable binary stream of the blob content
+        """
+        raise NotImplementedError("Must Implement #open_blob in Child Class")
+
+    def get_checkpoint(self, name: str) -> Checkpoint:
+        """Get a checkpoint stored next to the blobs
+
+        Args:
+            name (str): checkpoint name
+
+        Returns:
+            Checkpoint: checkpoint
+        """
+        raise NotImplementedError("Must Implement #get_checkpoint in Child Class")
+
+
+class LocalBlobSource(BlobSource):
+    """Files of a local directory, named by their path relative to the directory"""
+
+    def __init__(self, root: str) -> None:
+        """Constructor
+
+        Args:
+            root (str): directory standing in for the source container
+        """
+        self.root = root
+
+    def list_blobs(self, prefix: str = "") -> List[str]:
+        names = []
+        for directory, _, files in os.walk(self.root):
+            for file in files:
+                name = os.path.relpath(os.path.join(directory, file), self.root).replace(os.sep, "/")
+                if name.startswith(prefix) and not name.startswith(".checkpoints/"):
+                    names.append(name)
+        return sorted(names)
+
+    def open_blob(self, name: str) -> ContextManager[IO[bytes]]:
+        return open(os.path.join(self.root, name), "rb")
+
+    def get_checkpoint(self, name: str) -> Checkpoint:
+        directory = os.path.join(self.root, ".checkpoints")
+        os.makedirs(directory, exist_ok=True)
+        return FileCheckpoint(os.path.join(directory, f"{name}.json"))
+
+
+class AzureBlobSource(BlobSource):
+    """Blobs of a storage account container, or of Azurite with `UseDevelopmentStorage=true`"""
+
+    def __init__(self, connection_string: str, container_name: str) -> None:
+        """Constructor
+
+        Args:
+            connection_string (str): storage account connection string
+            container_name (str): container of the blobs
+        """
+        from azure.storage.blob import ContainerClient
+
+        self.container_name = container_name
+        self.container_client = ContainerClient.from_connection_string(connection_string, container_name)
+
+    def list_blobs(self, prefix: str = "") -> List[str]:
+        return sorted(
+            blob.name
+            for blob in self.container_client.list_blobs(name_starts_with=prefix or None)
+            if not blob.name.startswith(".checkpoints/")
+        )
+
+    def open_blob(self, name: str) -> ContextManager[IO[bytes]]:
+        # the downloader fetches the blob in chunks as it is read
+        return nullcontext(self.container_client.download_blob(name))
+
+    def get_checkpoint(self, name: str) -> Checkpoint:
+        return BlobCheckpoint(self.container_client, f".checkpoints/{name}.json")
@@ -0,0 +1,342 @@
+import hashlib
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple, Union
+
+import numpy as np
+from utils.settings import DEDUP_BLOB_CAPACITY, DEDUP_CAPACITY, DEDUP_ERROR_RATE, DEDUP_WINDOW_SECONDS
+
+logger = logging.getLogger("EventDeduplicator")
+
+# destination tables that have not ingested the events yet, the events and their event ids
+EventPartition = Tuple[FrozenSet[str], list, List[str]]
+
+
+class BloomFilter:
+    """Fixed size set membership filter without false negatives.
+    A key that was added is always reported, a new key is reported with probability `error_rate`
+    as long as at most `capacity` keys were added.
+    """
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        """Constructor
+
+        Args:
+            capacity (int): number of keys the filter is sized for
+            error_rate (float): false positive rate at `capacity` keys
+        """
+        self.capacity = capacity
+        self.size = max(8, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self.__bits = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+
+    def add_many(self, keys: List[str]) -> None:
+        """Add keys
+
+        Args:
+            keys (List[str]): keys
+        """
+        if not keys:
+            return
+
+        positions = self.__get_positions(keys).ravel()
+        np.bitwise_or.at(self.__bits, positions >> 3, (1 << (positions & 7)).astype(np.uint8))
+        self.count += len(keys)
+
+    def contains_many(self, keys: List[str]) -> np.ndarray:
+        """Check which keys may have been added
+
+        Args:
+            keys (List[str]): keys
+
+        Returns:
+            np.ndarray: boolean array, True if the key was (probably) added
+        """
+        if not keys:
+            return np.zeros(0, dtype=bool)
+
+        positions = self.__get_positions(keys)
+        bits = (self.__bits[positions >> 3] >> (positions & 7).astype(np.uint8)) & 1
+        return bits.all(axis=1)
+
+    def __get_positions(self, keys: List[str]) -> np.ndarray:
+        # double hashing, the i-th position of a key is h1 + i * h2
+        digests = np.frombuffer(
+            b"".join(hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest() for key in keys), dtype=np.uint64
+        ).reshape(-1, 2)
+        rounds = np.arange(self.hash_count, dtype=np.uint64)
+        positions = digests[:, :1] + rounds * (digests[:, 1:] | np.uint64(1))
+        return (positions % np.uint64(self.size)).astype(np.int64)
+
+
+class RotatingBloomFilter:
+    """Two generations of Bloom filters, the older generation is dropped when the current one
+    is full or older than `window_seconds`. Memory stays bounded at two filters and keys are
+    remembered for at least one window, or `capacity` keys, whichever ends first.
+    """
+
+    def __init__(self, capacity: int, error_rate: float, window_seconds: float) -> None:
+        """Constructor
+
+        Args:
+            capacity (int): keys per generation
+            error_rate (float): false positive rate of each generation
+            window_seconds (float): seconds a generation stays current
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.window_seconds = window_seconds
+        self.rotations = 0
+        self.__current = BloomFilter(capacity, error_rate)
+        self.__previous: Optional[BloomFilter] = None
+        self.__started_at = time.monotonic()
+
+    def add_many(self, keys: List[str]) -> None:
+        """Add keys to the current generation
+
+        Args:
+            keys (List[str]): keys
+        """
+        self.__rotate_if_needed(len(keys))
+        self.__current.add_many(keys)
+
+    def contains_many(self, keys: List[str]) -> np.ndarray:
+        """Check which keys may have been added to either generation
+
+        Args:
+            keys (List[str]): keys
+
+        Returns:
+            np.ndarray: boolean array, True if the key was (probably) added
+        """
+        self.__rotate_if_needed(0)
+        seen = self.__current.contains_many(keys)
+        if self.__previous is not None:
+            seen |= self.__previous.contains_many(keys)
+        return seen
+
+    def __rotate_if_needed(self, new_keys: int) -> None:
+        expired = time.monotonic() - self.__started_at >= self.window_seconds
+        full = self.__current.count > 0 and self.__current.count + new_keys > self.capacity
+        if not expired and not full:
+            return
+
+        self.__previous = self.__current
+        self.__current = BloomFilter(self.capacity, self.error_rate)
+        self.__started_at = time.monotonic()
+        self.rotations += 1
+
+
+class RecentKeySet:
+    """Exact set of the most recent keys, a key is forgotten `window_seconds` after it was added
+    or when more than `capacity` newer keys were added. Unlike a Bloom filter a new key is never
+    reported, which matters for keys that skip a whole blob.
+    """
+
+    def __init__(self, capacity: int, window_seconds: float) -> None:
+        """Constructor
+
+        Args:
+            capacity (int): maximum number of keys, the oldest key is dropped first
+            window_seconds (float): seconds a key is remembered
+        """
+        self.capacity = max(1, capacity)
+        self.window_seconds = window_seconds
+        self.__added_at: "OrderedDict[str, float]" = OrderedDict()
+
+    def add(self, key: str) -> None:
+        """Add a key, or renew it if it is already in the set
+
+        Args:
+            key (str): key
+        """
+        self.__added_at[key] = time.monotonic()
+        self.__added_at.move_to_end(key)
+        while len(self.__added_at) > self.capacity:
+            self.__added_at.popitem(last=False)
+
+    def __contains__(self, key: str) -> bool:
+        self.__expire()
+        return key in self.__added_at
+
+    def __len__(self) -> int:
+        self.__expire()
+        return len(self.__added_at)
+
+    def __expire(self) -> None:
+        expired_before = time.monotonic() - self.window_seconds
+        while self.__added_at and next(iter(self.__added_at.values())) <= expired_before:
+            self.__added_at.popitem(last=False)
+
+
+class EventDeduplicator:
+    """Process wide filter of the `event_id` of the events ingested into each table and set of ingested blobs.
+
+    Blob triggers retry failed invocations and Event Grid delivers at least once, so the
+    same blob or event can reach the function again. Ids are committed per destination table
+    once the rows of that table, or of that batch of a streamed blob, are ingested. A retried
+    invocation only ingests its events into the tables that have not ingested them yet.
+
+    ### Group the events by the tables that still need them, ingest and commit the ids per table
+    partitions = event_deduplicator.partition_events(events, tables=["slow_start", "slow_start_rollup"])
+    ...
+    event_deduplicator.commit("slow_start", event_ids)
+    event_deduplicator.commit_blob("container/blob.json:1024")
+    """
+
+    def __init__(
+        self,
+        capacity: int = 1000000,
+        error_rate: float = 0.001,
+        window_seconds: float = 3600,
+        blob_capacity: int = 10000,
+    ) -> None:
+        """Constructor
+
+        Args:
+            capacity (int): (table, event id) pairs per filter generation
+            error_rate (float): probability that a new event is dropped as a duplicate
+            window_seconds (float): seconds a filter generation stays current and a blob identity is remembered
+            blob_capacity (int): blob identities remembered, exactly, so a new blob is never skipped
+        """
+        self.duplicate_events = 0
+        self.duplicate_blobs = 0
+        self.__events = RotatingBloomFilter(capacity, error_rate, window_seconds)
+        self.__blobs = RecentKeySet(blob_capacity, window_seconds)
+        self.__lock = threading.Lock()
+
+    def is_duplicate_blob(self, blob_identity: str) -> bool:
+        """Check if a blob was already ingested
+
+        Args:
+            blob_identity (str): blob name and length, see `get_blob_identity`
+
+        Returns:
+            bool: True if the blob was ingested before
+        """
+        with self.__lock:
+            duplicate = blob_identity in self.__blobs
+            self.duplicate_blobs += duplicate
+        return duplicate
+
+    def partition_events(
+        self, events: Union[list, dict], tables: Iterable[str], pending_ids: Optional[Set[str]] = None
+    ) -> List[EventPartition]:
+        """Group the events by the destination tables that have not ingested their `event_id` yet.
+        Events ingested into every table or repeating within `events` are dropped, events without
+        `event_id` are kept for every table.
+
+        Args:
+            events (Union[list, dict]): parsed events
+            tables (Iterable[str]): destination tables of the events
+            pending_ids (Optional[Set[str]]): ids kept earlier by the same invocation but not committed yet,
+                e.g. of the previous batches of a streamed blob
+
+        Returns:
+            List[EventPartition]: tables, events and event ids of each group, in the order of the events.
+                Usually a single group, the events of an invocation that failed for some tables form their own group
+        """
+        if isinstance(events, dict):
+            events = [events]
+
+        tables = sorted(set(tables))
+        event_ids = [self.__get_event_id(event) for event in events]
+        known_ids = list(dict.fromkeys(event_id for event_id in event_ids if event_id is not None))
+        with self.__lock:
+            ingested = {
+                table: self.__events.contains_many([self.__get_key(table, event_id) for event_id in known_ids])
+                for table in tables
+            }
+        pending_tables_by_id = {
+            event_id: frozenset(table for table in tables if not ingested[table][index])
+            for index, event_id in enumerate(known_ids)
+        }
+
+        seen = set(pending_ids or ())
+        partitions: Dict[FrozenSet[str], Tuple[list, List[str]]] = {}
+        for event, event_id in zip(events, event_ids):
+            if event_id is None:
+                pending_tables = frozenset(tables)
+            elif event_id in seen:
+                # later copies within the same invocation are duplicates too
+                continue
+            else:
+                seen.add(event_id)
+                pending_tables = pending_tables_by_id[event_id]
+                if not pending_tables:
+                    continue
+            partition_events, partition_ids = partitions.setdefault(pending_tables, ([], []))
+            partition_events.append(event)
+            if event_id is not None:
+                partition_ids.append(event_id)
+
+        dropped = len(events) - sum(len(partition_events) for partition_events, _ in partitions.values())
+        if dropped:
+            with self.__lock:
+                self.duplicate_events += dropped
+            logger.info(f"Dropped {dropped} duplicate events")
+        return [
+            (pending_tables, partition_events, partition_ids)
+            for pending_tables, (partition_events, partition_ids) in partitions.items()
+        ]
+
+    def commit(self, table: str, event_ids: Iterable[str]) -> None:
+        """Remember the events ingested into a table
+
+        Args:
+            table (str): destination table
+            event_ids (Iterable[str]): event ids of the ingested rows, see #partition_events
+        """
+        keys = [self.__get_key(table, event_id) for event_id in event_ids]
+        with self.__lock:
+            self.__events.add_many(keys)
+
+    def commit_blob(self, blob_identity: str) -> None:
+        """Remember a blob once all of its events are ingested
+
+        Args:
+            blob_identity (str): identity of the ingested blob, see `get_blob_identity`
+        """
+        with self.__lock:
+            self.__blobs.add(blob_identity)
+
+    def get_stats(self) -> dict:
+        """Get the number of dropped duplicates
+
+        Returns:
+            dict: duplicate_events and duplicate_blobs
+        """
+        with self.__lock:
+            return {"duplicate_events": self.duplicate_events, "duplicate_blobs": self.duplicate_blobs}
+
+    @staticmethod
+    def __get_key(table: str, event_id: str) -> str:
+        # Kusto table names cannot contain `/`
+        return f"{table}/{event_id}"
+
+    @staticmethod
+    def __get_event_id(event) -> Optional[str]:
+        event_id = event.get("event_id") if isinstance(event, dict) else None
+        return None if event_id is None else str(event_id)
+
+
+def get_blob_identity(blob_name: Optional[str], blob_length: Optional[int]) -> Optional[str]:
+    """Get the identity of a blob, the same blob delivered again has the same identity
+
+    Args:
+        blob_name (Optional[str]): blob path
+        blob_length (Optional[int]): blob size in bytes
+
+    Returns:
+        Optional[str]: identity, None if the blob has no name
+    """
+    if not blob_name:
+        return None
+    return f"{blob_name}:{blob_length}" if blob_length is not None else blob_name
+
+
+event_deduplicator = EventDeduplicator(DEDUP_CAPACITY, DEDUP_ERROR_RATE, DEDUP_WINDOW_SECONDS, DEDUP_BLOB_CAPACITY)
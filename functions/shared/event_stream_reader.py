@@ -0,0 +1,189 @@
+import codecs
+import json
+import logging
+from typing import IO, Iterator, List
+
+from utils.compression import DecompressedStream
+from utils.settings import STREAM_BATCH_SIZE, STREAM_CHUNK_SIZE
+
+logger = logging.getLogger("EventStreamReader")
+
+WHITESPACE = " \t\n\r"
+
+
+class EventStreamReader:
+    """Incrementally parse telemetry events from a binary blob stream.
+
+    Supports a top level JSON array, a single JSON object and newline delimited
+    (or concatenated) JSON objects and arrays, plain or gzip / zstd compressed. The stream is
+    read and decompressed `chunk_size` bytes at a time and events are yielded in lists
+    of at most `batch_size` items, so only the current chunk and batch are held in memory.
+
+    ### Iterate batches of events from a blob
+    reader = EventStreamReader(blob_input)
+    for events in reader.iter_batches():
+        ...
+    """
+
+    def __init__(
+        self,
+        stream: IO[bytes],
+        batch_size: int = STREAM_BATCH_SIZE,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+    ) -> None:
+        """Constructor
+
+        Args:
+            stream (IO[bytes]): Readable binary stream, e.g. func.InputStream
+            batch_size (int): Maximum number of events per yielded batch
+            chunk_size (int): Number of (decompressed) bytes read from the stream at a time
+        """
+        self.batch_size = max(1, batch_size)
+        self.chunk_size = max(1, chunk_size)
+        self.stream = DecompressedStream(stream, self.chunk_size)
+
+        self.__decoder = json.JSONDecoder()
+        self.__text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self.__buffer = ""
+        self.__position = 0
+        self.__eof = False
+
+    def iter_batches(self) -> Iterator[List[dict]]:
+        """Yield bounded batches of parsed events
+
+        Raises:
+            json.decoder.JSONDecodeError: blob is malformed, after the batches before the error
+
+        Yields:
+            List[dict]: Up to `batch_size` events
+        """
+        batch: List[dict] = []
+        try:
+            for event in self.__iter_events():
+                batch.append(event)
+                if len(batch) >= self.batch_size:
+                    yield batch
+                    batch = []
+        except json.decoder.JSONDecodeError as err:
+            # fail the invocation rather than ingest a partial blob
+            logger.error(f"Stopped reading blob at malformed JSON: {err}")
+            raise
+
+        if batch:
+            yield batch
+
+    @property
+    def bytes_read(self) -> int:
+        """Bytes read from the blob so far, compressed if the blob is compressed"""
+        return self.stream.bytes_read
+
+    # PRIVATE
+
+    def __iter_events(self) -> Iterator[dict]:
+        """Yield events one by one from the stream
+
+        Yields:
+            dict: Parsed event
+        """
+        # concatenated values, e.g. NDJSON lines or the arrays of an append blob
+        while True:
+            first_char = self.__peek_non_whitespace()
+            if first_char is None:
+                return
+
+            if first_char == "[":
+                self.__position += 1
+                yield from self.__iter_array_items()
+            else:
+                yield self.__decode_value()
+
+    def __iter_array_items(self) -> Iterator[dict]:
+        """Yield items of a top level JSON array
+
+        Yields:
+            dict: Parsed array item
+        """
+        if self.__peek_non_whitespace() == "]":
+            self.__position += 1
+            return
+
+        while True:
+            yield self.__decode_value()
+
+            separator = self.__peek_non_whitespace()
+            if separator == ",":
+                self.__position += 1
+            elif separator == "]":
+                self.__position += 1
+                return
+            else:
+                raise json.decoder.JSONDecodeError(
+                    "Expecting ',' delimiter", self.__buffer, self.__position
+                )
+
+    def __decode_value(self):
+        """Decode the next JSON value, reading more chunks until it is complete
+
+        Raises:
+            json.decoder.JSONDecodeError: value is malformed
+
+        Returns:
+            Any: Decoded JSON value
+        """
+        self.__peek_non_whitespace()
+        while True:
+            try:
+                value, end = self.__decoder.raw_decode(self.__buffer, self.__position)
+            except json.decoder.JSONDecodeError:
+                if self.__eof or not self.__read_chunk():
+                    raise
+                continue
+
+            # a value ending with the buffer, e.g. a number, may continue in the next chunk
+            if end == len(self.__buffer) and not self.__eof:
+                self.__read_chunk()
+                continue
+
+            self.__position = end
+            return value
+
+    def __peek_non_whitespace(self):
+        """Skip whitespace and return the next character without consuming it
+
+        Returns:
+            Optional[str]: Next character or None on end of stream
+        """
+        while True:
+            while (
+                self.__position < len(self.__buffer)
+                and self.__buffer[self.__position] in WHITESPACE
+            ):
+                self.__position += 1
+
+            if self.__position < len(self.__buffer):
+                return self.__buffer[self.__position]
+
+            if not self.__read_chunk():
+                return None
+
+    def __read_chunk(self) -> bool:
+        """Append the next chunk of the stream to the buffer
+
+        Returns:
+            bool: False when the stream is exhausted
+        """
+        if self.__eof:
+            return False
+
+        chunk = self.stream.read(self.chunk_size)
+        # drop already parsed text so the buffer stays around one chunk in size
+        self.__buffer = self.__buffer[self.__position:]
+        self.__position = 0
+
+        if not chunk:
+            self.__eof = True
+            self.__buffer += self.__text_decoder.decode(b"", final=True)
+            return False
+
+        self.__buffer += self.__text_decoder.decode(chunk)
+        return True
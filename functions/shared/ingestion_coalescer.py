@@ -0,0 +1,161 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Dict, List
+
+import pandas as pd
+from utils.dictionary_encoding import concat_frames
+from utils.settings import COALESCE_MAX_BYTES, COALESCE_MAX_ROWS, COALESCE_MAX_SECONDS
+
+from .kusto_service_client import KustoServiceClient
+
+logger = logging.getLogger("IngestionCoalescer")
+
+
+class PendingBatch:
+    """DataFrames of concurrent invocations waiting to be ingested together"""
+
+    def __init__(self) -> None:
+        """Constructor"""
+        self.frames: List[pd.DataFrame] = []
+        self.rows = 0
+        self.bytes = 0
+        self.created_at = time.monotonic()
+        # resolved with the uploaded bytes once the batch is ingested
+        self.future: Future = Future()
+
+    def add(self, data_frame: pd.DataFrame) -> None:
+        """Add a DataFrame to the batch
+
+        Args:
+            data_frame (pd.DataFrame): rows of one invocation
+        """
+        self.frames.append(data_frame)
+        self.rows += len(data_frame.index)
+        self.bytes += int(data_frame.memory_usage(index=False, deep=True).sum())
+
+
+class IngestionCoalescer:
+    """Process wide group commit of the DataFrames of concurrent invocations.
+
+    Invocations of the same worker add their rows to the pending batch of the destination
+    table and wait until that batch is ingested, so many small blobs become one Kusto ingest.
+    A batch is ingested once it holds `max_rows` rows or `max_bytes` bytes, by the invocation
+    that filled it, or `max_seconds` after its first rows, by the first invocation that waited
+    that long. No invocation returns before its rows are ingested, so no rows are buffered
+    when the worker is recycled.
+
+    ### Ingest through the coalescer, blocks until the rows are ingested
+    uploaded_bytes = ingestion_coalescer.ingest(kusto_client, data_frame)
+    """
+
+    def __init__(self, max_rows: int = 50000, max_bytes: int = 16 * 2 ** 20, max_seconds: float = 2) -> None:
+        """Constructor
+
+        Args:
+            max_rows (int): ingest a batch once it holds this many rows
+            max_bytes (int): ingest a batch once its DataFrames use this many bytes in memory
+            max_seconds (float): ingest a batch at the latest this many seconds after its first rows
+        """
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.batches = 0
+        self.frames = 0
+        self.__pending: Dict[KustoServiceClient, PendingBatch] = {}
+        self.__lock = threading.Lock()
+
+    def ingest(self, kusto_client: KustoServiceClient, data_frame: pd.DataFrame) -> int:
+        """Add a DataFrame to the pending batch of its table and wait until the batch is ingested
+
+        Args:
+            kusto_client (KustoServiceClient): pooled client of the destination table
+            data_frame (pd.DataFrame): rows to ingest
+
+        Raises:
+            Exception: ingestion of the batch failed
+
+        Returns:
+            int: uploaded bytes of the batch attributed to `data_frame` by its share of the rows
+        """
+        with self.__lock:
+            batch = self.__pending.get(kusto_client)
+            if batch is None:
+                batch = self.__pending[kusto_client] = PendingBatch()
+            batch.add(data_frame)
+            self.frames += 1
+            is_full = batch.rows >= self.max_rows or batch.bytes >= self.max_bytes
+            if is_full:
+                self.__take(kusto_client, batch)
+
+        if is_full:
+            self.__ingest_batch(kusto_client, batch)
+        else:
+            self.__wait(kusto_client, batch)
+
+        uploaded_bytes = batch.future.result()
+        return round(uploaded_bytes * len(data_frame.index) / batch.rows) if batch.rows else uploaded_bytes
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get the number of coalesced DataFrames and ingested batches
+
+        Returns:
+            Dict[str, int]: frames, batches and pending tables
+        """
+        with self.__lock:
+            return {"frames": self.frames, "batches": self.batches, "pending": len(self.__pending)}
+
+    def __wait(self, kusto_client: KustoServiceClient, batch: PendingBatch) -> None:
+        """Wait for the batch, ingesting it when its deadline passes and no other invocation did
+
+        Args:
+            kusto_client (KustoServiceClient): client of the batch's table
+            batch (PendingBatch): batch holding the caller's rows
+        """
+        remaining = batch.created_at + self.max_seconds - time.monotonic()
+        try:
+            batch.future.exception(timeout=max(0, remaining))
+            return
+        except FutureTimeoutError:
+            pass
+
+        with self.__lock:
+            is_pending = self.__pending.get(kusto_client) is batch
+            if is_pending:
+                self.__take(kusto_client, batch)
+        if is_pending:
+            self.__ingest_batch(kusto_client, batch)
+
+    def __take(self, kusto_client: KustoServiceClient, batch: PendingBatch) -> None:
+        """Close a batch so the next rows of the table start a new one. Caller must hold the lock.
+
+        Args:
+            kusto_client (KustoServiceClient): client of the batch's table
+            batch (PendingBatch): batch to ingest
+        """
+        del self.__pending[kusto_client]
+        self.batches += 1
+
+    def __ingest_batch(self, kusto_client: KustoServiceClient, batch: PendingBatch) -> None:
+        """Ingest a closed batch and resolve it for every waiting invocation
+
+        Args:
+            kusto_client (KustoServiceClient): client of the batch's table
+            batch (PendingBatch): batch to ingest
+        """
+        try:
+            data_frame = concat_frames(batch.frames)
+            uploaded_bytes = kusto_client.ingest_data_frame(data_frame)
+        except Exception as err:
+            batch.future.set_exception(err)
+            return
+
+        logger.info(
+            f"Ingested {len(batch.frames)} coalesced frames, {batch.rows} rows, to Table: {kusto_client.table_name}"
+        )
+        batch.future.set_result(uploaded_bytes)
+
+
+ingestion_coalescer = IngestionCoalescer(COALESCE_MAX_ROWS, COALESCE_MAX_BYTES, COALESCE_MAX_SECONDS)
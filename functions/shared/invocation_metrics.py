@@ -0,0 +1,274 @@
+import json
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Union
+
+from utils.settings import METRICS_FILE_PATH, METRICS_SINKS
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+logger = logging.getLogger("InvocationMetrics")
+
+Number = Union[int, float]
+
+
+class MetricsSink:
+    """Destination of invocation metrics records"""
+
+    def emit(self, record: dict) -> None:
+        """Send a metrics record
+
+        Args:
+            record (dict): record built by InvocationMetrics#to_dict()
+        """
+        raise NotImplementedError
+
+
+class LogMetricsSink(MetricsSink):
+    """Logs every record as a single JSON line"""
+
+    def emit(self, record: dict) -> None:
+        logger.info("Invocation metrics: " + json.dumps(record, default=str))
+
+
+class FileMetricsSink(MetricsSink):
+    """Appends every record as a JSON line to a local file"""
+
+    def __init__(self, path: str) -> None:
+        """Constructor
+
+        Args:
+            path (str): JSON lines file
+        """
+        self.path = path
+        self.__lock = threading.Lock()
+
+    def emit(self, record: dict) -> None:
+        line = json.dumps(record, default=str) + "\n"
+        with self.__lock, open(self.path, "a", encoding="utf-8") as file:
+            file.write(line)
+
+
+class OpenTelemetryMetricsSink(MetricsSink):
+    """Records stage durations as histograms and counters as counters of an OpenTelemetry meter.
+    Requires the `opentelemetry-api` package and a configured MeterProvider.
+    """
+
+    def __init__(self) -> None:
+        """Constructor"""
+        from opentelemetry import metrics
+
+        self.meter = metrics.get_meter("media-observability.functions")
+        self.stage_duration = self.meter.create_histogram(
+            "invocation.stage.duration", unit="ms", description="Duration of an invocation stage")
+        self.worker_peak_rss = self.meter.create_histogram(
+            "invocation.worker_peak_rss", unit="MiB",
+            description="Peak resident set size of the worker process since it started, not of the invocation")
+        self.peak_rss_growth = self.meter.create_histogram(
+            "invocation.peak_rss_growth", unit="MiB",
+            description="Growth of the worker peak resident set size during the invocation")
+        self.counters = {}
+        self.__lock = threading.Lock()
+
+    def emit(self, record: dict) -> None:
+        attributes = {"invocation": record["invocation"]}
+        for stage, duration in record["stages_ms"].items():
+            self.stage_duration.record(duration, {**attributes, "stage": stage})
+        for table, table_metrics in record["tables"].items():
+            for name, value in table_metrics.items():
+                if name.endswith("_ms"):
+                    self.stage_duration.record(value, {**attributes, "stage": name[:-3], "table": table})
+                else:
+                    self.__get_counter(name).add(value, {**attributes, "table": table})
+        for name, value in record["counters"].items():
+            self.__get_counter(name).add(value, attributes)
+        if record["worker_peak_rss_mb"] is not None:
+            self.worker_peak_rss.record(record["worker_peak_rss_mb"], attributes)
+            self.peak_rss_growth.record(record["peak_rss_growth_mb"], attributes)
+
+    def __get_counter(self, name: str):
+        """Get or create the counter of a metric
+
+        Args:
+            name (str): metric name, e.g. `blob_bytes`
+
+        Returns:
+            Counter: OpenTelemetry counter
+        """
+        with self.__lock:
+            if name not in self.counters:
+                self.counters[name] = self.meter.create_counter(f"invocation.{name}")
+            return self.counters[name]
+
+
+class InvocationMetrics:
+    """Per stage timings and counters of one function invocation, emitted as one record.
+
+    ### Measure the stages of an invocation
+    metrics = InvocationMetrics("blob_trigger", blob="sample_data.json")
+    with metrics.stage("parse"):
+        ...
+    metrics.add("blob_bytes", 1024)
+    metrics.add_table("slow_start", rows_out=10)
+    metrics.emit()
+
+    The record looks like
+    {"invocation": "blob_trigger", "blob": "sample_data.json", "duration_ms": 12.5,
+     "stages_ms": {"parse": 3.2}, "counters": {"blob_bytes": 1024},
+     "tables": {"slow_start": {"rows_out": 10}}, "worker_peak_rss_mb": 120.4, "peak_rss_growth_mb": 0.0}
+
+    `worker_peak_rss_mb` is the peak of the worker process over its lifetime, so later invocations
+    of a worker report the peak of an earlier one. `peak_rss_growth_mb` is how much the invocation
+    raised that peak, 0 if it stayed below it, also when concurrent invocations share the worker.
+    """
+
+    def __init__(self, invocation: str, sinks: Optional[List[MetricsSink]] = None, **attributes) -> None:
+        """Constructor
+
+        Args:
+            invocation (str): name of the invoked function or handler
+            sinks (Optional[List[MetricsSink]]): destinations of the record, by default the `METRICS_SINKS` setting
+            **attributes: additional fields of the record, e.g. the blob name
+        """
+        self.invocation = invocation
+        self.sinks = get_metrics_sinks() if sinks is None else sinks
+        self.attributes = attributes
+        self.stages_ms: Dict[str, float] = {}
+        self.counters: Dict[str, Number] = {}
+        self.tables: Dict[str, Dict[str, Number]] = {}
+        self.__started = time.perf_counter()
+        self.__started_peak_rss_mb = get_worker_peak_rss_mb()
+        self.__lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str, table: Optional[str] = None) -> Iterator[None]:
+        """Time a stage, the durations of repeated stages are summed up
+
+        Args:
+            name (str): stage name, e.g. `parse`
+            table (Optional[str]): record the duration for this destination table
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_duration(name, (time.perf_counter() - start) * 1000, table)
+
+    def add_duration(self, name: str, duration_ms: float, table: Optional[str] = None) -> None:
+        """Add a measured duration to a stage
+
+        Args:
+            name (str): stage name
+            duration_ms (float): milliseconds
+            table (Optional[str]): record the duration for this destination table
+        """
+        if table is not None:
+            self.add_table(table, **{f"{name}_ms": duration_ms})
+            return
+
+        with self.__lock:
+            self.stages_ms[name] = self.stages_ms.get(name, 0) + duration_ms
+
+    def add(self, name: str, value: Number) -> None:
+        """Add to an invocation counter
+
+        Args:
+            name (str): counter name, e.g. `blob_bytes`
+            value (Number): amount
+        """
+        with self.__lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def add_table(self, table: str, **values: Number) -> None:
+        """Add to the counters of a destination table
+
+        Args:
+            table (str): destination table
+            **values (Number): amounts, e.g. rows_in=100, rows_out=10
+        """
+        with self.__lock:
+            table_metrics = self.tables.setdefault(table, {})
+            for name, value in values.items():
+                table_metrics[name] = table_metrics.get(name, 0) + value
+
+    def to_dict(self) -> dict:
+        """Build the metrics record
+
+        Returns:
+            dict: metrics record
+        """
+        with self.__lock:
+            return {
+                "invocation": self.invocation,
+                **self.attributes,
+                "duration_ms": (time.perf_counter() - self.__started) * 1000,
+                "stages_ms": dict(self.stages_ms),
+                "counters": dict(self.counters),
+                "tables": {table: dict(values) for table, values in self.tables.items()},
+                **self.__get_rss_metrics(),
+            }
+
+    def __get_rss_metrics(self) -> dict:
+        """Get the worker peak resident set size and its growth since the invocation started
+
+        Returns:
+            dict: worker_peak_rss_mb and peak_rss_growth_mb, None if the platform does not report them
+        """
+        peak_rss_mb = get_worker_peak_rss_mb()
+        if peak_rss_mb is None or self.__started_peak_rss_mb is None:
+            return {"worker_peak_rss_mb": peak_rss_mb, "peak_rss_growth_mb": None}
+        return {"worker_peak_rss_mb": peak_rss_mb, "peak_rss_growth_mb": peak_rss_mb - self.__started_peak_rss_mb}
+
+    def emit(self) -> None:
+        """Send the record to all sinks. A failing sink never fails the invocation."""
+        record = self.to_dict()
+        for sink in self.sinks:
+            try:
+                sink.emit(record)
+            except Exception as e:
+                logger.warning(f"{type(sink).__name__} failed to emit invocation metrics: {e}")
+
+
+def get_worker_peak_rss_mb() -> Optional[float]:
+    """Get the peak resident set size of the worker process since it started
+
+    Returns:
+        Optional[float]: MiB, None if the platform does not report it
+    """
+    if resource is None:
+        return None
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, KiB on Linux
+    return max_rss / 2 ** 20 if sys.platform == "darwin" else max_rss / 2 ** 10
+
+
+@lru_cache(maxsize=None)
+def get_metrics_sinks() -> List[MetricsSink]:
+    """Create the sinks listed in the `METRICS_SINKS` setting once per worker
+
+    Returns:
+        List[MetricsSink]: sinks, unknown or unavailable sinks are skipped with a warning
+    """
+    sinks: List[MetricsSink] = []
+    for name in METRICS_SINKS:
+        try:
+            if name == "log":
+                sinks.append(LogMetricsSink())
+            elif name == "file":
+                sinks.append(FileMetricsSink(METRICS_FILE_PATH))
+            elif name == "otel":
+                sinks.append(OpenTelemetryMetricsSink())
+            else:
+                logger.warning(f"Unknown metrics sink: {name}")
+        except ImportError as e:
+            logger.warning(f"Metrics sink {name} is not available: {e}")
+
+    return sinks
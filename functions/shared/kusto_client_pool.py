@@ -0,0 +1,110 @@
+import logging
+import threading
+from typing import Any, Dict, Tuple
+
+from azure.kusto.data.data_format import DataFormat
+
+from .kusto_service_client import KustoServiceClient
+
+logger = logging.getLogger("KustoClientPool")
+
+PoolKey = Tuple[str, str, str, DataFormat, Tuple[Tuple[str, Any], ...]]
+
+
+class KustoClientPool:
+    """Process wide pool of KustoServiceClient instances.
+
+    Function invocations running in the same worker reuse the client, and with it the
+    authenticated session and cached token, of every (cluster, database, table, format)
+    and set of options, so callers asking for different options get different clients.
+
+    ### Get a pooled client
+    client = kusto_client_pool.get_client(
+        cluster_uri=CLUSTER_URI, client_id=MANAGED_CLIENT_ID, db_name=DB_NAME,
+        table_name="table", data_format=DataFormat.CSV
+    )
+    """
+
+    def __init__(self) -> None:
+        """Constructor"""
+        self.hits = 0
+        self.misses = 0
+        self.__clients: Dict[PoolKey, KustoServiceClient] = {}
+        self.__lock = threading.Lock()
+
+    def get_client(
+        self,
+        cluster_uri: str,
+        client_id: str,
+        db_name: str,
+        table_name: str,
+        data_format: DataFormat,
+        **options,
+    ) -> KustoServiceClient:
+        """Get the pooled client of a table, creating it on first use
+
+        Args:
+            cluster_uri (str): Kusto Cluster Ingest URI
+            client_id (str): Managed Identity Client ID
+            db_name (str): Database Name on Kusto Cluster
+            table_name (str): Table Name in `db_name`
+            data_format (DataFormat): Data Format for Ingestion
+            **options: additional KustoServiceClient arguments, part of the pool key
+
+        Returns:
+            KustoServiceClient: pooled client
+        """
+        key = (cluster_uri, db_name, table_name, data_format, self.__freeze(options))
+        with self.__lock:
+            client = self.__clients.get(key)
+            if client is not None:
+                self.hits += 1
+                return client
+
+            self.misses += 1
+            logger.debug(f"Creating Kusto client for {db_name}.{table_name}")
+            client = KustoServiceClient(
+                cluster_uri=cluster_uri,
+                client_id=client_id,
+                db_name=db_name,
+                table_name=table_name,
+                data_format=data_format,
+                **options,
+            )
+            self.__clients[key] = client
+            return client
+
+    @classmethod
+    def __freeze(cls, value: Any) -> Any:
+        """Convert options to a hashable value, e.g. the column types dictionary
+
+        Args:
+            value (Any): option value
+
+        Returns:
+            Any: hashable value
+        """
+        if isinstance(value, dict):
+            return tuple(sorted((key, cls.__freeze(item)) for key, item in value.items()))
+        if isinstance(value, (list, tuple)):
+            return tuple(cls.__freeze(item) for item in value)
+        return value
+
+    def get_stats(self) -> dict:
+        """Get pool hit/miss counters
+
+        Returns:
+            dict: hits, misses and number of pooled clients
+        """
+        with self.__lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self.__clients)}
+
+    def clear(self) -> None:
+        """Drop all pooled clients and reset the counters"""
+        with self.__lock:
+            self.__clients.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+kusto_client_pool = KustoClientPool()
@@ -1,14 +1,27 @@
+import io
 import logging
-from typing import Literal, Union
+from typing import Dict, Literal, Optional, Tuple, Union
 
 from azure.kusto.data import KustoConnectionStringBuilder
 from azure.kusto.data.data_format import DataFormat
 from azure.kusto.data.exceptions import KustoServiceError
-from azure.kusto.ingest import IngestionProperties, KustoStreamingIngestClient
+from azure.kusto.ingest import (
+    BaseIngestClient,
+    IngestionProperties,
+    KustoStreamingIngestClient,
+    QueuedIngestClient,
+    StreamDescriptor,
+)
 from pandas import DataFrame
+from utils.column_types import coerce_dataframe
 
 logger = logging.getLogger("KustoServiceClient")
 
+STREAMING_INGESTION = "streaming"
+QUEUED_INGESTION = "queued"
+# ISO 8601 in UTC, datetime columns are converted to UTC by `coerce_dataframe`
+CSV_DATE_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+
 
 class KustoServiceClient:
     """Kusto Service Class for handling Kusto Python SDK Calls"""
@@ -19,7 +32,12 @@ class KustoServiceClient:
         client_id: str,
         db_name: str,
         table_name: str,
-        data_format: Union[Literal[DataFormat.JSON], Literal[DataFormat.CSV]],
+        data_format: Union[
+            Literal[DataFormat.JSON], Literal[DataFormat.CSV], Literal[DataFormat.PARQUET]
+        ],
+        ingestion_mode: Literal["streaming", "queued"] = STREAMING_INGESTION,
+        column_types: Optional[Dict[str, str]] = None,
+        compression_level: int = 6,
     ) -> None:
         """Constructor of KustoClient
 
@@ -28,26 +46,42 @@ class KustoServiceClient:
             client_id (str): Managed Identity Client ID
             db_name (str): Database Name on Kusto Cluster
             table_name (str): Table Name in `db_name`
-            data_format (Union[Literal[DataFormat.JSON], Literal[DataFormat.CSV]]): Data Format for Ingestion
+            data_format (Union[Literal[DataFormat.JSON], Literal[DataFormat.CSV], Literal[DataFormat.PARQUET]]):
+                Data Format for Ingestion. CSV and JSON are uploaded gzip compressed, Parquet snappy compressed
+            ingestion_mode (Literal["streaming", "queued"]): `streaming` ingests through the streaming endpoint,
+                `queued` through queued ingestion, batched by the ingestion batching policy of the table
+            column_types (Optional[Dict[str, str]]): Kusto column types of the table, e.g. {"timestamp": "datetime"}.
+                Parquet columns are written with the matching types
+            compression_level (int): gzip level used for CSV and JSON uploads
         """
         self.cluster_uri = cluster_uri
         self.db_name = db_name
         self.table_name = table_name
         self.data_format = data_format
         self.client_id = client_id
-        self.client: KustoStreamingIngestClient = self.__get_client()
+        self.ingestion_mode = ingestion_mode
+        self.column_types = column_types or {}
+        self.compression_level = compression_level
+        self.client: BaseIngestClient = self.__get_client()
 
-    def ingest_data_frame(self, data: DataFrame) -> None:
+    def ingest_data_frame(self, data: DataFrame) -> int:
         """Ingest Pandas DataFrame of incoming data to Data Explorer
 
         Args:
             data (DataFrame): Pandas DataFrame to be uploaded to Data Explorer
+
+        Returns:
+            int: bytes uploaded
         """
         ingestion_props = self.__get_ingestion_properties()
         try:
-            self.client.ingest_from_dataframe(
-                df=data, ingestion_properties=ingestion_props
+            payload, is_compressed = self.serialize_data_frame(data)
+            size = payload.getbuffer().nbytes
+            self.client.ingest_from_stream(
+                StreamDescriptor(payload, is_compressed=is_compressed, size=size),
+                ingestion_properties=ingestion_props,
             )
+            return size
         except KustoServiceError as err:
             logger.error(f"KustoServiceError when Ingesting From Dataframe: {err}")
             raise err
@@ -55,15 +89,56 @@ class KustoServiceClient:
             logger.error(f"KustoServiceClient#ingest_data_frame() Error: {err}")
             raise err
 
-    def __get_client(self) -> KustoStreamingIngestClient:
-        """Get Kusto Streaming Client
+    def serialize_data_frame(self, data: DataFrame) -> Tuple[io.BytesIO, bool]:
+        """Serialize a DataFrame to the upload payload of the client's data format
+
+        Args:
+            data (DataFrame): Pandas DataFrame to be uploaded to Data Explorer
+
+        Returns:
+            Tuple[io.BytesIO, bool]: payload and whether it is gzip compressed
+        """
+        payload = io.BytesIO()
+        if self.data_format == DataFormat.PARQUET:
+            # Parquet columns are matched to the table columns by name
+            coerce_dataframe(data, self.column_types).to_parquet(
+                payload, index=False, compression="snappy"
+            )
+            payload.seek(0)
+            return payload, False
+
+        compression = {"method": "gzip", "compresslevel": self.compression_level, "mtime": 0}
+        if self.data_format == DataFormat.JSON:
+            data.to_json(
+                payload, orient="records", lines=True, date_format="iso", compression=compression
+            )
+        else:
+            data.to_csv(
+                payload,
+                index=False,
+                header=False,
+                encoding="utf-8",
+                compression=compression,
+                date_format=CSV_DATE_FORMAT,
+            )
+        payload.seek(0)
+        return payload, True
+
+    def __get_client(self) -> BaseIngestClient:
+        """Get Kusto Streaming or Queued Ingest Client
 
         Returns:
-            KustoStreamingIngestClient: Streaming Ingest Kusto Client
+            BaseIngestClient: Streaming or Queued Ingest Kusto Client
         """
         try:
             # ? use #with_az_cli_authentication for local function developement
             # kcsb_ing = KustoConnectionStringBuilder.with_az_cli_authentication(self.cluster_uri)
+            if self.ingestion_mode == QUEUED_INGESTION:
+                kcsb_ing = KustoConnectionStringBuilder.with_aad_managed_service_identity_authentication(
+                    self.__get_queued_ingest_uri(), self.client_id
+                )
+                return QueuedIngestClient(kcsb_ing)
+
             kcsb_ing = KustoConnectionStringBuilder.with_aad_managed_service_identity_authentication(
                 self.cluster_uri, self.client_id
             )
@@ -75,6 +150,17 @@ class KustoServiceClient:
             logger.error(f"KustoServiceClient#get_client() Error: {err}")
             raise err
 
+    def __get_queued_ingest_uri(self) -> str:
+        """Get the data management (`ingest-`) endpoint used by queued ingestion
+
+        Returns:
+            str: Ingest URI of the cluster
+        """
+        if "://ingest-" in self.cluster_uri:
+            return self.cluster_uri
+
+        return self.cluster_uri.replace("://", "://ingest-", 1)
+
     def __get_ingestion_properties(self) -> IngestionProperties:
         """Get Ingestion Properties for Kusto Client Instance
 
@@ -82,7 +168,7 @@ class KustoServiceClient:
             IngestionProperties:
                 database: Name of Database for Ingestion
                 table: Table in Database that the data will be uploaded to
-                data_format: JSON or CSV format for upload.
+                data_format: JSON, CSV or Parquet format for upload.
         """
         return IngestionProperties(
             database=self.db_name, table=self.table_name, data_format=self.data_format
@@ -1,11 +1,18 @@
 import logging
 import json
+import random
 import string
-from typing import List
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
 import http.client
+from urllib.parse import urlparse
 
 logger = logging.getLogger("MetricsAdvisorAPIClient")
 
+RETRY_STATUS_CODES = [429, 500, 502, 503, 504]
+CONNECTION_ERRORS = (http.client.HTTPException, OSError)
+
 
 class MetricsAdvisorAPIClient:
     metrics_advisor_subscription_key = ""
@@ -16,7 +23,12 @@ class MetricsAdvisorAPIClient:
         self,
         metrics_advisor_subscription_key: str,
         metrics_advisor_api_key: str,
-        metrics_advisor_endpoint: str
+        metrics_advisor_endpoint: str,
+        max_connections: int = 8,
+        max_retries: int = 3,
+        backoff_seconds: float = 0.5,
+        timeout_seconds: float = 30,
+        max_backoff_seconds: float = 30,
     ):
         """Constructor
 
@@ -24,19 +36,122 @@ class MetricsAdvisorAPIClient:
             metrics_advisor_subscription_key (string): metrics advisor subscription key
             metrics_advisor_api_key (string): metrics advisor api key
             metrics_advisor_endpoint (string): metrics advisor endpoint
+            max_connections (int): keep-alive connections kept open for reuse
+            max_retries (int): retries of requests failing with 429, 5xx or a connection error
+            backoff_seconds (float): base delay of the exponential retry backoff
+            timeout_seconds (float): socket timeout of a request
+            max_backoff_seconds (float): longest wait before a retry, also if Retry-After asks for more
         """
         self.metrics_advisor_subscription_key = metrics_advisor_subscription_key
         self.metrics_advisor_api_key = metrics_advisor_api_key
         self.metrics_advisor_endpoint = metrics_advisor_endpoint
+        self.max_connections = max_connections
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.timeout_seconds = timeout_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+
+        self.__idle_connections: List[http.client.HTTPSConnection] = []
+        self.__lock = threading.Lock()
 
     def __init_connection(self) -> http.client.HTTPSConnection:
         """Create https API connection
 
         Returns:
-            http.client.HTTPSConnection: _description_
+            http.client.HTTPSConnection: keep-alive connection to the endpoint host
+        """
+        endpoint = self.metrics_advisor_endpoint
+        host = urlparse(endpoint).netloc if "://" in endpoint else endpoint.rstrip("/")
+        return http.client.HTTPSConnection(host, timeout=self.timeout_seconds)
+
+    def __acquire_connection(self) -> Tuple[http.client.HTTPSConnection, bool]:
+        """Take an idle keep-alive connection from the pool or open a new one
+
+        Returns:
+            Tuple[http.client.HTTPSConnection, bool]: connection and whether it was reused
+        """
+        with self.__lock:
+            if self.__idle_connections:
+                return self.__idle_connections.pop(), True
+
+        return self.__init_connection(), False
+
+    def __release_connection(self, connection: http.client.HTTPSConnection) -> None:
+        """Return a connection to the pool, closing it if the pool is full
+
+        Args:
+            connection (http.client.HTTPSConnection): connection with a fully read response
+        """
+        with self.__lock:
+            if len(self.__idle_connections) < self.max_connections:
+                self.__idle_connections.append(connection)
+                return
+
+        connection.close()
+
+    def close(self) -> None:
+        """Close all idle connections"""
+        with self.__lock:
+            connections, self.__idle_connections = self.__idle_connections, []
+
+        for connection in connections:
+            connection.close()
+
+    def __request(self, url: str) -> bytes:
+        """GET a url over a pooled connection, retrying 429, 5xx and connection errors with backoff
+
+        Args:
+            url (str): request url
+
+        Returns:
+            bytes: response body
         """
-        return http.client.HTTPSConnection(
-            self.metrics_advisor_endpoint.replace("https://", ""))
+        attempt = 0
+        while True:
+            connection, reused = self.__acquire_connection()
+            try:
+                connection.request("GET", url, "", self.__get_headers())
+                response = connection.getresponse()
+                data = response.read()
+            except CONNECTION_ERRORS as e:
+                connection.close()
+                if reused:
+                    # the server closed the idle keep-alive connection, retry on a new one right away
+                    continue
+                if attempt >= self.max_retries:
+                    raise e
+                logger.warning(f"Connection error on {url}, retrying: {e}")
+                self.__sleep_before_retry(attempt, None)
+                attempt += 1
+                continue
+
+            if response.will_close:
+                connection.close()
+            else:
+                self.__release_connection(connection)
+
+            if response.status in RETRY_STATUS_CODES and attempt < self.max_retries:
+                logger.warning(f"Status {response.status} on {url}, retrying")
+                self.__sleep_before_retry(attempt, response.getheader("Retry-After"))
+                attempt += 1
+                continue
+
+            return data
+
+    def __sleep_before_retry(self, attempt: int, retry_after: Optional[str]) -> None:
+        """Wait before the next attempt, honouring a Retry-After header in seconds up to
+        `max_backoff_seconds`, so a long Retry-After cannot outlast the function timeout
+
+        Args:
+            attempt (int): number of the failed attempt, starting at 0
+            retry_after (Optional[str]): Retry-After header value
+        """
+        try:
+            delay = float(retry_after)
+        except (TypeError, ValueError):
+            delay = self.backoff_seconds * (2 ** attempt) * random.uniform(0.5, 1.5)
+
+        time.sleep(min(max(delay, 0), self.max_backoff_seconds))
 
     def __get_headers(self) -> dict:
         """Get headers
@@ -59,20 +174,10 @@ class MetricsAdvisorAPIClient:
             List: list of dict
         """
         try:
-            connection = self.__init_connection()
-            connection.request(
-                "GET",
-                incidentUrl,
-                "",
-                self.__get_headers()
-            )
-
-            response = connection.getresponse()
-            data = response.read()
-            connection.close()
+            data = self.__request(incidentUrl)
 
             responce_json = self.load_json(data)
-            
+
             logger.info("Reponse json from callback " + str(responce_json))
 
             if "code" in responce_json and responce_json['code'] == "Not Found":
@@ -94,16 +199,7 @@ class MetricsAdvisorAPIClient:
             str: data feed name
         """
         try:
-            connection = self.__init_connection()
-            connection.request(
-                "GET",
-                self.__get_data_feed_url(data_feed_id),
-                "",
-                self.__get_headers()
-            )
-            response = connection.getresponse()
-            data = response.read()
-            connection.close()
+            data = self.__request(self.__get_data_feed_url(data_feed_id))
 
             result = self.load_json(data)
 
@@ -116,6 +212,26 @@ class MetricsAdvisorAPIClient:
                 f"MetricsAdvisorClientError when getting data feed by id {data_feed_id}: {e}")
             raise e
 
+    def list_data_feed_names(self) -> Dict[str, str]:
+        """Load the names of all data feeds, following pagination
+
+        Returns:
+            Dict[str, str]: {data_feed_id: data_feed_name}
+        """
+        try:
+            names = {}
+            url = "/metricsadvisor/v1.0/dataFeeds"
+            while url:
+                result = json.loads(self.__request(url))
+                for data_feed in result.get("value", []):
+                    names[data_feed["dataFeedId"]] = data_feed.get("dataFeedName", "")
+                url = result.get("@nextLink")
+
+            return names
+        except Exception as e:
+            logger.error(f"MetricsAdvisorClientError when listing data feeds: {e}")
+            raise e
+
     def __get_data_feed_url(self, data_feed_id: str) -> str:
         """Get incidents url
 
@@ -1,10 +1,22 @@
 import logging
 import json
-from typing import List
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+import numpy as np
 import pandas as pd
 from azure.kusto.data.data_format import DataFormat
+from utils.settings import (
+    FEED_NAME_CACHE_MAX_SIZE,
+    FEED_NAME_CACHE_TTL_SECONDS,
+    FEED_NAME_CACHE_WARM_UP,
+)
+from .kusto_client_pool import kusto_client_pool
+from .invocation_metrics import InvocationMetrics
 from .kusto_service_client import KustoServiceClient
 from .metrics_advisor_client import MetricsAdvisorAPIClient
+from .ttl_cache import TTLCache
 
 logger = logging.getLogger("HookHandler")
 
@@ -18,14 +30,23 @@ class HookHandler:
             "managed_client_id": "",
             "metrics_advisor_subscription_key": "",
             "metrics_advisor_api_key": "",
-            "metrics_advisor_endpoint": ""
+            "metrics_advisor_endpoint": "",
+            "metrics_advisor_max_concurrency": "8"
         }
     """
-    loaded_feeds = {}
+    """Data feed names shared across invocations"""
+    feed_name_cache = TTLCache(
+        max_size=FEED_NAME_CACHE_MAX_SIZE, ttl_seconds=FEED_NAME_CACHE_TTL_SECONDS)
+    feed_names_warmed_up_at = None
+    feed_names_warm_up_lock = threading.Lock()
 
     """Instance of the MA api client"""
     metrics_advisor_api_client = {}
 
+    """MA api clients shared across invocations to reuse their keep-alive connections"""
+    metrics_advisor_api_clients = {}
+    metrics_advisor_api_clients_lock = threading.Lock()
+
     # Db Schema
     schema = [
         "incident_id",
@@ -62,24 +83,57 @@ class HookHandler:
                 "Env setup error, please check this env variables: " + ", ".join(empty_envs))
 
     def __get_metrics_advisor_api_client(self) -> MetricsAdvisorAPIClient:
-        """get Metrics Advisor API client
+        """get shared Metrics Advisor API client
 
         Returns:
             MetricsAdvisorAPIClient: MetricsAdvisorAPIClient
         """
-        return MetricsAdvisorAPIClient(
+        key = (
+            self.config["metrics_advisor_endpoint"],
             self.config["metrics_advisor_subscription_key"],
-            self.config["metrics_advisor_api_key"],
-            self.config["metrics_advisor_endpoint"]
+            self.config["metrics_advisor_api_key"]
         )
+        with self.metrics_advisor_api_clients_lock:
+            if key not in self.metrics_advisor_api_clients:
+                self.metrics_advisor_api_clients[key] = MetricsAdvisorAPIClient(
+                    self.config["metrics_advisor_subscription_key"],
+                    self.config["metrics_advisor_api_key"],
+                    self.config["metrics_advisor_endpoint"],
+                    max_connections=self.__get_max_concurrency()
+                )
+            return self.metrics_advisor_api_clients[key]
+
+    def __get_max_concurrency(self) -> int:
+        """Get the maximum number of concurrent Metrics Advisor API calls
+
+        Returns:
+            int: concurrency cap
+        """
+        return max(1, int(self.config.get("metrics_advisor_max_concurrency", 8)))
+
+    def __map_concurrently(self, function: Callable, items: list) -> list:
+        """Call `function` for every item on a bounded thread pool
+
+        Args:
+            function (Callable): function of one item
+            items (list): items
+
+        Returns:
+            list: results in the order of `items`
+        """
+        if len(items) <= 1:
+            return [function(item) for item in items]
+
+        with ThreadPoolExecutor(max_workers=min(self.__get_max_concurrency(), len(items))) as executor:
+            return list(executor.map(function, items))
 
     def __get_kusto_client(self) -> KustoServiceClient:
-        """Get Kusto client
+        """Get pooled Kusto client
 
         Returns:
             KustoServiceClient: KustoServiceClient
         """
-        return KustoServiceClient(
+        return kusto_client_pool.get_client(
             cluster_uri=self.config["kusto_cluster_uri"],
             client_id=self.config["managed_client_id"],
             db_name=self.config["kusto_db_name"],
@@ -93,12 +147,23 @@ class HookHandler:
         Args:
             decoded_hook_data (str): String with JSON from hook
         """
-        loaded_json = MetricsAdvisorAPIClient.load_json(decoded_hook_data)
-    
-        normalised_df = pd.json_normalize(loaded_json)
-        prepared_df = self.__prepare_incidents_df(normalised_df)
-        
-        self.__store(prepared_df)
+        self.metrics = InvocationMetrics("metrics_advisor_hook")
+        try:
+            with self.metrics.stage("parse"):
+                loaded_json = MetricsAdvisorAPIClient.load_json(decoded_hook_data)
+                normalised_df = pd.json_normalize(loaded_json)
+            self.metrics.add("alerts", len(normalised_df.index))
+
+            with self.metrics.stage("prepare_incidents"):
+                prepared_df = self.__prepare_incidents_df(normalised_df)
+            self.metrics.add("incidents", len(prepared_df.index))
+
+            with self.metrics.stage("store"):
+                self.__store(prepared_df)
+        finally:
+            self.metrics.emit()
+
+        logger.info("Feed name cache stats: %s" % str(self.feed_name_cache.get_stats()))
 
     def __load_incidents(self, incidentUrl: str) -> List:
         """Load incidents
@@ -121,12 +186,13 @@ class HookHandler:
             logger.error("DataFrame is empty, nothing to store")
             return
 
-        self.__get_kusto_client().ingest_data_frame(prepared_df)
+        self.metrics.add("uploaded_bytes", self.__get_kusto_client().ingest_data_frame(prepared_df))
 
         logger.info("Function ingests %s rows" % str(len(prepared_df.index)))
 
     def __prepare_incidents_df(self, normalised_df: pd.DataFrame) -> pd.DataFrame:
         """Prepare incidents dataframe
+        Incidents of all alerts are collected first and converted to the `schema` columns at once
 
         Args:
             normalised_df (pd.DataFrame): DataFrame
@@ -134,76 +200,98 @@ class HookHandler:
         Returns:
             pd.DataFrame: DataFrame
         """
-        data_for_df = []
-        
-        if not normalised_df.empty:
-            logger.info('__prepare_incidents_df() - normalized df column values ' + str(normalised_df.columns.to_list()))
-            
-            # iterate alerts
-            for index, alert in normalised_df.iterrows():
-                
-                if hasattr(alert, 'alertInfo.anomalyAlertingConfigurationId') and hasattr(alert, 'callBackUrl'):
-                    self.metrics_advisor_api_client = self.__get_metrics_advisor_api_client()
-                    alert_id = alert["alertInfo.alertId"]
-                    
-                    for incident in self.__load_incidents(alert["callBackUrl"]):
-                        logger.info("__prepare_incidents_df() : getting incident value from __load_incident " + str(incident))
-                        data_feed_id = incident["dataFeedId"]
-                        data_for_df.append(
-                            [
-                                incident["incidentId"],
-                                alert_id,
-                                self.__get_incident_property(
-                                    incident, "maxSeverity"),
-                                data_feed_id,
-                                self.__get_feed_name(data_feed_id),
-                                round(self.__get_incident_property(
-                                    incident, "valueOfRootNode")),
-                                round(self.__get_incident_property(
-                                    incident, "expectedValueOfRootNode")),
-                                self.__get_incident_dimension(incident),
-                                alert["alertInfo.timestamp"]
-                            ]
-                        )
-
-        # Create the pandas DataFrame
-        return pd.DataFrame(data_for_df, columns=self.schema)
-
-    def __get_incident_property(self, incident: dict, sudproperty: str) -> str:
-        """Get incident field
+        if normalised_df.empty:
+            return pd.DataFrame([], columns=self.schema)
+
+        logger.info('__prepare_incidents_df() - normalized df column values ' + str(normalised_df.columns.to_list()))
+
+        if 'alertInfo.anomalyAlertingConfigurationId' not in normalised_df or 'callBackUrl' not in normalised_df:
+            return pd.DataFrame([], columns=self.schema)
+
+        self.metrics_advisor_api_client = self.__get_metrics_advisor_api_client()
+        if FEED_NAME_CACHE_WARM_UP:
+            self.__warm_up_feed_names()
+
+        # fetch the incidents of all alerts concurrently
+        incidents_per_alert = self.__map_concurrently(
+            self.__load_incidents, normalised_df["callBackUrl"].to_list())
+        incidents = [incident for alert_incidents in incidents_per_alert for incident in alert_incidents]
+        if not incidents:
+            return pd.DataFrame([], columns=self.schema)
+
+        logger.info("__prepare_incidents_df() : preparing %s incidents" % str(len(incidents)))
+
+        # repeat the alert fields once per incident of the alert
+        alert_positions = np.repeat(
+            np.arange(len(normalised_df.index)), [len(alert_incidents) for alert_incidents in incidents_per_alert])
+        alerts_df = normalised_df.iloc[alert_positions]
+
+        # `rootNode.dimension` is kept as a dict
+        incidents_df = pd.json_normalize(incidents, max_level=1)
+        data_feed_ids = incidents_df["dataFeedId"]
+
+        # fetch the names of all new data feeds concurrently
+        unique_data_feed_ids = data_feed_ids.drop_duplicates().to_list()
+        feed_names = dict(zip(
+            unique_data_feed_ids, self.__map_concurrently(self.__get_feed_name, unique_data_feed_ids)))
+
+        return pd.DataFrame({
+            "incident_id": incidents_df["incidentId"].to_numpy(),
+            "alert_id": alerts_df["alertInfo.alertId"].to_numpy(),
+            "severity": self.__get_incident_column(incidents_df, "property.maxSeverity").fillna("").to_numpy(),
+            "data_feed_id": data_feed_ids.to_numpy(),
+            "data_feed_name": data_feed_ids.map(feed_names).to_numpy(),
+            "actual_value": self.__get_rounded_column(incidents_df, "property.valueOfRootNode"),
+            "expected_value": self.__get_rounded_column(incidents_df, "property.expectedValueOfRootNode"),
+            "dimension": self.__get_dimension_column(incidents_df),
+            "timestamp": alerts_df["alertInfo.timestamp"].to_numpy(),
+        }, columns=self.schema)
+
+    def __get_incident_column(self, incidents_df: pd.DataFrame, column: str) -> pd.Series:
+        """Get incident column
 
         Args:
-            incident (dict): Incident
-            sudproperty (str): subproperty
+            incidents_df (pd.DataFrame): normalized incidents
+            column (str): column name, e.g. `property.maxSeverity`
 
         Returns:
-            str: Incident field
+            pd.Series: column, or empty values if no incident has the field
         """
-        if "property" in incident and sudproperty in incident["property"]:
-            return incident["property"][sudproperty]
+        if column in incidents_df:
+            return incidents_df[column]
 
-        return ""
-    
-    def __get_incident_dimension(self, incident: dict) -> str: 
+        return pd.Series(None, index=incidents_df.index, dtype="object")
+
+    def __get_rounded_column(self, incidents_df: pd.DataFrame, column: str) -> pd.Series:
+        """Get incident values rounded to integers
+
+        Args:
+            incidents_df (pd.DataFrame): normalized incidents
+            column (str): column name, e.g. `property.valueOfRootNode`
+
+        Returns:
+            pd.Series: rounded values, missing values are <NA>
+        """
+        values = pd.to_numeric(self.__get_incident_column(incidents_df, column), errors="coerce")
+        return values.round().astype("Int64")
+
+    def __get_dimension_column(self, incidents_df: pd.DataFrame) -> List[str]:
         """Get incident dimensions
 
         Args:
-            incident (dict): incident
-            subproperty (str): dimenion_subproperty
+            incidents_df (pd.DataFrame): normalized incidents
 
         Returns:
-            string: incident dimension value
+            List[str]: incident dimension JSON strings, empty if the incident has none
         """
-        
-        if "rootNode" in incident and "dimension" in incident['rootNode']:
-            return json.dumps(incident['rootNode']['dimension'])
-    
-        return ""
-        
+        return [
+            json.dumps(dimension) if isinstance(dimension, dict) else ""
+            for dimension in self.__get_incident_column(incidents_df, "rootNode.dimension")
+        ]
 
     def __get_feed_name(self, data_feed_id: str) -> str:
         """Get feed name
-        Cached in local variable
+        Cached across invocations, concurrent lookups of the same feed only call the API once
 
         Args:
             data_feed_id (str): Data feed id
@@ -211,8 +299,22 @@ class HookHandler:
         Returns:
             str: feed name
         """
-        if data_feed_id not in self.loaded_feeds.keys():
-            self.loaded_feeds[data_feed_id] = self.metrics_advisor_api_client \
-                .get_data_feed_name_by_id(data_feed_id)
+        return self.feed_name_cache.get_or_load(
+            data_feed_id,
+            lambda: self.metrics_advisor_api_client.get_data_feed_name_by_id(data_feed_id)
+        )
 
-        return self.loaded_feeds[data_feed_id]
+    def __warm_up_feed_names(self) -> None:
+        """Fill the feed name cache with all data feeds in one call, once per cache TTL"""
+        cls = type(self)
+        with cls.feed_names_warm_up_lock:
+            if cls.feed_names_warmed_up_at is not None and \
+                    time.monotonic() - cls.feed_names_warmed_up_at < self.feed_name_cache.ttl_seconds:
+                return
+
+            try:
+                self.feed_name_cache.set_many(self.metrics_advisor_api_client.list_data_feed_names())
+                cls.feed_names_warmed_up_at = time.monotonic()
+            except Exception as e:
+                # names are still loaded one by one on cache misses
+                logger.warning(f"Feed name cache warm up failed: {e}")
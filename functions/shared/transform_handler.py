@@ -1,61 +1,161 @@
 import logging
-from typing import Dict
+import queue
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
 
 import azure.functions as func
 import pandas as pd
 from azure.kusto.data.data_format import DataFormat
+from transformations.event_context import EventContext
 from transformations.index import get_transformations
 from transformations.transform import Transform
-from utils.settings import CLUSTER_URI, DB_NAME, MANAGED_CLIENT_ID
+from utils.compression import DecompressedStream
+from utils.dictionary_encoding import concat_frames, encode_dictionary_columns
+from utils.settings import (
+    CLUSTER_URI,
+    COALESCE_INGESTION,
+    DB_NAME,
+    DEDUP_ENABLED,
+    INGESTION_GZIP_LEVEL,
+    INGESTION_MAX_CONCURRENCY,
+    MANAGED_CLIENT_ID,
+    PARQUET_INGESTION_TABLES,
+    QUEUED_INGESTION_TABLES,
+    STREAM_BATCH_SIZE,
+    STREAM_BLOB_INPUT,
+    STREAM_CHUNK_SIZE,
+    STREAM_INGEST_BATCHES,
+    STREAM_QUEUE_SIZE,
+    TRANSFORM_POOL_SIZE,
+    TRANSFORM_SHARD_SIZE,
+)
 
-from .kusto_service_client import KustoServiceClient
+from .event_deduplicator import event_deduplicator, get_blob_identity
+from .event_stream_reader import EventStreamReader
+from .ingestion_coalescer import ingestion_coalescer
+from .invocation_metrics import InvocationMetrics
+from .kusto_client_pool import kusto_client_pool
+from .kusto_service_client import QUEUED_INGESTION, STREAMING_INGESTION, KustoServiceClient
+from .transform_pool import transform_pool
 
 logger = logging.getLogger("TransformHandler")
 
+# frames of a streamed batch and the event ids to commit once they are ingested, by table name
+IngestBatch = Tuple[Dict[str, pd.DataFrame], Dict[str, List[str]]]
+
 
 class TransformHandler:
-    def __init__(self, blob_input: func.InputStream):
-        self.json_string = self.__get_json_string(blob_input)
-        self.kusto_clients = {}
-        
-    def __get_kusto_client_by_tablename(self, table_name: str):
-        """Instantiate Kusto client
+    def __init__(self, blob_input: func.InputStream, events: Optional[list] = None):
+        """Constructor
+
+        Args:
+            blob_input (func.InputStream): blob Input Stream
+            events (Optional[list]): already parsed events of `blob_input`, which is then not read,
+                e.g. the events of several blobs combined by BatchIngestionHandler
+        """
+        self.blob_input = blob_input
+        self.events = events
+        # per stage timings and counters, emitted once the request is handled
+        self.metrics = InvocationMetrics("transform_handler", blob=blob_input.name)
+        # in streaming mode the blob is parsed in batches by handle_transform_request
+        self.json_string = (
+            None if STREAM_BLOB_INPUT or events is not None else self.__get_json_string(blob_input)
+        )
+        # clients used by this invocation, taken from the process wide pool
+        self.kusto_clients: Dict[str, KustoServiceClient] = {}
+        # Kusto column types of each destination table, declared by its transform
+        self.column_types: Dict[str, Dict[str, str]] = {}
+        # dictionary encoded columns of each raw table, re-encoded after merging the shards of worker processes
+        self.dictionary_columns: Dict[Optional[str], List[str]] = {}
+        # transforms with a rollup table, by the table of their raw rows
+        self.rollup_transforms: Dict[str, Transform] = {}
+        # event ids kept by the invocation, committed to the deduplicator per table once ingested
+        self.event_ids: Set[str] = set()
+        # raw and rollup tables of all transformations, the tables events are deduplicated for
+        self.destination_tables: Optional[List[str]] = None
+        self.blob_identity = get_blob_identity(blob_input.name, blob_input.length)
+
+    def __get_kusto_client_by_tablename(self, table_name: str) -> KustoServiceClient:
+        """Get pooled Kusto client
 
         Args:
             table_name (str): destination table name
 
         Returns:
-            IngestionProperties: destination table name
+            KustoServiceClient: client of the destination table
         """
         if table_name not in self.kusto_clients:
-            self.kusto_clients[table_name] = KustoServiceClient(
+            self.kusto_clients[table_name] = kusto_client_pool.get_client(
                 cluster_uri=CLUSTER_URI,
                 client_id=MANAGED_CLIENT_ID,
                 db_name=DB_NAME,
-                table_name=destination_table,
-                data_format=DataFormat.CSV,
+                table_name=table_name,
+                data_format=DataFormat.PARQUET
+                if table_name in PARQUET_INGESTION_TABLES
+                else DataFormat.CSV,
+                ingestion_mode=QUEUED_INGESTION
+                if table_name in QUEUED_INGESTION_TABLES
+                else STREAMING_INGESTION,
+                column_types=self.column_types.get(table_name),
+                compression_level=INGESTION_GZIP_LEVEL,
             )
         return self.kusto_clients[table_name]
         
     def handle_transform_request(self):
         """Handle the incoming Request to the Azure Function."""
-        transformations = get_transformations(json_string=self.json_string)
-        frames_dict = self.__get_dataframe_dict(transformations)
+        try:
+            self.__handle_transform_request()
+        finally:
+            self.metrics.emit()
+
+    def __handle_transform_request(self):
+        """Transform the blob and ingest the Data Frames of all tables"""
+        if DEDUP_ENABLED and self.blob_identity and event_deduplicator.is_duplicate_blob(self.blob_identity):
+            logger.info(f"Blob {self.blob_identity} was already ingested. Exiting Function.")
+            self.metrics.add("duplicate_blobs", 1)
+            return
+
+        is_streamed = STREAM_BLOB_INPUT and self.events is None
+        if is_streamed and STREAM_INGEST_BATCHES:
+            self.__ingest_streamed_batches()
+            self.__commit_blob()
+            logger.info("Azure Function Completed")
+            return
+
+        if is_streamed:
+            frames_dict, rollup_sources, event_ids = self.__get_streamed_dataframe_dict()
+        else:
+            if self.events is not None:
+                events = self.events
+            else:
+                # parse the blob once and share it between all transformations, a malformed blob fails
+                # the invocation before it is remembered by the deduplicator
+                with self.metrics.stage("parse"):
+                    events = EventContext.from_json_string(self.json_string, strict=True).events
+            self.metrics.add("events", self.__count_events(events))
+            frames_dict, rollup_sources, event_ids = self.__transform_events(events, allow_shards=True)
+        frames_dict.update(self.__get_rollup_dataframe_dict(rollup_sources))
         if not frames_dict:
             logger.error("Frames Dict is Empty. Exiting Function.")
+            self.__commit_event_ids(event_ids, event_ids)
+            self.__commit_blob()
             return
 
+        ingest_frames: Dict[str, pd.DataFrame] = {}
         for table, frame in frames_dict.items():
             if frame.empty or not table:
                 logger.debug(f"Frame is Empty or Table is not defined. Continuing")
                 continue
-            self.__ingest_data_frame(frame, table)
-            logger.info(f"Ingested Frames to Table: {table}")
+            ingest_frames[table] = frame
+
+        self.__ingest_data_frames(ingest_frames, event_ids)
+        self.__commit_blob()
 
         logger.info("Azure Function Completed")
 
     def __get_json_string(self, input: func.InputStream) -> str:
-        """Convert Input Stream to JSON String
+        """Convert Input Stream to JSON String, decompressing gzip or zstd compressed blobs
 
         Args:
             input (func.InputStream): blob Input Stream
@@ -63,21 +163,175 @@ class TransformHandler:
         Returns:
             str: Returns JSON String
         """
-        return input.read().decode("utf-8")
+        with self.metrics.stage("read"):
+            stream = DecompressedStream(input)
+            data = stream.read()
+        self.metrics.add("blob_bytes", stream.bytes_read)
+        return data.decode("utf-8")
+
+    def __transform_events(
+        self, events: Union[list, dict], allow_shards: bool = False
+    ) -> Tuple[Dict[str, pd.DataFrame], Dict[str, pd.DataFrame], Dict[str, List[str]]]:
+        """Transform events for every table. With DEDUP_ENABLED a table only receives the events
+        it has not ingested yet, e.g. when an invocation that failed for some tables is retried.
+
+        Args:
+            events (Union[list, dict]): parsed events
+            allow_shards (bool): transform large blobs in the transform pool
+
+        Returns:
+            Tuple[Dict[str, pd.DataFrame], Dict[str, pd.DataFrame], Dict[str, List[str]]]: frames to ingest
+                by table name, frames to roll up by the table name of their raw rows, and the event ids
+                to commit by destination table once ingested
+        """
+        if not DEDUP_ENABLED:
+            frames_dict = self.__get_frames(events, allow_shards)
+            return frames_dict, frames_dict, {}
+
+        with self.metrics.stage("deduplicate"):
+            partitions = event_deduplicator.partition_events(events, self.__get_destination_tables(), self.event_ids)
+        kept = sum(len(partition_events) for _, partition_events, _ in partitions)
+        self.metrics.add("duplicate_events", self.__count_events(events) - kept)
+
+        # every raw table is reported, also if all of its events were already ingested
+        rollup_tables = {transform.rollup_table for transform in self.rollup_transforms.values()}
+        raw_frames: Dict[str, List[pd.DataFrame]] = {
+            table: [] for table in self.__get_destination_tables() if table not in rollup_tables
+        }
+        rollup_frames: Dict[str, List[pd.DataFrame]] = {}
+        event_ids: Dict[str, List[str]] = {}
+        for tables, partition_events, partition_ids in partitions:
+            self.event_ids.update(partition_ids)
+            for table, frame in self.__get_frames(partition_events, allow_shards).items():
+                if table in tables:
+                    self.__append_frame(raw_frames, table, frame)
+                rollup_transform = self.rollup_transforms.get(table)
+                if rollup_transform is not None and rollup_transform.rollup_table in tables:
+                    self.__append_frame(rollup_frames, table, frame)
+            for table in tables:
+                event_ids.setdefault(table, []).extend(partition_ids)
+
+        return (
+            {table: self.__concat_table_frames(table_frames) for table, table_frames in raw_frames.items()},
+            {table: self.__concat_table_frames(table_frames) for table, table_frames in rollup_frames.items()},
+            event_ids,
+        )
+
+    def __get_frames(self, events: Union[list, dict], allow_shards: bool) -> Dict[str, pd.DataFrame]:
+        """Run every transformation over events, sharing one EventContext
+
+        Args:
+            events (Union[list, dict]): parsed events
+            allow_shards (bool): transform more than `TRANSFORM_SHARD_SIZE` events in the transform pool
+
+        Returns:
+            Dict[str, pd.DataFrame]: Dict[table_name, data_frame]
+        """
+        if allow_shards and TRANSFORM_POOL_SIZE and self.__count_events(events) > TRANSFORM_SHARD_SIZE:
+            return self.__get_sharded_dataframe_dict(events)
+
+        context = EventContext(events)
+        frames_dict = self.__get_dataframe_dict(get_transformations(json_data=context))
+        self.metrics.add_duration("normalize", context.normalize_ms)
+        return frames_dict
+
+    def __get_destination_tables(self) -> List[str]:
+        """Get the raw and rollup tables of all transformations
+
+        Returns:
+            List[str]: configured destination tables
+        """
+        if self.destination_tables is None:
+            # transforms without events only provide the column types and rollups of every table
+            for transform in get_transformations(json_data=EventContext([])):
+                self.__register_transform(transform)
+            self.destination_tables = [table for table in self.column_types if table]
+        return self.destination_tables
+
+    def __commit_event_ids(self, event_ids: Dict[str, List[str]], tables: Iterable[str]) -> None:
+        """Remember the events ingested into tables, the other tables of a failed invocation
+        are not committed so its retry only ingests into them.
+
+        Args:
+            event_ids (Dict[str, List[str]]): event ids by destination table
+            tables (Iterable[str]): ingested tables
+        """
+        if DEDUP_ENABLED:
+            for table in tables:
+                if event_ids.get(table):
+                    event_deduplicator.commit(table, event_ids[table])
+
+    def __commit_blob(self) -> None:
+        """Remember the blob once all of its events are ingested"""
+        if DEDUP_ENABLED and self.blob_identity:
+            event_deduplicator.commit_blob(self.blob_identity)
+
+    def __ingest_data_frames(
+        self, frames_dict: Dict[str, pd.DataFrame], event_ids: Optional[Dict[str, List[str]]] = None
+    ) -> None:
+        """Ingest the Data Frames of all tables concurrently.
+        A failing table does not stop the ingestion of the other tables.
+
+        Args:
+            frames_dict (Dict[str, pd.DataFrame]): Dict[table_name, data_frame]
+            event_ids (Optional[Dict[str, List[str]]]): event ids of the frames by table, committed once
+                the table is ingested. Tables without a frame had nothing to ingest and are committed at once
+
+        Raises:
+            Exception: ingestion to at least one table failed
+        """
+        event_ids = event_ids or {}
+        self.__commit_event_ids(event_ids, [table for table in event_ids if table not in frames_dict])
+        if not frames_dict:
+            return
+
+        kusto_clients = {
+            table: self.__get_kusto_client_by_tablename(table) for table in frames_dict
+        }
+        max_workers = max(1, min(INGESTION_MAX_CONCURRENCY, len(frames_dict)))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                table: executor.submit(self.__ingest_data_frame, kusto_clients[table], frame)
+                for table, frame in frames_dict.items()
+            }
+
+        failed_tables = []
+        for table, future in futures.items():
+            error = future.exception()
+            if error:
+                logger.error(f"Failed to Ingest Frames to Table: {table}. {error}")
+                self.metrics.add_table(table, ingest_failures=1)
+                failed_tables.append(table)
+                continue
+            self.__commit_event_ids(event_ids, [table])
+            logger.info(f"Ingested Frames to Table: {table} in {future.result():.0f} ms")
+
+        if failed_tables:
+            raise Exception("Ingestion failed for tables: " + ", ".join(failed_tables))
 
     def __ingest_data_frame(
         self,
+        kusto_client: KustoServiceClient,
         blob_data_frame: pd.DataFrame,
-        destination_table: str,
-    ) -> None:
+    ) -> float:
         """Ingest Data Frame to Kusto
 
         Args:
+            kusto_client (KustoServiceClient): client of the Kusto Table that maps to the dataframe
             blob_data_frame (pd.DataFrame): dataframe to ingest
-            destination_table (str): Kusto Table that maps to the dataframe
+
+        Returns:
+            float: ingestion latency in milliseconds
         """
-        
-        self.__get_kusto_client_by_tablename(destination_table).ingest_data_frame(blob_data_frame)
+        start = time.perf_counter()
+        if COALESCE_INGESTION:
+            # waits until the rows, coalesced with those of concurrent invocations, are ingested
+            uploaded_bytes = ingestion_coalescer.ingest(kusto_client, blob_data_frame)
+        else:
+            uploaded_bytes = kusto_client.ingest_data_frame(blob_data_frame)
+        latency = (time.perf_counter() - start) * 1000
+        self.metrics.add_table(kusto_client.table_name, uploaded_bytes=uploaded_bytes, ingest_ms=latency)
+        return latency
 
     def __get_dataframe_dict(
         self, transforms: list[Transform]
@@ -93,7 +347,274 @@ class TransformHandler:
         """
         frames_dict: Dict[str, pd.DataFrame] = {}
         for transform in transforms:
-            data_frame = transform.get_dataframe()
+            table = transform.table or type(transform).__name__
+            with self.metrics.stage("transform", table):
+                data_frame = transform.get_dataframe()
+            self.metrics.add_table(table, rows_in=self.__count_events(transform.get_events()), rows_out=len(data_frame.index))
             frames_dict[transform.table] = data_frame
+            self.__register_transform(transform)
 
         return frames_dict
+
+    def __get_sharded_dataframe_dict(self, events: list) -> Dict[str, pd.DataFrame]:
+        """Get Dictionary of table names to corresponding Data Frames, transforming shards
+        of `TRANSFORM_SHARD_SIZE` events in the worker processes of the transform pool
+
+        Args:
+            events (list): parsed events of the blob
+
+        Returns:
+            Dict[str, pd.DataFrame]: Dict[table_name, data_frame]
+        """
+        self.__get_destination_tables()
+
+        with self.metrics.stage("transform_shards"):
+            shard_results = transform_pool.map_shards(events, TRANSFORM_SHARD_SIZE)
+        self.metrics.add("shards", len(shard_results))
+
+        frames_dict: Dict[str, pd.DataFrame] = {}
+        for table in shard_results[0] if shard_results else []:
+            with self.metrics.stage("merge_shards", table or "unconfigured"):
+                data_frame = concat_frames([results[table][0] for results in shard_results])
+                # the shards are encoded by the category registries of the worker processes
+                data_frame = encode_dictionary_columns(data_frame, self.dictionary_columns.get(table, []))
+            rows_in = sum(results[table][1] for results in shard_results)
+            self.metrics.add_table(table or "unconfigured", rows_in=rows_in, rows_out=len(data_frame.index))
+            frames_dict[table] = data_frame
+
+        return frames_dict
+
+    def __register_transform(self, transform: Transform) -> None:
+        """Keep the column types and the rollup of a transformation's table for ingestion
+
+        Args:
+            transform (Transform): transformation of a table
+        """
+        self.column_types[transform.table] = transform.column_types
+        self.dictionary_columns[transform.table] = transform.dictionary_columns
+        if transform.rollup_table:
+            self.rollup_transforms[transform.table] = transform
+            self.column_types[transform.rollup_table] = transform.get_rollup_column_types()
+
+    def __get_rollup_dataframe_dict(self, frames_dict: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        """Aggregate the Data Frames of all tables with a rollup table.
+        In streaming mode the rollups are computed once over the rows of all batches.
+
+        Args:
+            frames_dict (Dict[str, pd.DataFrame]): Dict[table_name, data_frame] of the raw rows
+
+        Returns:
+            Dict[str, pd.DataFrame]: Dict[rollup_table_name, rollup_data_frame]
+        """
+        rollups: Dict[str, pd.DataFrame] = {}
+        for table, transform in self.rollup_transforms.items():
+            data_frame = frames_dict.get(table)
+            if data_frame is None or data_frame.empty:
+                continue
+
+            with self.metrics.stage("rollup", transform.rollup_table):
+                rollup_df = transform.get_rollup_dataframe(data_frame)
+            self.metrics.add_table(transform.rollup_table, rows_in=len(data_frame.index), rows_out=len(rollup_df.index))
+            rollups[transform.rollup_table] = rollup_df
+
+        return rollups
+
+    @staticmethod
+    def __count_events(events: Union[list, dict]) -> int:
+        """Count parsed events, a blob may hold a single event object
+
+        Args:
+            events (Union[list, dict]): parsed events
+
+        Returns:
+            int: number of events
+        """
+        return len(events) if isinstance(events, list) else 1
+
+    def __iter_streamed_dataframe_dicts(
+        self,
+    ) -> Iterator[Tuple[Dict[str, pd.DataFrame], Dict[str, pd.DataFrame], Dict[str, List[str]]]]:
+        """Read the blob in batches and transform each batch of events on its own
+
+        Returns:
+            Iterator[Tuple[Dict[str, pd.DataFrame], Dict[str, pd.DataFrame], Dict[str, List[str]]]]: frames
+                to ingest, frames to roll up and event ids of each batch, see #__transform_events
+        """
+        reader = EventStreamReader(
+            self.blob_input, batch_size=STREAM_BATCH_SIZE, chunk_size=STREAM_CHUNK_SIZE
+        )
+        batches = reader.iter_batches()
+        while True:
+            # reading and parsing the blob are interleaved in streaming mode
+            with self.metrics.stage("parse"):
+                events = next(batches, None)
+            if events is None:
+                break
+            self.metrics.add("events", len(events))
+            yield self.__transform_events(events)
+        self.metrics.add("blob_bytes", reader.bytes_read)
+
+    def __get_streamed_dataframe_dict(
+        self,
+    ) -> Tuple[Dict[str, pd.DataFrame], Dict[str, pd.DataFrame], Dict[str, List[str]]]:
+        """Get Dictionary of table names to Data Frames by reading the blob in batches.
+        Each batch of events is transformed on its own so only the filtered rows
+        of the blob are kept in memory.
+
+        Returns:
+            Tuple[Dict[str, pd.DataFrame], Dict[str, pd.DataFrame], Dict[str, List[str]]]: frames to ingest,
+                frames to roll up and event ids of the whole blob, see #__transform_events
+        """
+        frames: Dict[str, List[pd.DataFrame]] = {}
+        rollup_frames: Dict[str, List[pd.DataFrame]] = {}
+        # tables whose rollup is not computed from the ingested rows, after a partially failed invocation
+        separate_rollups: Set[str] = set()
+        event_ids: Dict[str, List[str]] = {}
+        for frames_dict, rollup_sources, batch_event_ids in self.__iter_streamed_dataframe_dicts():
+            for table, frame in frames_dict.items():
+                self.__append_frame(frames, table, frame)
+            for table, frame in rollup_sources.items():
+                if not frame.empty and frame is not frames_dict.get(table):
+                    separate_rollups.add(table)
+                self.__append_frame(rollup_frames, table, frame)
+            for table, ids in batch_event_ids.items():
+                event_ids.setdefault(table, []).extend(ids)
+
+        frames_dict = {table: self.__concat_table_frames(table_frames) for table, table_frames in frames.items()}
+        rollup_sources = {
+            table: frames_dict[table]
+            if table in frames_dict and table not in separate_rollups
+            else self.__concat_table_frames(table_frames)
+            for table, table_frames in rollup_frames.items()
+        }
+        return frames_dict, rollup_sources, event_ids
+
+    @staticmethod
+    def __append_frame(frames: Dict[str, List[pd.DataFrame]], table: str, frame: pd.DataFrame) -> None:
+        """Keep the frame of a batch, empty frames only register the table
+
+        Args:
+            frames (Dict[str, List[pd.DataFrame]]): kept frames by table name
+            table (str): table name
+            frame (pd.DataFrame): frame of the batch
+        """
+        table_frames = frames.setdefault(table, [])
+        if not frame.empty:
+            table_frames.append(frame)
+
+    @staticmethod
+    def __concat_table_frames(table_frames: List[pd.DataFrame]) -> pd.DataFrame:
+        """Combine the frames of a table
+
+        Args:
+            table_frames (List[pd.DataFrame]): non empty frames of the batches
+
+        Returns:
+            pd.DataFrame: combined frame, empty if no batch had rows
+        """
+        if len(table_frames) == 1:
+            return table_frames[0]
+        return concat_frames(table_frames) if table_frames else pd.DataFrame({})
+
+    def __ingest_streamed_batches(self) -> None:
+        """Read, transform and ingest the blob batch by batch.
+        Batches are ingested by a background thread while the next batch is parsed. At most
+        `STREAM_QUEUE_SIZE` transformed batches wait for ingestion, parsing blocks when the
+        queue is full, so memory is bounded by the batch size instead of the blob size.
+        The rollups are aggregated batch by batch, only the counts, sums and quantile sketches
+        of each bucket are kept until the whole blob is read.
+
+        Raises:
+            Exception: ingestion of a batch failed, the remaining batches are not parsed
+        """
+        batches: "queue.Queue[Optional[IngestBatch]]" = queue.Queue(maxsize=STREAM_QUEUE_SIZE)
+        # partial rollups of the batches read so far, by the table of their raw rows
+        partial_rollups: Dict[str, pd.DataFrame] = {}
+        # the ids of the rollup tables are committed once the rollups of the whole blob are ingested
+        rollup_event_ids: Dict[str, List[str]] = {}
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            ingestion = executor.submit(self.__consume_batches, batches)
+            try:
+                for frames_dict, rollup_sources, event_ids in self.__iter_streamed_dataframe_dicts():
+                    rollup_tables = {transform.rollup_table for transform in self.rollup_transforms.values()}
+                    ingest_frames = {
+                        table: frame for table, frame in frames_dict.items() if table and not frame.empty
+                    }
+                    self.__aggregate_rollups(rollup_sources, partial_rollups)
+                    for table in rollup_tables.intersection(event_ids):
+                        rollup_event_ids.setdefault(table, []).extend(event_ids.pop(table))
+                    self.metrics.add("batches", 1)
+                    if not self.__put_batch(batches, (ingest_frames, event_ids), ingestion):
+                        break
+            finally:
+                self.__put_batch(batches, None, ingestion)
+        # raises the ingestion error
+        ingestion.result()
+
+        rollups: Dict[str, pd.DataFrame] = {}
+        for table, partial_df in partial_rollups.items():
+            transform = self.rollup_transforms[table]
+            with self.metrics.stage("rollup", transform.rollup_table):
+                rollup_df = transform.finalize_rollup_dataframe(partial_df)
+            self.metrics.add_table(transform.rollup_table, rows_out=len(rollup_df.index))
+            if not rollup_df.empty:
+                rollups[transform.rollup_table] = rollup_df
+        self.__ingest_data_frames(rollups, rollup_event_ids)
+
+    def __consume_batches(self, batches: "queue.Queue[Optional[IngestBatch]]") -> None:
+        """Ingest queued batches until the end of the blob, committing the event ids of each ingested table
+
+        Args:
+            batches (queue.Queue[Optional[IngestBatch]]): transformed batches, None ends the blob
+        """
+        while True:
+            batch = batches.get()
+            if batch is None:
+                break
+            frames_dict, event_ids = batch
+            with self.metrics.stage("ingest"):
+                self.__ingest_data_frames(frames_dict, event_ids)
+
+    @staticmethod
+    def __put_batch(
+        batches: "queue.Queue[Optional[IngestBatch]]",
+        batch: Optional[IngestBatch],
+        ingestion: Future,
+    ) -> bool:
+        """Queue a batch, waiting while the queue is full
+
+        Args:
+            batches (queue.Queue[Optional[IngestBatch]]): transformed batches
+            batch (Optional[IngestBatch]): frames and event ids of a batch, None to end the blob
+            ingestion (Future): ingestion thread
+
+        Returns:
+            bool: False if the ingestion thread stopped and the batch was not queued
+        """
+        while not ingestion.done():
+            try:
+                batches.put(batch, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+
+        return False
+
+    def __aggregate_rollups(
+        self, frames_dict: Dict[str, pd.DataFrame], partial_rollups: Dict[str, pd.DataFrame]
+    ) -> None:
+        """Merge the rollup aggregates of a batch into the partial rollups of the blob
+
+        Args:
+            frames_dict (Dict[str, pd.DataFrame]): Dict[table_name, data_frame] of the batch
+            partial_rollups (Dict[str, pd.DataFrame]): partial rollups by table name, updated in place
+        """
+        for table, transform in self.rollup_transforms.items():
+            data_frame = frames_dict.get(table)
+            if data_frame is None:
+                continue
+            with self.metrics.stage("rollup", transform.rollup_table):
+                partial_rollups[table] = transform.get_partial_rollup_dataframe(
+                    data_frame, partial_rollups.get(table)
+                )
+            self.metrics.add_table(transform.rollup_table, rows_in=len(data_frame.index))
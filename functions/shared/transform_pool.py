@@ -0,0 +1,109 @@
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+from transformations.event_context import EventContext
+from transformations.index import get_transformations
+from utils.settings import TRANSFORM_POOL_SIZE, TRANSFORM_POOL_START_METHOD
+
+logger = logging.getLogger("TransformPool")
+
+# {table: (data_frame, rows_in)} of the transforms of one shard, the table is None if not configured
+ShardResult = Dict[Optional[str], Tuple[pd.DataFrame, int]]
+
+
+def transform_shard(events: list) -> ShardResult:
+    """Run every transformation over a shard of events, in a worker process
+
+    Args:
+        events (list): shard of the parsed events of a blob
+
+    Returns:
+        ShardResult: data frame and routed events of each table
+    """
+    results: ShardResult = {}
+    for transform in get_transformations(json_data=EventContext(events)):
+        routed_events = transform.get_events()
+        rows_in = len(routed_events) if isinstance(routed_events, list) else 1
+        results[transform.table] = (transform.get_dataframe(), rows_in)
+    return results
+
+
+class TransformPool:
+    """Process wide pool of transform worker processes.
+
+    `pd.json_normalize` and the pandas transformations hold the GIL, so a large blob only uses
+    one core of the worker. The pool splits the events into shards that are transformed in
+    parallel processes. It is started on first use and kept for the lifetime of the worker,
+    so only the first large blob pays for starting the processes.
+
+    The parsed events of every shard are pickled to a worker process and its DataFrames are
+    pickled back, so the host still spends time proportional to the blob on serialization,
+    and holds the events and the pickled shards in memory while they are transformed. The
+    pool pays off when the transforms take much longer than pickling the events.
+
+    ### Transform the shards of a blob in parallel
+    results = transform_pool.map_shards(events, shard_size=50000)
+    """
+
+    def __init__(self, size: int, start_method: str = "spawn") -> None:
+        """Constructor
+
+        Args:
+            size (int): worker processes
+            start_method (str): multiprocessing start method, `spawn` does not copy the threads of the host
+        """
+        self.size = size
+        self.start_method = start_method
+        self.__executor: Optional[ProcessPoolExecutor] = None
+        self.__lock = threading.Lock()
+
+    def map_shards(self, events: list, shard_size: int) -> List[ShardResult]:
+        """Transform the events in shards of `shard_size` events
+
+        Args:
+            events (list): parsed events of a blob, pickled shard by shard to the worker processes
+            shard_size (int): events per shard
+
+        Raises:
+            BrokenProcessPool: a worker process died, the pool is restarted on next use
+
+        Returns:
+            List[ShardResult]: results in shard order
+        """
+        shards = [events[start:start + shard_size] for start in range(0, len(events), shard_size)]
+        executor = self.__get_executor()
+        try:
+            return list(executor.map(transform_shard, shards))
+        except BrokenProcessPool:
+            logger.error("Transform worker process died, restarting the pool on next use")
+            self.shutdown()
+            raise
+
+    def shutdown(self) -> None:
+        """Stop the worker processes"""
+        with self.__lock:
+            executor, self.__executor = self.__executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def __get_executor(self) -> ProcessPoolExecutor:
+        """Get the executor, starting it on first use
+
+        Returns:
+            ProcessPoolExecutor: executor
+        """
+        with self.__lock:
+            if self.__executor is None:
+                logger.info(f"Starting {self.size} transform worker processes")
+                self.__executor = ProcessPoolExecutor(
+                    max_workers=self.size, mp_context=multiprocessing.get_context(self.start_method)
+                )
+            return self.__executor
+
+
+transform_pool = TransformPool(TRANSFORM_POOL_SIZE, TRANSFORM_POOL_START_METHOD)
@@ -0,0 +1,143 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class TTLCache:
+    """Thread safe cache with time to live expiry and least recently used eviction.
+
+    Concurrent misses of the same key are de-duplicated: only one caller runs the
+    loader and the others wait for its result.
+
+    ### Load a value once per `ttl_seconds`
+    cache = TTLCache(max_size=1024, ttl_seconds=3600)
+    name = cache.get_or_load(data_feed_id, lambda: client.get_data_feed_name_by_id(data_feed_id))
+    """
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 3600) -> None:
+        """Constructor
+
+        Args:
+            max_size (int): maximum number of entries, the least recently used entry is evicted first
+            ttl_seconds (float): seconds an entry is served before it is loaded again
+        """
+        self.max_size = max(1, max_size)
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.__entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self.__loading: Dict[Hashable, Future] = {}
+        self.__lock = threading.Lock()
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Get a cached value, calling `loader` on a miss or after expiry
+
+        Args:
+            key (Hashable): cache key
+            loader (Callable[[], Any]): loads the value of `key`
+
+        Returns:
+            Any: cached or loaded value
+        """
+        with self.__lock:
+            found, value = self.__get_entry(key)
+            if found:
+                self.hits += 1
+                return value
+
+            self.misses += 1
+            future = self.__loading.get(key)
+            is_loader = future is None
+            if is_loader:
+                future = Future()
+                self.__loading[key] = future
+
+        if not is_loader:
+            return future.result()
+
+        try:
+            value = loader()
+        except BaseException as err:
+            with self.__lock:
+                del self.__loading[key]
+            future.set_exception(err)
+            raise
+
+        with self.__lock:
+            self.__set_entry(key, value)
+            del self.__loading[key]
+        future.set_result(value)
+        return value
+
+    def set_many(self, values: Dict[Hashable, Any]) -> None:
+        """Store several values at once, e.g. to warm up the cache
+
+        Args:
+            values (Dict[Hashable, Any]): {key: value}
+        """
+        with self.__lock:
+            for key, value in values.items():
+                self.__set_entry(key, value)
+
+    def get_stats(self) -> dict:
+        """Get cache counters
+
+        Returns:
+            dict: hits, misses, evictions, size and hit_rate
+        """
+        with self.__lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self.__entries),
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters"""
+        with self.__lock:
+            self.__entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    # PRIVATE
+
+    def __get_entry(self, key: Hashable) -> Tuple[bool, Any]:
+        """Look up a live entry and mark it as recently used. Caller must hold the lock.
+
+        Args:
+            key (Hashable): cache key
+
+        Returns:
+            Tuple[bool, Any]: whether a live entry was found and its value
+        """
+        entry = self.__entries.get(key)
+        if entry is None:
+            return False, None
+
+        value, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del self.__entries[key]
+            return False, None
+
+        self.__entries.move_to_end(key)
+        return True, value
+
+    def __set_entry(self, key: Hashable, value: Any) -> None:
+        """Store an entry, evicting the least recently used ones. Caller must hold the lock.
+
+        Args:
+            key (Hashable): cache key
+            value (Any): value
+        """
+        self.__entries[key] = (value, time.monotonic() + self.ttl_seconds)
+        self.__entries.move_to_end(key)
+        while len(self.__entries) > self.max_size:
+            self.__entries.popitem(last=False)
+            self.evictions += 1
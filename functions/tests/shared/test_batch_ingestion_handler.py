@@ -0,0 +1,95 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from shared.batch_ingestion_handler import BatchIngestionHandler, get_blob_source
+from shared.blob_source import LocalBlobSource
+
+
+class TestBatchIngestionHandler(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.names = []
+        for index in range(5):
+            name = f"2022/05/31/{index}.json"
+            path = os.path.join(self.directory.name, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump([{"event_id": f"{index}-{event}"} for event in range(2)], file)
+            self.names.append(name)
+        self.source = LocalBlobSource(self.directory.name)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    @patch("shared.batch_ingestion_handler.TransformHandler")
+    def test_handle_combines_blobs(self, mock_transform_handler):
+        """Test consecutive blobs are combined into batches of `max_events` events"""
+        handler = BatchIngestionHandler(self.source, self.names, max_events=4, read_concurrency=2)
+
+        stats = handler.handle()
+
+        self.assertEqual(
+            stats, {"blobs": 5, "skipped": 0, "ingested": 5, "remaining": 0, "events": 10, "batches": 3}
+        )
+        batches = [call.kwargs for call in mock_transform_handler.call_args_list]
+        self.assertEqual([len(batch["events"]) for batch in batches], [4, 4, 2])
+        self.assertEqual(batches[0]["events"][0], {"event_id": "0-0"})
+        self.assertEqual(batches[0]["blob_input"].name, "2022/05/31/0.json..2022/05/31/1.json")
+        self.assertEqual(mock_transform_handler.return_value.handle_transform_request.call_count, 3)
+
+    @patch("shared.batch_ingestion_handler.TransformHandler")
+    def test_resume_from_checkpoint(self, mock_transform_handler):
+        """Test a failed run resumes with the blobs that were not ingested"""
+        mock_transform_handler.return_value.handle_transform_request.side_effect = [None, Exception("Kusto")]
+        checkpoint = self.source.get_checkpoint("backfill")
+
+        with self.assertRaises(Exception):
+            BatchIngestionHandler(self.source, self.names, checkpoint=checkpoint, max_events=4).handle()
+        self.assertEqual(checkpoint.load(), set(self.names[:2]))
+
+        mock_transform_handler.return_value.handle_transform_request.side_effect = None
+        stats = BatchIngestionHandler(self.source, self.names, checkpoint=checkpoint, max_events=4).handle()
+
+        self.assertEqual(stats["skipped"], 2)
+        self.assertEqual(stats["ingested"], 3)
+        self.assertEqual(checkpoint.load(), set(self.names))
+
+    @patch("shared.batch_ingestion_handler.TransformHandler")
+    def test_malformed_blob_is_not_checkpointed(self, mock_transform_handler):
+        """Test NDJSON blobs are parsed and a truncated blob fails its batch without being checkpointed"""
+        with open(os.path.join(self.directory.name, "a.ndjson"), "w", encoding="utf-8") as file:
+            file.write('{"event_id": "a-0"}\n{"event_id": "a-1"}\n')
+        with open(os.path.join(self.directory.name, "b.json"), "w", encoding="utf-8") as file:
+            file.write('[{"event_id": "b-0"}, {"event_')
+        checkpoint = self.source.get_checkpoint("backfill")
+
+        with self.assertLogs("EventStreamReader", level="ERROR"):
+            with self.assertRaises(json.decoder.JSONDecodeError):
+                BatchIngestionHandler(
+                    self.source, ["a.ndjson", "b.json"], checkpoint=checkpoint, max_events=2
+                ).handle()
+
+        mock_transform_handler.assert_called_once()
+        self.assertEqual(
+            mock_transform_handler.call_args.kwargs["events"], [{"event_id": "a-0"}, {"event_id": "a-1"}]
+        )
+        self.assertEqual(checkpoint.load(), {"a.ndjson"})
+
+    @patch("shared.batch_ingestion_handler.time.monotonic")
+    @patch("shared.batch_ingestion_handler.TransformHandler")
+    def test_stop_after_max_seconds(self, mock_transform_handler, mock_monotonic):
+        """Test no new blobs are taken after `max_seconds`"""
+        mock_monotonic.side_effect = [0, 0, 0, 100, 100]
+
+        stats = BatchIngestionHandler(self.source, self.names, max_events=2, max_seconds=10).handle()
+
+        self.assertEqual(stats["ingested"], 2)
+        self.assertEqual(stats["remaining"], 3)
+
+    def test_get_blob_source(self):
+        """Test a local directory is used when `BATCH_SOURCE_PATH` is set"""
+        with patch("shared.batch_ingestion_handler.BATCH_SOURCE_PATH", self.directory.name):
+            self.assertIsInstance(get_blob_source(), LocalBlobSource)
@@ -0,0 +1,39 @@
+import os
+import tempfile
+import unittest
+
+from shared.blob_source import LocalBlobSource
+
+
+class TestLocalBlobSource(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        for name in ["2022/05/31/b.json", "2022/05/31/a.json", "2022/06/01/c.json"]:
+            path = os.path.join(self.directory.name, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(f'[{{"event_id": "{name}"}}]')
+        self.source = LocalBlobSource(self.directory.name)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_list_blobs(self):
+        """Test blobs are listed by prefix in name order"""
+        self.assertEqual(self.source.list_blobs(prefix="2022/05/"), ["2022/05/31/a.json", "2022/05/31/b.json"])
+        self.assertEqual(len(self.source.list_blobs()), 3)
+
+    def test_open_blob(self):
+        """Test a blob is opened by name"""
+        with self.source.open_blob("2022/06/01/c.json") as stream:
+            self.assertEqual(stream.read(), b'[{"event_id": "2022/06/01/c.json"}]')
+
+    def test_checkpoint(self):
+        """Test a checkpoint round trips and is not listed as a blob"""
+        checkpoint = self.source.get_checkpoint("backfill")
+        self.assertEqual(checkpoint.load(), set())
+
+        checkpoint.save({"2022/05/31/a.json"})
+
+        self.assertEqual(self.source.get_checkpoint("backfill").load(), {"2022/05/31/a.json"})
+        self.assertEqual(len(self.source.list_blobs()), 3)
@@ -0,0 +1,116 @@
+import unittest
+from unittest.mock import patch
+
+from shared.event_deduplicator import (
+    BloomFilter,
+    EventDeduplicator,
+    RecentKeySet,
+    RotatingBloomFilter,
+    get_blob_identity,
+)
+
+
+class TestBloomFilter(unittest.TestCase):
+    def test_no_false_negatives(self):
+        """Test every added key is reported and few new keys are"""
+        bloom_filter = BloomFilter(capacity=10000, error_rate=0.01)
+        keys = [f"event-{index}" for index in range(10000)]
+
+        bloom_filter.add_many(keys)
+
+        self.assertTrue(bloom_filter.contains_many(keys).all())
+        new_keys = [f"other-{index}" for index in range(10000)]
+        self.assertLess(bloom_filter.contains_many(new_keys).mean(), 0.02)
+
+    def test_rotation(self):
+        """Test the oldest generation is dropped once the current one is full"""
+        bloom_filter = RotatingBloomFilter(capacity=2, error_rate=0.001, window_seconds=3600)
+
+        bloom_filter.add_many(["a", "b"])
+        bloom_filter.add_many(["c"])
+        self.assertEqual(bloom_filter.contains_many(["a", "c"]).tolist(), [True, True])
+        bloom_filter.add_many(["d", "e"])
+
+        self.assertEqual(bloom_filter.rotations, 2)
+        self.assertEqual(bloom_filter.contains_many(["a", "c", "e"]).tolist(), [False, True, True])
+
+    @patch("shared.event_deduplicator.time.monotonic")
+    def test_rotation_window(self, mock_monotonic):
+        """Test keys are forgotten after two windows"""
+        mock_monotonic.return_value = 0
+        bloom_filter = RotatingBloomFilter(capacity=100, error_rate=0.001, window_seconds=60)
+        bloom_filter.add_many(["a"])
+
+        mock_monotonic.return_value = 61
+        self.assertTrue(bloom_filter.contains_many(["a"])[0])
+        mock_monotonic.return_value = 122
+        self.assertFalse(bloom_filter.contains_many(["a"])[0])
+
+
+class TestRecentKeySet(unittest.TestCase):
+    def test_capacity(self):
+        """Test the oldest keys are dropped beyond the capacity and new keys are never reported"""
+        keys = RecentKeySet(capacity=2, window_seconds=60)
+        for key in ["a", "b", "c"]:
+            keys.add(key)
+
+        self.assertEqual([key in keys for key in ["a", "b", "c", "d"]], [False, True, True, False])
+        self.assertEqual(len(keys), 2)
+
+    @patch("shared.event_deduplicator.time.monotonic")
+    def test_window(self, mock_monotonic):
+        """Test keys are forgotten after one window"""
+        mock_monotonic.return_value = 0
+        keys = RecentKeySet(capacity=100, window_seconds=60)
+        keys.add("a")
+
+        mock_monotonic.return_value = 59
+        self.assertIn("a", keys)
+        mock_monotonic.return_value = 61
+        self.assertNotIn("a", keys)
+
+
+class TestEventDeduplicator(unittest.TestCase):
+    def setUp(self) -> None:
+        self.deduplicator = EventDeduplicator(capacity=1000)
+
+    def test_partition_events(self):
+        """Test committed and repeated event ids are dropped and events are grouped by their pending tables"""
+        self.deduplicator.commit("table_a", ["1", "2"])
+        self.deduplicator.commit("table_b", ["1"])
+        events = [{"event_id": "1"}, {"event_id": "2"}, {"event_id": "3"}, {"event_id": "2"}, {}, {"event_id": 3}]
+
+        partitions = self.deduplicator.partition_events(events, tables=["table_a", "table_b"])
+
+        self.assertEqual(
+            partitions,
+            [
+                (frozenset({"table_b"}), [{"event_id": "2"}], ["2"]),
+                (frozenset({"table_a", "table_b"}), [{"event_id": "3"}, {}], ["3"]),
+            ],
+        )
+        self.assertEqual(self.deduplicator.get_stats(), {"duplicate_events": 3, "duplicate_blobs": 0})
+
+    def test_commit_per_table(self):
+        """Test an event committed for one table is still pending for the others"""
+        self.deduplicator.commit("table_a", ["1"])
+
+        partitions = self.deduplicator.partition_events({"event_id": "1"}, tables=["table_a", "table_b", "table_c"])
+
+        self.assertEqual(partitions, [(frozenset({"table_b", "table_c"}), [{"event_id": "1"}], ["1"])])
+
+    def test_pending_ids(self):
+        """Test ids of earlier batches of the invocation are dropped before they are committed"""
+        partitions = self.deduplicator.partition_events({"event_id": 3}, tables=["table_a"], pending_ids={"3"})
+
+        self.assertEqual(partitions, [])
+
+    def test_duplicate_blob(self):
+        """Test a blob is a duplicate once committed"""
+        blob_identity = get_blob_identity("container/blob.json", 1024)
+
+        self.assertFalse(self.deduplicator.is_duplicate_blob(blob_identity))
+        self.deduplicator.commit_blob(blob_identity)
+        self.assertTrue(self.deduplicator.is_duplicate_blob(blob_identity))
+        self.assertFalse(self.deduplicator.is_duplicate_blob(get_blob_identity("container/blob.json", 2048)))
+        self.assertIsNone(get_blob_identity(None, None))
@@ -0,0 +1,111 @@
+import gzip
+import io
+import json
+import unittest
+
+import azure.functions as func
+from shared.event_stream_reader import EventStreamReader
+
+EVENTS = [
+    {"event_id": str(index), "event": {"type": "playback_start", "timestamp": index}}
+    for index in range(7)
+]
+
+
+class TestEventStreamReader(unittest.TestCase):
+    def read_all(self, data: str, batch_size: int = 3, chunk_size: int = 5) -> list:
+        """Read every batch from a string using a small chunk size
+
+        Args:
+            data (str): blob content
+            batch_size (int): events per batch
+            chunk_size (int): bytes per read
+
+        Returns:
+            list: list of batches
+        """
+        reader = EventStreamReader(
+            io.BytesIO(data.encode("utf-8")), batch_size=batch_size, chunk_size=chunk_size
+        )
+        return list(reader.iter_batches())
+
+    def test_json_array(self):
+        """Test a JSON array is split into bounded batches"""
+        batches = self.read_all(json.dumps(EVENTS, indent=4))
+
+        self.assertEqual([len(batch) for batch in batches], [3, 3, 1])
+        self.assertEqual([event for batch in batches for event in batch], EVENTS)
+
+    def test_ndjson(self):
+        """Test newline delimited JSON is parsed line by line"""
+        data = "\n".join(json.dumps(event) for event in EVENTS) + "\n"
+        batches = self.read_all(data)
+
+        self.assertEqual([event for batch in batches for event in batch], EVENTS)
+
+    def test_single_object(self):
+        """Test a single JSON object is returned as one event"""
+        batches = self.read_all(json.dumps(EVENTS[0], indent=2))
+
+        self.assertEqual(batches, [[EVENTS[0]]])
+
+    def test_empty_stream(self):
+        """Test empty blobs and empty arrays produce no batches"""
+        self.assertEqual(self.read_all(""), [])
+        self.assertEqual(self.read_all(" [ ] "), [])
+
+    def test_multi_byte_characters_across_chunks(self):
+        """Test UTF-8 characters split between chunks are decoded"""
+        events = [{"geo_location": {"city": "Zürich"}}, {"geo_location": {"city": "東京"}}]
+        batches = self.read_all(json.dumps(events, ensure_ascii=False), chunk_size=1)
+
+        self.assertEqual(batches, [events])
+
+    def test_malformed_json_raises(self):
+        """Test parsing stops with an error log and raises on malformed JSON"""
+        data = '[{"event_id": "1"}, {"event_id: "2"}]'
+        reader = EventStreamReader(io.BytesIO(data.encode("utf-8")), batch_size=1, chunk_size=5)
+        batches = reader.iter_batches()
+
+        self.assertEqual(next(batches), [{"event_id": "1"}])
+        with self.assertLogs("EventStreamReader", level="ERROR"):
+            with self.assertRaises(json.decoder.JSONDecodeError):
+                next(batches)
+
+    def test_concatenated_arrays(self):
+        """Test the values after a top level array are read as well"""
+        batches = self.read_all('[{"a": 1}][{"b": 2}]\n{"c": 3}')
+
+        self.assertEqual([event for batch in batches for event in batch], [{"a": 1}, {"b": 2}, {"c": 3}])
+
+    def test_trailing_garbage_raises(self):
+        """Test text after a top level array that is not JSON raises"""
+        with self.assertLogs("EventStreamReader", level="ERROR"):
+            with self.assertRaises(json.decoder.JSONDecodeError):
+                self.read_all('[{"a": 1}] garbage')
+
+    def test_numbers_across_chunks(self):
+        """Test numbers split between chunks are decoded whole"""
+        for data in ["1234\n5678\n", "1234\n5678", "[1234, 5678]"]:
+            with self.subTest(data=data):
+                batches = self.read_all(data, chunk_size=2)
+
+                self.assertEqual([event for batch in batches for event in batch], [1234, 5678])
+
+    def test_input_stream(self):
+        """Test reading from an Azure Functions InputStream"""
+        blob_input = func.blob.InputStream(
+            data=json.dumps(EVENTS).encode("utf-8"), name="sample_data.json"
+        )
+        reader = EventStreamReader(blob_input, batch_size=100)
+
+        self.assertEqual(list(reader.iter_batches()), [EVENTS])
+        self.assertEqual(reader.bytes_read, len(json.dumps(EVENTS)))
+
+    def test_gzip_compressed(self):
+        """Test a gzip compressed blob is decompressed while it is parsed"""
+        data = gzip.compress(json.dumps(EVENTS).encode("utf-8"))
+        reader = EventStreamReader(io.BytesIO(data), batch_size=3, chunk_size=5)
+
+        self.assertEqual([event for batch in reader.iter_batches() for event in batch], EVENTS)
+        self.assertEqual(reader.bytes_read, len(data))
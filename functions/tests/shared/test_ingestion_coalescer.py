@@ -0,0 +1,53 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock
+
+import pandas as pd
+from shared.ingestion_coalescer import IngestionCoalescer
+
+
+class TestIngestionCoalescer(unittest.TestCase):
+    def setUp(self) -> None:
+        self.client = Mock(table_name="fake_table", **{"ingest_data_frame.return_value": 100})
+        self.data_frame = pd.DataFrame({"a": [1, 2]})
+
+    def test_coalesce_concurrent_invocations(self):
+        """Test the frames of concurrent invocations are ingested in one batch after the deadline"""
+        coalescer = IngestionCoalescer(max_rows=100, max_seconds=0.2)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(lambda _: coalescer.ingest(self.client, self.data_frame), range(4)))
+
+        self.client.ingest_data_frame.assert_called_once()
+        self.assertEqual(len(self.client.ingest_data_frame.call_args.args[0].index), 8)
+        self.assertEqual(results, [25, 25, 25, 25])
+        self.assertEqual(coalescer.get_stats(), {"frames": 4, "batches": 1, "pending": 0})
+
+    def test_ingest_full_batch(self):
+        """Test a batch is ingested right away once it holds `max_rows` rows"""
+        coalescer = IngestionCoalescer(max_rows=2, max_seconds=60)
+
+        self.assertEqual(coalescer.ingest(self.client, self.data_frame), 100)
+
+        self.client.ingest_data_frame.assert_called_once()
+
+    def test_ingest_max_bytes(self):
+        """Test a batch is ingested right away once it reaches `max_bytes`"""
+        coalescer = IngestionCoalescer(max_rows=100, max_bytes=1, max_seconds=60)
+
+        coalescer.ingest(self.client, self.data_frame)
+
+        self.client.ingest_data_frame.assert_called_once()
+
+    def test_failed_batch(self):
+        """Test every invocation of a failed batch fails"""
+        self.client.ingest_data_frame.side_effect = Exception("Kusto Service Error Emitted")
+        coalescer = IngestionCoalescer(max_rows=100, max_seconds=0.1)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [executor.submit(coalescer.ingest, self.client, self.data_frame) for _ in range(2)]
+
+        for future in futures:
+            self.assertEqual(str(future.exception()), "Kusto Service Error Emitted")
+        self.client.ingest_data_frame.assert_called_once()
+        self.assertEqual(coalescer.get_stats()["pending"], 0)
@@ -0,0 +1,91 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+from shared.invocation_metrics import FileMetricsSink, InvocationMetrics, LogMetricsSink, get_metrics_sinks
+
+
+class TestInvocationMetrics(unittest.TestCase):
+    @patch("shared.invocation_metrics.time.perf_counter")
+    def test_to_dict(self, mock_perf_counter: Mock):
+        """Test stages, counters and table metrics are accumulated into one record"""
+        mock_perf_counter.side_effect = [0, 1, 1.5, 2, 2.25, 3]
+        metrics = InvocationMetrics("handler", sinks=[], blob="blob.json")
+
+        with metrics.stage("parse"):
+            pass
+        with metrics.stage("parse"):
+            pass
+        metrics.add("blob_bytes", 10)
+        metrics.add_table("table", rows_in=5, rows_out=2)
+        metrics.add_table("table", rows_out=1)
+        record = metrics.to_dict()
+
+        self.assertEqual(record["invocation"], "handler")
+        self.assertEqual(record["blob"], "blob.json")
+        self.assertEqual(record["duration_ms"], 3000)
+        self.assertEqual(record["stages_ms"], {"parse": 750})
+        self.assertEqual(record["counters"], {"blob_bytes": 10})
+        self.assertEqual(record["tables"], {"table": {"rows_in": 5, "rows_out": 3}})
+        if record["worker_peak_rss_mb"] is not None:  # None where `resource` is not available, e.g. Windows
+            self.assertGreater(record["worker_peak_rss_mb"], 0)
+            self.assertGreaterEqual(record["peak_rss_growth_mb"], 0)
+
+    @patch("shared.invocation_metrics.get_worker_peak_rss_mb")
+    def test_peak_rss_growth(self, mock_peak_rss):
+        """Test the worker peak RSS is reported with its growth during the invocation"""
+        mock_peak_rss.side_effect = [100.0, 150.0]
+        metrics = InvocationMetrics("handler", sinks=[])
+
+        record = metrics.to_dict()
+
+        self.assertEqual(record["worker_peak_rss_mb"], 150.0)
+        self.assertEqual(record["peak_rss_growth_mb"], 50.0)
+
+    def test_table_stage(self):
+        """Test stage durations of a table are recorded with the table"""
+        metrics = InvocationMetrics("handler", sinks=[])
+
+        with metrics.stage("transform", "table"):
+            pass
+
+        self.assertEqual(metrics.stages_ms, {})
+        self.assertIn("transform_ms", metrics.tables["table"])
+
+    def test_emit_ignores_failing_sink(self):
+        """Test a failing sink neither fails the invocation nor the other sinks"""
+        failing_sink, sink = Mock(), Mock()
+        failing_sink.emit.side_effect = Exception("sink error")
+        metrics = InvocationMetrics("handler", sinks=[failing_sink, sink])
+
+        with self.assertLogs("InvocationMetrics", level="WARNING"):
+            metrics.emit()
+
+        sink.emit.assert_called_once()
+
+    def test_file_sink(self):
+        """Test records are appended as JSON lines"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "metrics.jsonl")
+            metrics = InvocationMetrics("handler", sinks=[FileMetricsSink(path)])
+
+            metrics.emit()
+            metrics.emit()
+
+            with open(path, encoding="utf-8") as file:
+                records = [json.loads(line) for line in file]
+        self.assertEqual([record["invocation"] for record in records], ["handler", "handler"])
+
+    @patch("shared.invocation_metrics.METRICS_SINKS", ["log", "unknown"])
+    def test_get_metrics_sinks(self):
+        """Test sinks are created from the settings and unknown sinks are skipped"""
+        get_metrics_sinks.cache_clear()
+        try:
+            with self.assertLogs("InvocationMetrics", level="WARNING"):
+                sinks = get_metrics_sinks()
+        finally:
+            get_metrics_sinks.cache_clear()
+
+        self.assertEqual([type(sink) for sink in sinks], [LogMetricsSink])
@@ -1,3 +1,4 @@
+import gzip
 import unittest
 from unittest.mock import Mock, patch
 
@@ -5,8 +6,8 @@ import pandas as pd
 from azure.kusto.data import KustoConnectionStringBuilder
 from azure.kusto.data.data_format import DataFormat
 from azure.kusto.data.exceptions import KustoServiceError
-from azure.kusto.ingest import KustoStreamingIngestClient
-from shared.kusto_service_client import KustoServiceClient
+from azure.kusto.ingest import KustoStreamingIngestClient, QueuedIngestClient
+from shared.kusto_service_client import QUEUED_INGESTION, KustoServiceClient
 
 
 class TestKustoClient(unittest.TestCase):
@@ -103,7 +104,7 @@ class TestKustoClient(unittest.TestCase):
         self.assertEqual(context.output[0], expected_err_message)
         self.assertTrue(type(e.exception) in [KustoServiceError])
 
-    @patch.object(KustoStreamingIngestClient, "ingest_from_dataframe")
+    @patch.object(KustoStreamingIngestClient, "ingest_from_stream")
     @patch(
         "shared.kusto_service_client.IngestionProperties"
     )
@@ -114,7 +115,7 @@ class TestKustoClient(unittest.TestCase):
 
         Args:
             mock_ingest_props (Mock): Mock IngestionProperties azure.KUSTO SDK
-            mock_external_ingest_from_data_frame (Mock): mock azure.kusto SDK Ingestion From DataFame
+            mock_external_ingest_from_data_frame (Mock): mock azure.kusto SDK Ingestion From Stream
         """
         test_table = "testtable"
         ingestion_props = type(
@@ -124,14 +125,20 @@ class TestKustoClient(unittest.TestCase):
         )
         mock_ingest_props.return_value = ingestion_props
 
-        self.kusto_client.ingest_data_frame(data=self.data_frame)
+        uploaded_bytes = self.kusto_client.ingest_data_frame(data=self.data_frame)
 
-        mock_external_ingest_from_data_frame.assert_called_once_with(
-            df=self.data_frame, ingestion_properties=ingestion_props
+        mock_external_ingest_from_data_frame.assert_called_once()
+        stream_descriptor = mock_external_ingest_from_data_frame.call_args.args[0]
+        self.assertEqual(uploaded_bytes, stream_descriptor.size)
+        self.assertEqual(
+            mock_external_ingest_from_data_frame.call_args.kwargs["ingestion_properties"],
+            ingestion_props,
         )
+        self.assertTrue(stream_descriptor.is_compressed)
+        self.assertEqual(gzip.decompress(stream_descriptor.stream.read()), b"1\n2\n3\n4\n5\n")
         assert mock_ingest_props.assert_called_once
 
-    @patch.object(KustoStreamingIngestClient, "ingest_from_dataframe")
+    @patch.object(KustoStreamingIngestClient, "ingest_from_stream")
     def test_ingest_data_frame_kusto_service_exception(
         self, mock_external_ingest_from_data_frame: Mock
     ):
@@ -148,7 +155,7 @@ class TestKustoClient(unittest.TestCase):
 
         self.assertTrue(type(e.exception) in [KustoServiceError])
 
-    @patch.object(KustoStreamingIngestClient, "ingest_from_dataframe")
+    @patch.object(KustoStreamingIngestClient, "ingest_from_stream")
     def test_ingest_data_frame_general_exception(
         self, mock_external_ingest_from_data_frame: Mock
     ):
@@ -164,3 +171,94 @@ class TestKustoClient(unittest.TestCase):
             self.kusto_client.ingest_data_frame(data=pd.DataFrame({}))
 
         self.assertTrue(type(e.exception) in [Exception])
+
+
+    def get_queued_client(self) -> KustoServiceClient:
+        """Get a queued ingestion KustoServiceClient
+
+        Returns:
+            KustoServiceClient: queued mode client
+        """
+        return KustoServiceClient(
+            cluster_uri=self.test_cluster_uri,
+            client_id="xxx-123-456",
+            db_name=self.test_db_name,
+            table_name=self.test_table_name,
+            data_format=self.test_data_format,
+            ingestion_mode=QUEUED_INGESTION,
+        )
+
+    @patch("shared.kusto_service_client.KustoConnectionStringBuilder")
+    @patch("shared.kusto_service_client.QueuedIngestClient")
+    def test_init_queued_client(self, mock_queued_client: Mock, mock_kcsb: Mock):
+        """Test queued mode uses the ingest- endpoint of the cluster"""
+        kusto_client = self.get_queued_client()
+
+        mock_kcsb.with_aad_managed_service_identity_authentication.assert_called_once_with(
+            "https://ingest-fakedataexplorer.region.kusto.windows.net", "xxx-123-456"
+        )
+        self.assertEqual(kusto_client.client, mock_queued_client.return_value)
+
+    @patch.object(QueuedIngestClient, "ingest_from_stream")
+    def test_queued_ingest_submits_each_data_frame(self, mock_ingest_from_data_frame: Mock):
+        """Test queued mode submits every DataFrame right away, nothing is buffered in the client"""
+        kusto_client = self.get_queued_client()
+
+        uploaded_bytes = kusto_client.ingest_data_frame(data=self.data_frame)
+
+        mock_ingest_from_data_frame.assert_called_once()
+        stream_descriptor = mock_ingest_from_data_frame.call_args.args[0]
+        self.assertEqual(len(gzip.decompress(stream_descriptor.stream.read()).splitlines()), 5)
+        self.assertEqual(uploaded_bytes, stream_descriptor.size)
+
+    def test_serialize_data_frame_parquet(self):
+        """Test Parquet payloads are written with the table's column types"""
+        kusto_client = KustoServiceClient(
+            cluster_uri=self.test_cluster_uri,
+            client_id="xxx-123-456",
+            db_name=self.test_db_name,
+            table_name=self.test_table_name,
+            data_format=DataFormat.PARQUET,
+            column_types={"duration": "decimal", "timestamp": "datetime", "browser": "string"},
+        )
+        data_frame = pd.DataFrame(
+            {
+                "duration": [506, None],
+                "timestamp": [1660176375708, "2022-05-31T15:52:40.0000251Z"],
+                "browser": ["Chrome", None],
+            }
+        )
+
+        payload, is_compressed = kusto_client.serialize_data_frame(data_frame)
+        actual_df = pd.read_parquet(payload)
+
+        self.assertFalse(is_compressed)
+        self.assertEqual(str(actual_df["duration"].dtype), "float64")
+        self.assertEqual(str(actual_df["timestamp"].dtype), "datetime64[ns, UTC]")
+        self.assertEqual(actual_df["timestamp"][0], pd.Timestamp("2022-08-11T00:06:15.708Z"))
+        self.assertEqual(actual_df["browser"][0], "Chrome")
+        self.assertTrue(pd.isna(actual_df["browser"][1]))
+
+    def test_serialize_data_frame_csv_datetime(self):
+        """Test CSV payloads write datetimes as ISO 8601 UTC"""
+        data_frame = pd.DataFrame({"timestamp": pd.to_datetime([1660176375708], unit="ms", utc=True)})
+
+        payload, is_compressed = self.kusto_client.serialize_data_frame(data_frame)
+
+        self.assertTrue(is_compressed)
+        self.assertEqual(gzip.decompress(payload.read()), b"2022-08-11T00:06:15.708000Z\n")
+
+    def test_serialize_data_frame_json(self):
+        """Test JSON payloads are gzip compressed JSON lines"""
+        kusto_client = KustoServiceClient(
+            cluster_uri=self.test_cluster_uri,
+            client_id="xxx-123-456",
+            db_name=self.test_db_name,
+            table_name=self.test_table_name,
+            data_format=DataFormat.JSON,
+        )
+
+        payload, is_compressed = kusto_client.serialize_data_frame(self.data_frame)
+
+        self.assertTrue(is_compressed)
+        self.assertEqual(gzip.decompress(payload.read()).splitlines()[0], b'{"a":1}')
@@ -0,0 +1,87 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
+
+from azure.kusto.data.data_format import DataFormat
+from shared.kusto_client_pool import KustoClientPool
+
+
+class TestKustoClientPool(unittest.TestCase):
+    def setUp(self) -> None:
+        self.pool = KustoClientPool()
+        self.client_args = {
+            "cluster_uri": "https://fakedataexplorer.region.kusto.windows.net",
+            "client_id": "xxx-123-456",
+            "db_name": "fakedb",
+            "data_format": DataFormat.CSV,
+        }
+
+    @patch("shared.kusto_client_pool.KustoServiceClient")
+    def test_get_client_reuses_clients(self, mock_kusto_service: Mock):
+        """Test a client is created once per table and reused afterwards"""
+        first = self.pool.get_client(table_name="table_a", **self.client_args)
+        second = self.pool.get_client(table_name="table_a", **self.client_args)
+
+        self.assertIs(first, second)
+        mock_kusto_service.assert_called_once_with(table_name="table_a", **self.client_args)
+        self.assertEqual(self.pool.get_stats(), {"hits": 1, "misses": 1, "size": 1})
+
+    @patch("shared.kusto_client_pool.KustoServiceClient")
+    def test_get_client_per_table_and_format(self, mock_kusto_service: Mock):
+        """Test tables and data formats get their own clients"""
+        self.pool.get_client(table_name="table_a", **self.client_args)
+        self.pool.get_client(table_name="table_b", **self.client_args)
+        self.pool.get_client(table_name="table_a", **{**self.client_args, "data_format": DataFormat.JSON})
+
+        self.assertEqual(mock_kusto_service.call_count, 3)
+        self.assertEqual(self.pool.get_stats(), {"hits": 0, "misses": 3, "size": 3})
+
+    @patch("shared.kusto_client_pool.KustoServiceClient")
+    def test_get_client_options(self, mock_kusto_service: Mock):
+        """Test additional options are passed to new clients"""
+        self.pool.get_client(table_name="table_a", ingestion_mode="queued", **self.client_args)
+
+        self.assertEqual(mock_kusto_service.call_args.kwargs["ingestion_mode"], "queued")
+
+    @patch("shared.kusto_client_pool.KustoServiceClient")
+    def test_get_client_per_options(self, mock_kusto_service: Mock):
+        """Test clients are only shared by callers asking for the same options"""
+        mock_kusto_service.side_effect = lambda **kwargs: Mock(**kwargs)
+        column_types = {"timestamp": "datetime", "duration": "long"}
+        first = self.pool.get_client(table_name="table_a", column_types=column_types, **self.client_args)
+        second = self.pool.get_client(table_name="table_a", column_types=dict(column_types), **self.client_args)
+        queued = self.pool.get_client(
+            table_name="table_a", column_types=column_types, ingestion_mode="queued", **self.client_args
+        )
+        retyped = self.pool.get_client(table_name="table_a", column_types={"timestamp": "string"}, **self.client_args)
+
+        self.assertIs(first, second)
+        self.assertIsNot(first, queued)
+        self.assertIsNot(first, retyped)
+        self.assertEqual(mock_kusto_service.call_args_list[1].kwargs["ingestion_mode"], "queued")
+        self.assertEqual(self.pool.get_stats(), {"hits": 1, "misses": 3, "size": 3})
+
+    @patch("shared.kusto_client_pool.KustoServiceClient")
+    def test_get_client_thread_safe(self, mock_kusto_service: Mock):
+        """Test concurrent lookups only create one client"""
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            clients = list(
+                executor.map(
+                    lambda _: self.pool.get_client(table_name="table_a", **self.client_args),
+                    range(50),
+                )
+            )
+
+        mock_kusto_service.assert_called_once()
+        self.assertTrue(all(client is clients[0] for client in clients))
+        self.assertEqual(self.pool.get_stats(), {"hits": 49, "misses": 1, "size": 1})
+
+    @patch("shared.kusto_client_pool.KustoServiceClient")
+    def test_clear(self, mock_kusto_service: Mock):
+        """Test clear drops clients and resets counters"""
+        self.pool.get_client(table_name="table_a", **self.client_args)
+        self.pool.clear()
+        self.pool.get_client(table_name="table_a", **self.client_args)
+
+        self.assertEqual(mock_kusto_service.call_count, 2)
+        self.assertEqual(self.pool.get_stats(), {"hits": 0, "misses": 1, "size": 1})
@@ -1,5 +1,6 @@
+import http.client
 import unittest
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
 from shared.metrics_advisor_client import MetricsAdvisorAPIClient
 
@@ -7,6 +8,24 @@ metrics_advisor_subscription_key = "subscription_key"
 metrics_advisor_api_key = "api_key"
 metrics_advisor_endpoint = "endpoint"
 
+
+def get_response(status: int, body: bytes, headers: dict = {}) -> Mock:
+    """Create a fake http.client.HTTPResponse
+
+    Args:
+        status (int): status code
+        body (bytes): body
+        headers (dict): headers
+
+    Returns:
+        Mock: response
+    """
+    response = Mock(status=status, will_close=False)
+    response.read.return_value = body
+    response.getheader.side_effect = lambda name, default=None: headers.get(name, default)
+    return response
+
+
 class TestMetricsAdvisorAPI(unittest.TestCase):
     def test_get_headers(self):
         """Test to get headers"""
@@ -30,14 +49,111 @@ class TestMetricsAdvisorAPI(unittest.TestCase):
             33
         )
 
-    def get_client(self) -> MetricsAdvisorAPIClient:
+    @patch("shared.metrics_advisor_client.http.client.HTTPSConnection")
+    def test_connection_is_reused(self, mock_connection: Mock):
+        """Test keep-alive connections are reused between requests"""
+        connection = mock_connection.return_value
+        connection.getresponse.return_value = get_response(200, b'{"dataFeedName": "feed"}')
+        client = self.get_client("https://name.cognitiveservices.azure.com/")
+
+        self.assertEqual(client.get_data_feed_name_by_id("1"), "feed")
+        self.assertEqual(client.get_data_feed_name_by_id("2"), "feed")
+
+        mock_connection.assert_called_once_with("name.cognitiveservices.azure.com", timeout=30)
+        self.assertEqual(connection.request.call_count, 2)
+        connection.close.assert_not_called()
+
+    @patch("shared.metrics_advisor_client.time.sleep")
+    @patch("shared.metrics_advisor_client.http.client.HTTPSConnection")
+    def test_retry_throttled_requests(self, mock_connection: Mock, mock_sleep: Mock):
+        """Test 429 and 5xx responses are retried, honouring Retry-After"""
+        connection = mock_connection.return_value
+        connection.getresponse.side_effect = [
+            get_response(429, b'{}', {"Retry-After": "2"}),
+            get_response(503, b'{}'),
+            get_response(200, b'{"value": [{"incidentId": "1"}]}'),
+        ]
+        client = self.get_client()
+
+        incidents = client.get_incidents_by_incident_id("/alerts/1/incidents")
+
+        self.assertEqual(incidents, [{"incidentId": "1"}])
+        self.assertEqual(connection.request.call_count, 3)
+        self.assertEqual(mock_sleep.call_count, 2)
+        self.assertEqual(mock_sleep.call_args_list[0].args[0], 2.0)
+
+    @patch("shared.metrics_advisor_client.time.sleep")
+    @patch("shared.metrics_advisor_client.http.client.HTTPSConnection")
+    def test_retry_after_is_capped(self, mock_connection: Mock, mock_sleep: Mock):
+        """Test a Retry-After longer than the maximum backoff waits the maximum backoff"""
+        connection = mock_connection.return_value
+        connection.getresponse.side_effect = [
+            get_response(429, b'{}', {"Retry-After": "3600"}),
+            get_response(200, b'{"value": [{"incidentId": "1"}]}'),
+        ]
+        client = self.get_client()
+
+        client.get_incidents_by_incident_id("/alerts/1/incidents")
+
+        mock_sleep.assert_called_once_with(client.max_backoff_seconds)
+
+    @patch("shared.metrics_advisor_client.time.sleep")
+    @patch("shared.metrics_advisor_client.http.client.HTTPSConnection")
+    def test_retry_gives_up(self, mock_connection: Mock, mock_sleep: Mock):
+        """Test the last response is returned once retries are exhausted"""
+        connection = mock_connection.return_value
+        connection.getresponse.return_value = get_response(500, b'{"code": "InternalError"}')
+        client = self.get_client()
+
+        self.assertEqual(client.get_data_feed_name_by_id("1"), "")
+        self.assertEqual(connection.request.call_count, client.max_retries + 1)
+
+    @patch("shared.metrics_advisor_client.time.sleep")
+    @patch("shared.metrics_advisor_client.http.client.HTTPSConnection")
+    def test_stale_connection_is_replaced(self, mock_connection: Mock, mock_sleep: Mock):
+        """Test an idle connection closed by the server is replaced without backoff"""
+        stale_connection, new_connection = Mock(), Mock()
+        stale_connection.getresponse.side_effect = [
+            get_response(200, b'{"dataFeedName": "feed"}'),
+            http.client.RemoteDisconnected("closed"),
+        ]
+        new_connection.getresponse.return_value = get_response(200, b'{"dataFeedName": "other"}')
+        mock_connection.side_effect = [stale_connection, new_connection]
+        client = self.get_client()
+
+        client.get_data_feed_name_by_id("1")
+
+        self.assertEqual(client.get_data_feed_name_by_id("2"), "other")
+        stale_connection.close.assert_called_once()
+        mock_sleep.assert_not_called()
+
+    @patch("shared.metrics_advisor_client.http.client.HTTPSConnection")
+    def test_list_data_feed_names(self, mock_connection: Mock):
+        """Test data feed names are listed across pages"""
+        connection = mock_connection.return_value
+        connection.getresponse.side_effect = [
+            get_response(
+                200,
+                b'{"value": [{"dataFeedId": "1", "dataFeedName": "one"}], "@nextLink": "/next"}'
+            ),
+            get_response(200, b'{"value": [{"dataFeedId": "2", "dataFeedName": "two"}]}'),
+        ]
+        client = self.get_client()
+
+        self.assertEqual(client.list_data_feed_names(), {"1": "one", "2": "two"})
+        self.assertEqual(connection.request.call_args.args[1], "/next")
+
+    def get_client(self, endpoint: str = metrics_advisor_endpoint) -> MetricsAdvisorAPIClient:
         """get MetricsAdvisorAPIClient instance
 
+        Args:
+            endpoint (str): metrics advisor endpoint
+
         Returns:
             MetricsAdvisorAPIClient: MetricsAdvisorAPIClient
         """
         return MetricsAdvisorAPIClient(
             metrics_advisor_subscription_key,
             metrics_advisor_api_key,
-            metrics_advisor_endpoint
-        )
\ No newline at end of file
+            endpoint
+        )
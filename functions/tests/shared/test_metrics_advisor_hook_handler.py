@@ -0,0 +1,162 @@
+import json
+import unittest
+from unittest.mock import Mock, patch
+
+import pandas as pd
+
+from shared.kusto_client_pool import kusto_client_pool
+from shared.metrics_advisor_client import MetricsAdvisorAPIClient
+from shared.metrics_advisor_hook_handler import HookHandler
+
+CONFIG = {
+    "kusto_metrics_advisor_anomaly_alerts_table": "anomaly_alerts",
+    "kusto_cluster_uri": "https://fakedataexplorer.region.kusto.windows.net",
+    "kusto_db_name": "fakedb",
+    "managed_client_id": "xxx-123-456",
+    "metrics_advisor_subscription_key": "subscription_key",
+    "metrics_advisor_api_key": "api_key",
+    "metrics_advisor_endpoint": "https://name.cognitiveservices.azure.com/",
+    "metrics_advisor_max_concurrency": "4",
+}
+
+
+def get_hook_data(alert_count: int) -> str:
+    """Create a Metrics Advisor hook payload
+
+    Args:
+        alert_count (int): number of alerts
+
+    Returns:
+        str: hook JSON
+    """
+    return json.dumps({
+        "value": [
+            {
+                "hookId": "hook",
+                "alertType": "Anomaly",
+                "alertInfo": {
+                    "anomalyAlertingConfigurationId": "config",
+                    "alertId": f"alert-{index}",
+                    "timestamp": "2022-07-06T19:00:00Z",
+                },
+                "callBackUrl": f"/alerts/alert-{index}/incidents",
+            }
+            for index in range(alert_count)
+        ]
+    })
+
+
+def get_incidents(callback_url: str) -> list:
+    """Fake incidents of an alert
+
+    Args:
+        callback_url (str): alert callback url
+
+    Returns:
+        list: incidents
+    """
+    alert_id = callback_url.split("/")[2]
+    return [
+        {
+            "incidentId": f"{alert_id}-incident-{index}",
+            "dataFeedId": f"feed-{index}",
+            "property": {"maxSeverity": "High", "valueOfRootNode": 112.4, "expectedValueOfRootNode": 150.6},
+            "rootNode": {"dimension": {"dimension_city": "Bristol"}},
+        }
+        for index in range(2)
+    ]
+
+
+class TestHookHandler(unittest.TestCase):
+    def setUp(self) -> None:
+        HookHandler.metrics_advisor_api_clients.clear()
+        HookHandler.feed_name_cache.clear()
+        HookHandler.feed_names_warmed_up_at = None
+        kusto_client_pool.clear()
+
+    @patch("shared.kusto_client_pool.KustoServiceClient")
+    @patch("shared.metrics_advisor_hook_handler.MetricsAdvisorAPIClient")
+    def test_handle(self, mock_api_client: Mock, mock_kusto_service: Mock):
+        """Test incidents of all alerts are stored with their feed names"""
+        mock_api_client.load_json = MetricsAdvisorAPIClient.load_json
+        api_client = mock_api_client.return_value
+        api_client.get_incidents_by_incident_id.side_effect = get_incidents
+        api_client.get_data_feed_name_by_id.side_effect = lambda data_feed_id: f"name-{data_feed_id}"
+
+        HookHandler(CONFIG).handle(get_hook_data(alert_count=5))
+
+        self.assertEqual(api_client.get_incidents_by_incident_id.call_count, 5)
+        # feed names are only fetched once per data feed
+        self.assertEqual(api_client.get_data_feed_name_by_id.call_count, 2)
+        stored_df = mock_kusto_service.return_value.ingest_data_frame.call_args.args[0]
+        self.assertEqual(stored_df.columns.to_list(), HookHandler.schema)
+        self.assertEqual(len(stored_df.index), 10)
+        self.assertEqual(
+            stored_df.iloc[1].to_list(),
+            [
+                "alert-0-incident-1", "alert-0", "High", "feed-1", "name-feed-1",
+                112, 151, '{"dimension_city": "Bristol"}', "2022-07-06T19:00:00Z",
+            ],
+        )
+
+    @patch("shared.kusto_client_pool.KustoServiceClient")
+    @patch("shared.metrics_advisor_hook_handler.MetricsAdvisorAPIClient")
+    def test_api_client_shared_across_invocations(self, mock_api_client: Mock, mock_kusto_service: Mock):
+        """Test the Metrics Advisor API client and its connections are reused"""
+        mock_api_client.load_json = MetricsAdvisorAPIClient.load_json
+        mock_api_client.return_value.get_incidents_by_incident_id.side_effect = get_incidents
+        mock_api_client.return_value.get_data_feed_name_by_id.return_value = "name"
+
+        HookHandler(CONFIG).handle(get_hook_data(alert_count=1))
+        HookHandler(CONFIG).handle(get_hook_data(alert_count=1))
+
+        mock_api_client.assert_called_once()
+        self.assertEqual(mock_api_client.call_args.kwargs["max_connections"], 4)
+
+    @patch("shared.kusto_client_pool.KustoServiceClient")
+    @patch("shared.metrics_advisor_hook_handler.MetricsAdvisorAPIClient")
+    def test_handle_incomplete_incidents(self, mock_api_client: Mock, mock_kusto_service: Mock):
+        """Test incidents without properties or dimension get empty values"""
+        mock_api_client.load_json = MetricsAdvisorAPIClient.load_json
+        api_client = mock_api_client.return_value
+        api_client.get_incidents_by_incident_id.side_effect = lambda callback_url: [
+            {"incidentId": "incident", "dataFeedId": "feed", "property": {"valueOfRootNode": 2.5}},
+        ]
+        api_client.get_data_feed_name_by_id.return_value = "name"
+
+        HookHandler(CONFIG).handle(get_hook_data(alert_count=1))
+
+        stored_df = mock_kusto_service.return_value.ingest_data_frame.call_args.args[0]
+        row = stored_df.iloc[0]
+        self.assertEqual(row["severity"], "")
+        self.assertEqual(row["actual_value"], 2)
+        self.assertTrue(pd.isna(row["expected_value"]))
+        self.assertEqual(row["dimension"], "")
+
+    @patch("shared.metrics_advisor_hook_handler.FEED_NAME_CACHE_WARM_UP", True)
+    @patch("shared.kusto_client_pool.KustoServiceClient")
+    @patch("shared.metrics_advisor_hook_handler.MetricsAdvisorAPIClient")
+    def test_feed_names_warm_up(self, mock_api_client: Mock, mock_kusto_service: Mock):
+        """Test feed names listed on warm up are not fetched one by one"""
+        mock_api_client.load_json = MetricsAdvisorAPIClient.load_json
+        api_client = mock_api_client.return_value
+        api_client.get_incidents_by_incident_id.side_effect = get_incidents
+        api_client.list_data_feed_names.return_value = {"feed-0": "name-0", "feed-1": "name-1"}
+
+        HookHandler(CONFIG).handle(get_hook_data(alert_count=2))
+        HookHandler(CONFIG).handle(get_hook_data(alert_count=2))
+
+        # listed once per cache TTL
+        api_client.list_data_feed_names.assert_called_once()
+        api_client.get_data_feed_name_by_id.assert_not_called()
+        stored_df = mock_kusto_service.return_value.ingest_data_frame.call_args.args[0]
+        self.assertEqual(stored_df["data_feed_name"].to_list(), ["name-0", "name-1"] * 2)
+
+    def test_missing_config(self):
+        """Test empty config values are reported"""
+        with self.assertRaises(Exception) as e:
+            HookHandler({**CONFIG, "kusto_db_name": ""})
+
+        self.assertEqual(
+            str(e.exception), "Env setup error, please check this env variables: kusto_db_name"
+        )
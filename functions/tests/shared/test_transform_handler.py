@@ -1,9 +1,19 @@
+import gzip
+import json
+import os
 import unittest
-from unittest.mock import patch
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, Mock, patch
 
 import azure.functions as func
 import pandas as pd
+from shared.event_deduplicator import EventDeduplicator
+from shared.ingestion_coalescer import IngestionCoalescer
+from shared.kusto_client_pool import kusto_client_pool
 from shared.transform_handler import TransformHandler
+from shared.transform_pool import TransformPool
+from transformations.transform_definition import get_transform_definitions
+from utils.dictionary_encoding import category_registry
 
 BLOB_DATA = """
 {
@@ -60,35 +70,68 @@ class TestTransformHandler(unittest.TestCase):
 
         self.table_name = "fake_table"
         self.data_frame = pd.DataFrame({"a": [1, 2, 3, 4, 5]})
+        kusto_client_pool.clear()
+        # definitions read their tables from the patched environment
+        get_transform_definitions.cache_clear()
+        self.addCleanup(get_transform_definitions.cache_clear)
 
-    @patch("shared.transform_handler.KustoServiceClient")
-    @patch("transformations.index.SlowStartTransform")
-    def test_handle_transform_request(self, mock_transformation, mock_kusto_service):
+    @patch("shared.kusto_client_pool.KustoServiceClient")
+    @patch("shared.transform_handler.get_transformations")
+    def test_handle_transform_request(self, mock_get_transformations, mock_kusto_service):
         """Test Get JSON String from Input Stream."""
-        instance = mock_transformation.return_value
+        instance = MagicMock()
+        mock_get_transformations.return_value = [instance]
         instance.table = self.table_name
+        instance.rollup_table = None
         instance.get_dataframe.return_value = self.data_frame
 
-        expected_logs = [
-            f"INFO:TransformHandler:Ingested Frames to Table: {self.table_name}",
-            "INFO:TransformHandler:Azure Function Completed",
-        ]
-
         with self.assertLogs("TransformHandler", level="DEBUG") as context:
             transform_handler = TransformHandler(blob_input=self.blob_input)
             transform_handler.handle_transform_request()
-        self.assertEqual(mock_transformation.call_count, 1)
+        self.assertEqual(mock_get_transformations.call_count, 1)
         self.assertEqual(mock_kusto_service.call_count, 1)
         # make sure JSON string is converting correctly
-        self.assertEqual(context.output, expected_logs)
+        self.assertEqual(len(context.output), 2)
+        self.assertRegex(
+            context.output[0],
+            rf"^INFO:TransformHandler:Ingested Frames to Table: {self.table_name} in \d+ ms$",
+        )
+        self.assertEqual(context.output[1], "INFO:TransformHandler:Azure Function Completed")
         self.assertEqual(transform_handler.json_string, BLOB_DATA)
 
-    @patch("shared.transform_handler.KustoServiceClient")
-    @patch("transformations.index.SlowStartTransform")
-    def test_frame_empty_frame(self, mock_transformation, mock_kusto_service):
+    @patch.dict(os.environ, {"SLOW_START_TABLE": "slow_start"})
+    @patch("shared.kusto_client_pool.KustoServiceClient")
+    def test_invocation_metrics(self, mock_kusto_service):
+        """Test the stage timings and counters of the invocation are emitted"""
+        mock_kusto_service.return_value.table_name = "slow_start"
+        mock_kusto_service.return_value.ingest_data_frame.return_value = 100
+        sink = Mock()
+
+        with patch("shared.invocation_metrics.get_metrics_sinks", return_value=[sink]):
+            TransformHandler(blob_input=self.blob_input).handle_transform_request()
+
+        record = sink.emit.call_args.args[0]
+        self.assertEqual(record["invocation"], "transform_handler")
+        self.assertEqual(record["blob"], "sample_data.json")
+        self.assertEqual(record["counters"], {"blob_bytes": len(BLOB_DATA.encode("utf-8")), "events": 1})
+        self.assertEqual(set(record["stages_ms"]), {"read", "parse", "normalize"})
+        self.assertLessEqual(record["stages_ms"]["normalize"], record["tables"]["slow_start"]["transform_ms"])
+        table_metrics = record["tables"]["slow_start"]
+        self.assertEqual(
+            {name: table_metrics[name] for name in ["rows_in", "rows_out", "uploaded_bytes"]},
+            {"rows_in": 1, "rows_out": 1, "uploaded_bytes": 100},
+        )
+        self.assertIn("transform_ms", table_metrics)
+        self.assertIn("ingest_ms", table_metrics)
+
+    @patch("shared.kusto_client_pool.KustoServiceClient")
+    @patch("shared.transform_handler.get_transformations")
+    def test_frame_empty_frame(self, mock_get_transformations, mock_kusto_service):
         """Test Get JSON String from Input Stream."""
-        instance = mock_transformation.return_value
+        instance = MagicMock()
+        mock_get_transformations.return_value = [instance]
         instance.table = self.table_name
+        instance.rollup_table = None
         instance.get_dataframe.return_value = pd.DataFrame({})
 
         expected_logs = [
@@ -101,17 +144,19 @@ class TestTransformHandler(unittest.TestCase):
             transform_handler.handle_transform_request()
         # make sure JSON string is converting correctly
         self.assertEqual(context.output, expected_logs)
-        self.assertEqual(mock_transformation.call_count, 1)
+        self.assertEqual(mock_get_transformations.call_count, 1)
         mock_kusto_service.assert_not_called()
 
-    @patch("shared.transform_handler.KustoServiceClient")
-    @patch("transformations.index.SlowStartTransform")
-    def test_table_name_undefined(self, mock_transformation, mock_kusto_service):
+    @patch("shared.kusto_client_pool.KustoServiceClient")
+    @patch("shared.transform_handler.get_transformations")
+    def test_table_name_undefined(self, mock_get_transformations, mock_kusto_service):
         """Test Get JSON String from Input Stream."""
 
         empty_table_name = ""
-        instance = mock_transformation.return_value
+        instance = MagicMock()
+        mock_get_transformations.return_value = [instance]
         instance.table = empty_table_name
+        instance.rollup_table = None
         instance.get_dataframe.return_value = self.data_frame
 
         expected_logs = [
@@ -124,5 +169,348 @@ class TestTransformHandler(unittest.TestCase):
             transform_handler.handle_transform_request()
         # make sure JSON string is converting correctly
         self.assertEqual(context.output, expected_logs)
-        self.assertEqual(mock_transformation.call_count, 1)
+        self.assertEqual(mock_get_transformations.call_count, 1)
         mock_kusto_service.assert_not_called()
+
+    @patch.dict(os.environ, {"SLOW_START_TABLE": "fake_table"})
+    @patch("shared.transform_handler.STREAM_BATCH_SIZE", 2)
+    @patch("shared.transform_handler.STREAM_BLOB_INPUT", True)
+    @patch("shared.kusto_client_pool.KustoServiceClient")
+    def test_handle_streamed_transform_request(self, mock_kusto_service):
+        """Test blob is parsed in batches and frames are combined per table."""
+        blob_input = func.blob.InputStream(
+            data=f"[{BLOB_DATA}, {BLOB_DATA}, {BLOB_DATA}]".encode("utf-8"),
+            name="sample_data.json",
+        )
+
+        transform_handler = TransformHandler(blob_input=blob_input)
+        transform_handler.handle_transform_request()
+
+        self.assertIsNone(transform_handler.json_string)
+        ingest = mock_kusto_service.return_value.ingest_data_frame
+        ingest.assert_called_once()
+        self.assertEqual(len(ingest.call_args[0][0].index), 3)
+
+    @patch.dict(os.environ, {"SLOW_START_TABLE": "fake_table", "SLOW_START_ROLLUP_TABLE": "fake_rollup_table"})
+    @patch("shared.transform_handler.STREAM_BATCH_SIZE", 2)
+    @patch("shared.transform_handler.STREAM_BLOB_INPUT", True)
+    @patch("shared.kusto_client_pool.KustoServiceClient")
+    def test_handle_rollup_table(self, mock_kusto_service):
+        """Test raw rows and one rollup over all batches are ingested."""
+        clients = {}
+
+        def get_client(**kwargs) -> Mock:
+            clients[kwargs["table_name"]] = Mock(**kwargs, **{"ingest_data_frame.return_value": 10})
+            return clients[kwargs["table_name"]]
+
+        mock_kusto_service.side_effect = get_client
+        blob_input = func.blob.InputStream(
+            data=f"[{BLOB_DATA}, {BLOB_DATA}, {BLOB_DATA}]".encode("utf-8"),
+            name="sample_data.json",
+        )
+
+        TransformHandler(blob_input=blob_input).handle_transform_request()
+
+        raw_client, rollup_client = clients["fake_table"], clients["fake_rollup_table"]
+        self.assertEqual(len(raw_client.ingest_data_frame.call_args.args[0].index), 3)
+        rollup_df = rollup_client.ingest_data_frame.call_args.args[0]
+        self.assertEqual(rollup_df["event_count"].to_list(), [3])
+        self.assertEqual(rollup_df["p95"].to_list(), [1344.0])
+        self.assertEqual(rollup_client.column_types["event_count"], "long")
+
+    @patch.dict(os.environ, {"SLOW_START_TABLE": "fake_table", "SLOW_START_ROLLUP_TABLE": "fake_rollup_table"})
+    @patch("shared.transform_handler.STREAM_BATCH_SIZE", 2)
+    @patch("shared.transform_handler.STREAM_INGEST_BATCHES", True)
+    @patch("shared.transform_handler.STREAM_BLOB_INPUT", True)
+    @patch("shared.kusto_client_pool.KustoServiceClient")
+    def test_ingest_streamed_batches(self, mock_kusto_service):
+        """Test each batch is ingested on its own and the rollup once over all batches"""
+        clients = {
+            table: Mock(table_name=table, **{"ingest_data_frame.return_value": 10})
+            for table in ["fake_table", "fake_rollup_table"]
+        }
+        mock_kusto_service.side_effect = lambda **kwargs: clients[kwargs["table_name"]]
+        blob_input = func.blob.InputStream(
+            data=f"[{BLOB_DATA}, {BLOB_DATA}, {BLOB_DATA}]".encode("utf-8"),
+            name="sample_data.json",
+        )
+        sink = Mock()
+
+        with patch("shared.invocation_metrics.get_metrics_sinks", return_value=[sink]):
+            TransformHandler(blob_input=blob_input).handle_transform_request()
+
+        raw_client, rollup_client = clients["fake_table"], clients["fake_rollup_table"]
+        self.assertEqual([len(call.args[0].index) for call in raw_client.ingest_data_frame.call_args_list], [2, 1])
+        self.assertEqual(rollup_client.ingest_data_frame.call_args.args[0]["event_count"].to_list(), [3])
+        record = sink.emit.call_args.args[0]
+        self.assertEqual(record["counters"]["batches"], 2)
+        self.assertEqual(record["tables"]["fake_table"]["uploaded_bytes"], 20)
+
+    @patch.dict(os.environ, {"SLOW_START_TABLE": "fake_table"})
+    @patch("shared.transform_handler.STREAM_BATCH_SIZE", 1)
+    @patch("shared.transform_handler.STREAM_QUEUE_SIZE", 1)
+    @patch("shared.transform_handler.STREAM_INGEST_BATCHES", True)
+    @patch("shared.transform_handler.STREAM_BLOB_INPUT", True)
+    @patch("shared.kusto_client_pool.KustoServiceClient")
+    def test_ingest_streamed_batches_failure(self, mock_kusto_service):
+        """Test a failing batch stops the pipeline and fails the invocation"""
+        mock_kusto_service.return_value.ingest_data_frame.side_effect = Exception("Kusto Service Error Emitted")
+        blob_input = func.blob.InputStream(
+            data=f"[{BLOB_DATA}, {BLOB_DATA}, {BLOB_DATA}]".encode("utf-8"),
+            name="sample_data.json",
+        )
+
+        with self.assertRaises(Exception) as e:
+            TransformHandler(blob_input=blob_input).handle_transform_request()
+
+        self.assertEqual(str(e.exception), "Ingestion failed for tables: fake_table")
+        mock_kusto_service.return_value.ingest_data_frame.assert_called_once()
+
+    @patch("shared.transform_handler.ingestion_coalescer", new_callable=lambda: IngestionCoalescer(max_seconds=0.5))
+    @patch("shared.transform_handler.COALESCE_INGESTION", True)
+    @patch.dict(os.environ, {"SLOW_START_TABLE": "fake_table"})
+    @patch("shared.kusto_client_pool.KustoServiceClient")
+    def test_coalesce_invocations(self, mock_kusto_service, mock_coalescer):
+        """Test concurrent invocations are ingested together before they complete"""
+        mock_kusto_service.return_value.table_name = "fake_table"
+        mock_kusto_service.return_value.ingest_data_frame.return_value = 10
+
+        def handle(name: str) -> None:
+            blob_input = func.blob.InputStream(data=BLOB_DATA.encode("utf-8"), name=name)
+            TransformHandler(blob_input=blob_input).handle_transform_request()
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            list(executor.map(handle, ["first.json", "second.json", "third.json"]))
+
+        ingest_data_frame = mock_kusto_service.return_value.ingest_data_frame
+        ingest_data_frame.assert_called_once()
+        self.assertEqual(len(ingest_data_frame.call_args.args[0].index), 3)
+        self.assertEqual(mock_coalescer.get_stats(), {"frames": 3, "batches": 1, "pending": 0})
+
+    @patch("shared.transform_handler.event_deduplicator", new_callable=lambda: EventDeduplicator(capacity=1000))
+    @patch("shared.transform_handler.DEDUP_ENABLED", True)
+    @patch.dict(os.environ, {"SLOW_START_TABLE": "fake_table"})
+    @patch("shared.kusto_client_pool.KustoServiceClient")
+    def test_deduplicate_retried_blob(self, mock_kusto_service, mock_deduplicator):
+        """Test events are committed once ingested and replayed events and blobs are dropped"""
+        data = f"[{BLOB_DATA}, {BLOB_DATA}]".encode("utf-8")
+        ingest_data_frame = mock_kusto_service.return_value.ingest_data_frame
+        ingest_data_frame.side_effect = [Exception("Kusto Service Error Emitted"), 10]
+
+        def handle(name: str) -> None:
+            blob_input = func.blob.InputStream(data=data, name=name, length=len(data))
+            TransformHandler(blob_input=blob_input).handle_transform_request()
+
+        with self.assertRaises(Exception):
+            handle("sample_data.json")
+        # the retry is not dropped, the copy of the event within the blob is
+        handle("sample_data.json")
+        self.assertEqual([len(call.args[0].index) for call in ingest_data_frame.call_args_list], [1, 1])
+
+        with self.assertLogs("TransformHandler", level="INFO") as context:
+            handle("sample_data.json")
+        self.assertIn(
+            f"INFO:TransformHandler:Blob sample_data.json:{len(data)} was already ingested. Exiting Function.",
+            context.output,
+        )
+        # a different blob of already ingested events has nothing to ingest
+        handle("resent_data.json")
+        self.assertEqual(ingest_data_frame.call_count, 2)
+        self.assertEqual(mock_deduplicator.get_stats(), {"duplicate_events": 4, "duplicate_blobs": 1})
+
+    @patch("shared.transform_handler.event_deduplicator", new_callable=lambda: EventDeduplicator(capacity=1000))
+    @patch("shared.transform_handler.DEDUP_ENABLED", True)
+    @patch.dict(os.environ, {"SLOW_START_TABLE": "fake_table"})
+    @patch("shared.kusto_client_pool.KustoServiceClient")
+    def test_malformed_blob_is_not_deduplicated(self, mock_kusto_service, mock_deduplicator):
+        """Test a malformed blob fails and is ingested once fixed under the same name and length"""
+        data = f"[{BLOB_DATA}, {BLOB_DATA}]".encode("utf-8")
+        malformed_data = data[:-2] + b"}}"
+
+        def handle(data: bytes) -> None:
+            blob_input = func.blob.InputStream(data=data, name="sample_data.json", length=len(data))
+            TransformHandler(blob_input=blob_input).handle_transform_request()
+
+        with self.assertLogs("EventContext", level="ERROR"):
+            with self.assertRaises(json.decoder.JSONDecodeError):
+                handle(malformed_data)
+        handle(data)
+
+        mock_kusto_service.return_value.ingest_data_frame.assert_called_once()
+        self.assertEqual(mock_deduplicator.get_stats()["duplicate_blobs"], 0)
+
+    @patch("shared.transform_handler.event_deduplicator", new_callable=lambda: EventDeduplicator(capacity=1000))
+    @patch("shared.transform_handler.DEDUP_ENABLED", True)
+    @patch.dict(os.environ, {"SLOW_START_TABLE": "fake_table", "SLOW_START_ROLLUP_TABLE": "fake_rollup_table"})
+    @patch("shared.kusto_client_pool.KustoServiceClient")
+    def test_deduplicate_per_table(self, mock_kusto_service, mock_deduplicator):
+        """Test a retry only ingests into the tables that failed"""
+        clients = {
+            table: Mock(table_name=table, **{"ingest_data_frame.return_value": 10})
+            for table in ["fake_table", "fake_rollup_table"]
+        }
+        clients["fake_rollup_table"].ingest_data_frame.side_effect = [Exception("Kusto Service Error Emitted"), 10]
+        mock_kusto_service.side_effect = lambda **kwargs: clients[kwargs["table_name"]]
+        data = f"[{BLOB_DATA}, {BLOB_DATA.replace('_00.00006', '_00.00007')}]".encode("utf-8")
+
+        def handle() -> None:
+            blob_input = func.blob.InputStream(data=data, name="sample_data.json", length=len(data))
+            TransformHandler(blob_input=blob_input).handle_transform_request()
+
+        with self.assertRaises(Exception):
+            handle()
+        handle()
+
+        raw_client, rollup_client = clients["fake_table"], clients["fake_rollup_table"]
+        raw_client.ingest_data_frame.assert_called_once()
+        self.assertEqual(len(raw_client.ingest_data_frame.call_args.args[0].index), 2)
+        self.assertEqual(rollup_client.ingest_data_frame.call_args.args[0]["event_count"].to_list(), [2])
+
+    @patch("shared.transform_handler.event_deduplicator", new_callable=lambda: EventDeduplicator(capacity=1000))
+    @patch("shared.transform_handler.DEDUP_ENABLED", True)
+    @patch.dict(os.environ, {"SLOW_START_TABLE": "fake_table"})
+    @patch("shared.transform_handler.STREAM_BATCH_SIZE", 2)
+    @patch("shared.transform_handler.STREAM_QUEUE_SIZE", 1)
+    @patch("shared.transform_handler.STREAM_INGEST_BATCHES", True)
+    @patch("shared.transform_handler.STREAM_BLOB_INPUT", True)
+    @patch("shared.kusto_client_pool.KustoServiceClient")
+    def test_deduplicate_streamed_batches(self, mock_kusto_service, mock_deduplicator):
+        """Test the batches ingested before a failure are not ingested again by the retry"""
+        ingest_data_frame = mock_kusto_service.return_value.ingest_data_frame
+        ingest_data_frame.side_effect = [10, Exception("Kusto Service Error Emitted"), 10]
+        events = [BLOB_DATA.replace("_00.00006", f"_00.0000{index}") for index in range(3)]
+        data = f"[{', '.join(events)}]".encode("utf-8")
+
+        def handle() -> None:
+            blob_input = func.blob.InputStream(data=data, name="sample_data.json", length=len(data))
+            TransformHandler(blob_input=blob_input).handle_transform_request()
+
+        with self.assertRaises(Exception):
+            handle()
+        handle()
+
+        self.assertEqual([len(call.args[0].index) for call in ingest_data_frame.call_args_list], [2, 1, 1])
+
+    @patch("shared.transform_handler.transform_pool", new_callable=lambda: TransformPool(2, start_method="fork"))
+    @patch("shared.transform_handler.TRANSFORM_SHARD_SIZE", 1)
+    @patch("shared.transform_handler.TRANSFORM_POOL_SIZE", 2)
+    @patch.dict(os.environ, {"SLOW_START_TABLE": "fake_table", "SLOW_START_ROLLUP_TABLE": "fake_rollup_table"})
+    @patch("shared.kusto_client_pool.KustoServiceClient")
+    def test_transform_shards_in_process_pool(self, mock_kusto_service, mock_pool):
+        """Test shards are transformed in worker processes and merged into one ingest per table"""
+        self.addCleanup(mock_pool.shutdown)
+        category_registry.clear()
+        self.addCleanup(category_registry.clear)
+        clients = {}
+
+        def get_client(**kwargs) -> Mock:
+            clients[kwargs["table_name"]] = Mock(**kwargs, **{"ingest_data_frame.return_value": 10})
+            return clients[kwargs["table_name"]]
+
+        mock_kusto_service.side_effect = get_client
+        blob_input = func.blob.InputStream(
+            data=f"[{BLOB_DATA}, {BLOB_DATA}, {BLOB_DATA}]".encode("utf-8"),
+            name="sample_data.json",
+        )
+        sink = Mock()
+
+        with patch("shared.invocation_metrics.get_metrics_sinks", return_value=[sink]):
+            TransformHandler(blob_input=blob_input).handle_transform_request()
+
+        raw_df = clients["fake_table"].ingest_data_frame.call_args.args[0]
+        rollup_df = clients["fake_rollup_table"].ingest_data_frame.call_args.args[0]
+        self.assertEqual(len(raw_df.index), 3)
+        self.assertEqual(rollup_df["event_count"].to_list(), [3])
+        # the merged shards are encoded with the categories of the host process
+        self.assertEqual(category_registry.get_stats()["dimension_browser_name"], 1)
+        self.assertEqual(
+            raw_df["dimension_browser_name"].dtype,
+            category_registry.encode("dimension_browser_name", raw_df["dimension_browser_name"]).dtype,
+        )
+        record = sink.emit.call_args.args[0]
+        self.assertEqual(record["counters"]["shards"], 3)
+        self.assertEqual(record["tables"]["fake_table"]["rows_in"], 3)
+
+    @patch.dict(os.environ, {"SLOW_START_TABLE": "fake_table"})
+    @patch("shared.kusto_client_pool.KustoServiceClient")
+    def test_handle_compressed_blob(self, mock_kusto_service):
+        """Test gzip compressed blobs are decompressed in both read modes"""
+        data = gzip.compress(f"[{BLOB_DATA}, {BLOB_DATA}]".encode("utf-8"))
+        ingest_data_frame = mock_kusto_service.return_value.ingest_data_frame
+
+        for stream_blob_input in (False, True):
+            with patch("shared.transform_handler.STREAM_BLOB_INPUT", stream_blob_input):
+                blob_input = func.blob.InputStream(data=data, name="sample_data.json.gz", length=len(data))
+                TransformHandler(blob_input=blob_input).handle_transform_request()
+
+            self.assertEqual(len(ingest_data_frame.call_args.args[0].index), 2)
+
+    @patch("shared.transform_handler.QUEUED_INGESTION_TABLES", ["fake_table"])
+    @patch("shared.kusto_client_pool.KustoServiceClient")
+    @patch("shared.transform_handler.get_transformations")
+    def test_queued_ingestion_table(self, mock_get_transformations, mock_kusto_service):
+        """Test tables configured for queued ingestion use a queued client."""
+        instance = MagicMock()
+        mock_get_transformations.return_value = [instance]
+        instance.table = self.table_name
+        instance.rollup_table = None
+        instance.get_dataframe.return_value = self.data_frame
+
+        transform_handler = TransformHandler(blob_input=self.blob_input)
+        transform_handler.handle_transform_request()
+
+        self.assertEqual(mock_kusto_service.call_args.kwargs["ingestion_mode"], "queued")
+        mock_kusto_service.return_value.ingest_data_frame.assert_called_once()
+
+    @patch("shared.kusto_client_pool.KustoServiceClient")
+    @patch("shared.transform_handler.get_transformations")
+    def test_kusto_clients_reused_across_invocations(self, mock_get_transformations, mock_kusto_service):
+        """Test Kusto clients are pooled between handler instances."""
+        instance = MagicMock()
+        mock_get_transformations.return_value = [instance]
+        instance.table = self.table_name
+        instance.rollup_table = None
+        instance.get_dataframe.return_value = self.data_frame
+
+        for _ in range(3):
+            blob_input = func.blob.InputStream(data=BLOB_DATA.encode("utf-8"), name="sample_data.json")
+            transform_handler = TransformHandler(blob_input=blob_input)
+            transform_handler.handle_transform_request()
+
+        self.assertEqual(mock_kusto_service.call_count, 1)
+        self.assertEqual(kusto_client_pool.get_stats(), {"hits": 2, "misses": 1, "size": 1})
+
+    @patch("shared.kusto_client_pool.KustoServiceClient")
+    def test_failing_table_does_not_block_other_tables(self, mock_kusto_service):
+        """Test every table is ingested even if one of them fails."""
+        clients = {
+            table: Mock(table_name=table, **{"ingest_data_frame.return_value": 10})
+            for table in ["table_a", "table_b", "table_c"]
+        }
+        clients["table_b"].ingest_data_frame.side_effect = Exception("Kusto Service Error Emitted")
+        mock_kusto_service.side_effect = lambda **kwargs: clients[kwargs["table_name"]]
+        transforms = []
+        for table in clients:
+            transform = Mock()
+            transform.table = table
+            transform.rollup_table = None
+            transform.column_types = {}
+            transform.get_dataframe.return_value = self.data_frame
+            transform.get_events.return_value = [{}] * 5
+            transforms.append(transform)
+
+        with patch("shared.transform_handler.get_transformations", return_value=transforms):
+            with self.assertLogs("TransformHandler", level="INFO") as context:
+                with self.assertRaises(Exception) as e:
+                    TransformHandler(blob_input=self.blob_input).handle_transform_request()
+
+        self.assertEqual(str(e.exception), "Ingestion failed for tables: table_b")
+        for client in clients.values():
+            client.ingest_data_frame.assert_called_once_with(self.data_frame)
+        self.assertIn(
+            "ERROR:TransformHandler:Failed to Ingest Frames to Table: table_b. Kusto Service Error Emitted",
+            context.output,
+        )
+        self.assertEqual(
+            len([line for line in context.output if "Ingested Frames to Table" in line]), 2
+        )
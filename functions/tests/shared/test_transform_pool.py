@@ -0,0 +1,51 @@
+import os
+import unittest
+from unittest.mock import patch
+
+from shared.transform_pool import TransformPool, transform_shard
+from transformations.event_context import EventContext
+from transformations.transform_definition import get_transform_definitions
+from utils.dictionary_encoding import concat_frames
+
+from .test_transform_handler import BLOB_DATA
+
+
+class TestTransformPool(unittest.TestCase):
+    def setUp(self) -> None:
+        self.events = EventContext.from_json_string(f"[{BLOB_DATA}, {BLOB_DATA}, {BLOB_DATA}]").events
+        # forked workers inherit the patched table names
+        self.pool = TransformPool(2, start_method="fork")
+        self.addCleanup(self.pool.shutdown)
+        # definitions read their tables from the patched environment
+        get_transform_definitions.cache_clear()
+        self.addCleanup(get_transform_definitions.cache_clear)
+
+    @patch.dict(os.environ, {"SLOW_START_TABLE": "fake_table"})
+    def test_transform_shard(self):
+        """Test a shard is transformed into the data frame and routed events of each table"""
+        data_frame, rows_in = transform_shard(self.events[:2])["fake_table"]
+
+        self.assertEqual(rows_in, 2)
+        self.assertEqual(len(data_frame.index), 2)
+
+    @patch.dict(os.environ, {"SLOW_START_TABLE": "fake_table"})
+    def test_map_shards(self):
+        """Test the shards are transformed in order and merge to the frame of all events"""
+        results = self.pool.map_shards(self.events, shard_size=2)
+
+        self.assertEqual([result["fake_table"][1] for result in results], [2, 1])
+        merged = concat_frames([result["fake_table"][0] for result in results])
+        expected = transform_shard(self.events)["fake_table"][0]
+        self.assertEqual(merged.astype(str).values.tolist(), expected.astype(str).values.tolist())
+
+    @patch.dict(os.environ, {"SLOW_START_TABLE": "fake_table"})
+    def test_pool_reused(self):
+        """Test the worker processes are started once and restarted after shutdown"""
+        self.pool.map_shards(self.events, shard_size=2)
+        executor = self.pool._TransformPool__executor
+        self.pool.map_shards(self.events, shard_size=2)
+        self.assertIs(self.pool._TransformPool__executor, executor)
+
+        self.pool.shutdown()
+        self.assertIsNone(self.pool._TransformPool__executor)
+        self.assertEqual(len(self.pool.map_shards(self.events, shard_size=3)), 1)
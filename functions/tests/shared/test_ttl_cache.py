@@ -0,0 +1,81 @@
+import threading
+import unittest
+from unittest.mock import Mock, patch
+
+from shared.ttl_cache import TTLCache
+
+
+class TestTTLCache(unittest.TestCase):
+    def test_get_or_load(self):
+        """Test values are loaded once and then served from the cache"""
+        cache = TTLCache()
+        loader = Mock(return_value="name")
+
+        self.assertEqual(cache.get_or_load("feed", loader), "name")
+        self.assertEqual(cache.get_or_load("feed", loader), "name")
+
+        loader.assert_called_once()
+        self.assertEqual(
+            cache.get_stats(), {"hits": 1, "misses": 1, "evictions": 0, "size": 1, "hit_rate": 0.5}
+        )
+
+    @patch("shared.ttl_cache.time.monotonic")
+    def test_expiry(self, mock_monotonic: Mock):
+        """Test values are loaded again after their TTL"""
+        mock_monotonic.return_value = 100
+        cache = TTLCache(ttl_seconds=10)
+        cache.get_or_load("feed", lambda: "old")
+
+        mock_monotonic.return_value = 109
+        self.assertEqual(cache.get_or_load("feed", lambda: "new"), "old")
+        mock_monotonic.return_value = 110
+        self.assertEqual(cache.get_or_load("feed", lambda: "new"), "new")
+
+    def test_lru_eviction(self):
+        """Test the least recently used entry is evicted first"""
+        cache = TTLCache(max_size=2)
+        cache.set_many({"a": 1, "b": 2})
+        cache.get_or_load("a", Mock())
+
+        cache.get_or_load("c", lambda: 3)
+
+        self.assertEqual(cache.get_or_load("a", Mock()), 1)
+        self.assertEqual(cache.get_or_load("b", lambda: "reloaded"), "reloaded")
+        self.assertEqual(cache.get_stats()["evictions"], 2)
+
+    def test_single_flight(self):
+        """Test concurrent misses of a key call the loader once"""
+        cache = TTLCache()
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        def loader():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return "name"
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get_or_load("feed", loader)))
+            for _ in range(4)
+        ]
+        threads[0].start()
+        started.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["name"] * 4)
+
+    def test_loader_error(self):
+        """Test failed loads are raised and not cached"""
+        cache = TTLCache()
+
+        with self.assertRaises(ValueError):
+            cache.get_or_load("feed", Mock(side_effect=ValueError("api error")))
+
+        self.assertEqual(cache.get_or_load("feed", lambda: "name"), "name")
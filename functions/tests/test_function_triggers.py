@@ -5,6 +5,7 @@ from datetime import datetime
 from unittest.mock import Mock, patch
 
 import azure.functions as func
+from batch_http_trigger import main as batch_http_main
 from blob_storage_trigger import main as blob_main
 from event_grid_trigger import main as event_main
 from http_trigger import main as http_main
@@ -107,3 +108,60 @@ class TestFunctionTriggers(unittest.TestCase):
         http_main(req=self.req, blobInput=self.blob_input)
         mock_transform_handler.assert_called_once_with(blob_input=self.blob_input)
         mock_transform_handler_instance.handle_transform_request.assert_called_once()
+
+    @patch("batch_http_trigger.get_blob_source")
+    @patch("batch_http_trigger.BatchIngestionHandler")
+    def test_batch_http_trigger_main(
+        self,
+        mock_batch_handler: Mock,
+        mock_get_blob_source: Mock,
+    ):
+        """Test Batch HTTP Trigger ingests the blobs of a prefix and reports remaining blobs"""
+        source = mock_get_blob_source.return_value
+        source.list_blobs.return_value = ["2022/05/31/a.json", "2022/05/31/b.json"]
+        mock_batch_handler.return_value.handle.return_value = {"remaining": 1}
+        req = func.HttpRequest(
+            "post",
+            "https://sample_url.com",
+            body=json.dumps({"prefix": "2022/05/31/", "checkpoint": "backfill"}).encode("utf-8"),
+        )
+        # Act
+        response = batch_http_main(req=req)
+        source.list_blobs.assert_called_once_with(prefix="2022/05/31/")
+        mock_batch_handler.assert_called_once_with(
+            source, source.list_blobs.return_value, checkpoint=source.get_checkpoint.return_value
+        )
+        source.get_checkpoint.assert_called_once_with("backfill")
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(json.loads(response.get_body()), {"remaining": 1})
+
+    def test_batch_http_trigger_invalid_body(self):
+        """Test Batch HTTP Trigger rejects a request without blobs"""
+        req = func.HttpRequest("post", "https://sample_url.com", body=b"")
+        response = batch_http_main(req=req)
+        self.assertEqual(response.status_code, 400)
+
+    @patch("batch_http_trigger.get_blob_source")
+    @patch("batch_http_trigger.BatchIngestionHandler")
+    def test_batch_http_trigger_invalid_blobs(self, mock_batch_handler: Mock, mock_get_blob_source: Mock):
+        """Test Batch HTTP Trigger rejects blobs that are not a list of names"""
+        for body in [{"blobs": "2022/05/31/a.json"}, {"blobs": ["2022/05/31/a.json", 1]}, {"prefix": ["2022"]}]:
+            with self.subTest(body=body):
+                req = func.HttpRequest("post", "https://sample_url.com", body=json.dumps(body).encode("utf-8"))
+                response = batch_http_main(req=req)
+                self.assertEqual(response.status_code, 400)
+        mock_batch_handler.assert_not_called()
+
+    @patch("batch_http_trigger.get_blob_source")
+    @patch("batch_http_trigger.BatchIngestionHandler")
+    def test_batch_http_trigger_blobs(self, mock_batch_handler: Mock, mock_get_blob_source: Mock):
+        """Test Batch HTTP Trigger ingests the listed blobs"""
+        source = mock_get_blob_source.return_value
+        mock_batch_handler.return_value.handle.return_value = {"remaining": 0}
+        blobs = ["2022/05/31/a.json", "2022/05/31/b.json"]
+        req = func.HttpRequest("post", "https://sample_url.com", body=json.dumps({"blobs": blobs}).encode("utf-8"))
+        # Act
+        response = batch_http_main(req=req)
+        source.list_blobs.assert_not_called()
+        mock_batch_handler.assert_called_once_with(source, blobs, checkpoint=None)
+        self.assertEqual(response.status_code, 200)
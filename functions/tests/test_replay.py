@@ -0,0 +1,103 @@
+import gzip
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import pandas as pd
+from replay import find_event_files, ingest_file, load_settings, read_events, write_events
+from shared.kusto_client_pool import kusto_client_pool
+from transformations.transform_definition import get_transform_definitions
+
+EVENTS = [
+    {"event_id": "1", "event": {"type": "playback_start", "attributes": {"startup_duration_content_ms": 506}}},
+    {"event_id": "2", "event": {"type": "heartbeat"}},
+]
+
+
+class TestReplay(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def write(self, name: str, data: bytes) -> str:
+        path = os.path.join(self.directory.name, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as file:
+            file.write(data)
+        return path
+
+    def test_read_events(self):
+        """Test files are read like streamed blobs whatever their extension"""
+        ndjson = "\n".join(json.dumps(event) for event in EVENTS).encode("utf-8")
+        files = {
+            "array.json": json.dumps(EVENTS).encode("utf-8"),
+            "events.ndjson": ndjson,
+            "events.ndjson.gz": gzip.compress(ndjson),
+            "concatenated.json.gz": gzip.compress(ndjson),
+            "arrays.json": (json.dumps(EVENTS[:1]) + json.dumps(EVENTS[1:])).encode("utf-8"),
+            "compressed.json": gzip.compress(json.dumps(EVENTS).encode("utf-8")),
+        }
+        for name, data in files.items():
+            self.assertEqual(read_events(self.write(name, data)), (EVENTS, len(data)), name)
+        self.assertEqual(read_events(self.write("single.json", json.dumps(EVENTS[0]).encode("utf-8")))[0], EVENTS[:1])
+
+    def test_find_event_files(self):
+        """Test directories are searched recursively for event files"""
+        self.write("a/1.json", b"[]")
+        self.write("a/b/2.ndjson.gz", b"")
+        self.write("a/b/3.jsonl.zst", b"")
+        self.write("a/notes.txt", b"")
+
+        files = find_event_files([os.path.join(self.directory.name, "a")])
+
+        self.assertEqual([os.path.basename(file) for file in files], ["1.json", "2.ndjson.gz", "3.jsonl.zst"])
+
+    @patch.dict(os.environ, {"SLOW_START_TABLE": "configured_table"})
+    def test_load_settings(self):
+        """Test settings of the file and default tables only apply when not set in the environment"""
+        path = self.write("local.settings.json", json.dumps({"Values": {"KUSTO_DATABASE": "replay"}}).encode("utf-8"))
+
+        settings = load_settings(path)
+
+        self.assertEqual(settings["KUSTO_DATABASE"], "replay")
+        self.assertNotIn("SLOW_START_TABLE", settings)
+        with patch.dict(os.environ, {"SLOW_START_TABLE": ""}):
+            self.assertEqual(load_settings(path)["SLOW_START_TABLE"], "slow_start_anomaly_detection")
+
+    @patch.dict(os.environ, {"SLOW_START_TABLE": "slow_start"})
+    def test_write_events(self):
+        """Test the rows of every table are written to Parquet files"""
+        get_transform_definitions.cache_clear()
+        self.addCleanup(get_transform_definitions.cache_clear)
+
+        rows = write_events(EVENTS, "000000_events", "parquet", self.directory.name)
+
+        self.assertEqual(rows["slow_start"], 1)
+        data_frame = pd.read_parquet(os.path.join(self.directory.name, "slow_start", "000000_events.parquet"))
+        self.assertEqual(data_frame["measurement_startup_duration_content_ms"].to_list(), [506.0])
+
+    @patch.dict(os.environ, {"SLOW_START_TABLE": "slow_start"})
+    @patch("shared.kusto_client_pool.KustoServiceClient")
+    def test_ingest_file(self, mock_kusto_service):
+        """Test a file is handled as a blob by TransformHandler in both read modes"""
+        get_transform_definitions.cache_clear()
+        self.addCleanup(get_transform_definitions.cache_clear)
+        kusto_client_pool.clear()
+        self.addCleanup(kusto_client_pool.clear)
+        mock_kusto_service.return_value.ingest_data_frame.return_value = 1
+        path = self.write("events.json", "\n".join(json.dumps(event) for event in EVENTS).encode("utf-8"))
+
+        for stream_blob_input in (True, False):
+            with patch("shared.transform_handler.STREAM_BLOB_INPUT", stream_blob_input):
+                if stream_blob_input:
+                    events, size, rows = ingest_file(path)
+                    self.assertEqual((events, size, rows["slow_start"]), (2, os.path.getsize(path), 1))
+                else:
+                    # like the blob trigger, a whole blob is parsed as a single JSON document
+                    with self.assertLogs("EventContext", level="ERROR"):
+                        with self.assertRaises(json.decoder.JSONDecodeError):
+                            ingest_file(path)
@@ -0,0 +1,65 @@
+import unittest
+
+import pandas as pd
+from transformations.column_extractor import ColumnExtractor, get_column_extractor
+
+EVENTS = [
+    {
+        "event": {"type": "playback_start", "attributes": {"startup_duration_content_ms": 506}},
+        "device": {"browser_name": "Chrome", "os_name": "Windows", "browser_width": 1658},
+        "geo_location": {"country": "United States", "latitude": 41.6853},
+    },
+    {
+        "event": {"type": "buffer_start"},
+        "device": {"browser_name": "Safari"},
+    },
+]
+
+
+class TestColumnExtractor(unittest.TestCase):
+    def setUp(self) -> None:
+        self.paths = (
+            "event.type",
+            "event.attributes.startup_duration_content_ms",
+            "device.browser_name",
+            "geo_location.country",
+        )
+        self.extractor = ColumnExtractor(self.paths)
+
+    def test_extract_only_requested_paths(self):
+        """Test only the compiled paths become columns"""
+        df = self.extractor.extract(EVENTS)
+
+        self.assertEqual(df.columns.to_list(), list(self.paths))
+        self.assertEqual(df["event.type"].to_list(), ["playback_start", "buffer_start"])
+        self.assertEqual(df["device.browser_name"].to_list(), ["Chrome", "Safari"])
+
+    def test_extract_matches_json_normalize(self):
+        """Test extracted values match pd.json_normalize for the same paths"""
+        expected = pd.json_normalize(EVENTS).loc[:, list(self.paths)]
+        actual = self.extractor.extract(EVENTS)
+
+        pd.testing.assert_frame_equal(actual, expected)
+
+    def test_missing_paths_are_left_out(self):
+        """Test paths absent from every event are not returned as columns"""
+        extractor = ColumnExtractor(("device.browser_name", "network.asn"))
+        df = extractor.extract(EVENTS)
+
+        self.assertEqual(df.columns.to_list(), ["device.browser_name"])
+
+    def test_extract_single_event(self):
+        """Test a single JSON object is extracted as one row"""
+        df = self.extractor.extract(EVENTS[0])
+
+        self.assertEqual(len(df.index), 1)
+        self.assertEqual(df["geo_location.country"][0], "United States")
+
+    def test_extract_empty(self):
+        """Test empty input returns an empty DataFrame"""
+        self.assertTrue(self.extractor.extract([]).empty)
+        self.assertTrue(self.extractor.extract([{}]).empty)
+
+    def test_get_column_extractor_is_cached(self):
+        """Test compiled extractors are reused for the same paths"""
+        self.assertIs(get_column_extractor(self.paths), get_column_extractor(self.paths))
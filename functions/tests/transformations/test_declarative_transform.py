@@ -0,0 +1,188 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from transformations.declarative_transform import DeclarativeTransform
+from transformations.event_context import EventContext
+from transformations.transform_definition import (
+    DEFAULT_DEFINITIONS_PATH,
+    TransformDefinition,
+    get_shared_paths,
+    load_transform_definitions,
+)
+
+STALL_DEFINITION = {
+    "name": "stall",
+    "table": "stall_table",
+    "event_types": ["playback_stall"],
+    "mappings": {
+        "user_details.content_session_id": "user_details_content_session_id",
+        "event.attributes.stall_duration_ms": "measurement_stall_duration_ms",
+    },
+    "column_types": {"measurement_stall_duration_ms": "decimal"},
+    "derived_columns": {"measurement_stall_duration_s": "measurement_stall_duration_ms / 1000"},
+}
+
+STALL_BUFFER_DEFINITION = {
+    "name": "stall_buffer",
+    "table": "stall_buffer_table",
+    "event_types": ["playback_stall"],
+    "mappings": {"event.attributes.buffer_length_ms": "measurement_buffer_length_ms"},
+}
+
+BROWSER_DEFINITION = {
+    "name": "browser",
+    "table": "browser_table",
+    "mappings": {"device.browser_name": "dimension_browser_name"},
+}
+
+EVENTS = [
+    {
+        "event": {"type": "playback_stall", "attributes": {"stall_duration_ms": 1500}},
+        "user_details": {"content_session_id": "session-1"},
+        "device": {"browser_name": "Chrome"},
+    },
+    {
+        "event": {"type": "playback_start", "attributes": {"startup_duration_content_ms": 506}},
+        "user_details": {"content_session_id": "session-2"},
+        "device": {"browser_name": "Firefox"},
+    },
+    {
+        "event": {"type": "playback_stall", "attributes": {"stall_duration_ms": "250"}},
+        "user_details": {"content_session_id": "session-3"},
+    },
+]
+
+
+def get_transforms(context: EventContext, *definitions: dict) -> list[DeclarativeTransform]:
+    """Create the declarative transforms of definitions
+
+    Args:
+        context (EventContext): shared context
+        *definitions (dict): JSON definitions
+
+    Returns:
+        list[DeclarativeTransform]: transforms
+    """
+    loaded = tuple(TransformDefinition.from_dict(definition) for definition in definitions)
+    shared_paths = get_shared_paths(loaded)
+    return [
+        DeclarativeTransform(context, definition, shared_paths[definition.get_event_types()])
+        for definition in loaded
+    ]
+
+
+class TestDeclarativeTransform(unittest.TestCase):
+    def test_get_dataframe(self):
+        """Test routed events are mapped and derived columns are added"""
+        stall_transform, = get_transforms(EventContext(EVENTS), STALL_DEFINITION)
+
+        actual_df = stall_transform.get_dataframe()
+
+        self.assertEqual(stall_transform.table, "stall_table")
+        self.assertEqual(
+            actual_df.columns.to_list(),
+            ["user_details_content_session_id", "measurement_stall_duration_ms", "measurement_stall_duration_s"],
+        )
+        self.assertEqual(actual_df["user_details_content_session_id"].to_list(), ["session-1", "session-3"])
+        self.assertEqual(actual_df["measurement_stall_duration_s"].to_list(), [1.5, 0.25])
+
+    def test_shared_extraction(self):
+        """Test definitions of the same event types share one extraction of their routed events"""
+        context = EventContext(EVENTS)
+        stall_transform, buffer_transform, browser_transform = get_transforms(
+            context, STALL_DEFINITION, STALL_BUFFER_DEFINITION, BROWSER_DEFINITION
+        )
+
+        with patch.object(context, "get_mapped_df", wraps=context.get_mapped_df) as get_mapped_df:
+            stall_transform.get_dataframe()
+            buffer_df = buffer_transform.get_dataframe()
+            browser_df = browser_transform.get_dataframe()
+
+        self.assertEqual(
+            stall_transform.shared_paths,
+            (
+                "user_details.content_session_id",
+                "event.attributes.stall_duration_ms",
+                "event.attributes.buffer_length_ms",
+            ),
+        )
+        self.assertIs(buffer_transform.shared_paths, stall_transform.shared_paths)
+        self.assertEqual(browser_transform.shared_paths, ("device.browser_name",))
+        self.assertEqual(
+            {call.args for call in get_mapped_df.call_args_list},
+            {(stall_transform.shared_paths, ("playback_stall",)), (browser_transform.shared_paths, None)},
+        )
+        self.assertEqual(len(buffer_df.index), 2)
+        # no event type filter, events without the path get an empty value
+        self.assertEqual(browser_df["dimension_browser_name"].to_list(), ["Chrome", "Firefox", None])
+
+    def test_get_empty_dataframe(self):
+        """Test an empty dataframe is returned if no event is routed to the definition"""
+        stall_transform, = get_transforms(EventContext(EVENTS[1:2]), STALL_DEFINITION)
+
+        self.assertTrue(stall_transform.get_dataframe().empty)
+
+
+class TestTransformDefinition(unittest.TestCase):
+    def test_table_setting(self):
+        """Test the table is read from the env variable named by `table_setting`"""
+        definition = {**BROWSER_DEFINITION, "table": None, "table_setting": "BROWSER_TABLE"}
+
+        with patch.dict(os.environ, {"BROWSER_TABLE": "browser_anomaly"}):
+            self.assertEqual(TransformDefinition.from_dict(definition).table, "browser_anomaly")
+        with patch.dict(os.environ, {}, clear=True):
+            self.assertIsNone(TransformDefinition.from_dict(definition))
+
+    def test_invalid_definitions(self):
+        """Test invalid definitions are rejected"""
+        invalid_definitions = [
+            {**BROWSER_DEFINITION, "name": ""},
+            {**BROWSER_DEFINITION, "mappings": {}},
+            {**BROWSER_DEFINITION, "event_types": "playback_start"},
+            {**BROWSER_DEFINITION, "derived_columns": {"dimension_browser_name": "1"}},
+        ]
+        for definition in invalid_definitions:
+            with self.assertRaises(ValueError):
+                TransformDefinition.from_dict(definition)
+
+    def test_load_transform_definitions(self):
+        """Test definitions are loaded from a JSON file"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "definitions.json")
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump({"transforms": [STALL_DEFINITION, BROWSER_DEFINITION]}, file)
+
+            definitions = load_transform_definitions(path)
+
+        self.assertEqual([definition.name for definition in definitions], ["stall", "browser"])
+
+    def test_rollup_table_setting(self):
+        """Test the rollup table is read from `rollup_table_setting` and needs a mapped measure"""
+        definition = {
+            **STALL_DEFINITION,
+            "rollup_table_setting": "STALL_ROLLUP_TABLE",
+            "rollup_measure": "measurement_stall_duration_s",
+            "rollup_dimensions": ["user_details_content_session_id"],
+        }
+
+        with patch.dict(os.environ, {"STALL_ROLLUP_TABLE": "stall_rollup"}):
+            stall_transform, = get_transforms(EventContext(EVENTS), definition)
+            with self.assertRaises(ValueError):
+                TransformDefinition.from_dict({**definition, "rollup_measure": "measurement_bitrate_kbps"})
+        with patch.dict(os.environ, {}, clear=True):
+            self.assertIsNone(TransformDefinition.from_dict(definition).rollup_table)
+
+        self.assertEqual(stall_transform.rollup_table, "stall_rollup")
+        self.assertEqual(stall_transform.rollup_measure, "measurement_stall_duration_s")
+        self.assertEqual(stall_transform.rollup_dimensions, ["user_details_content_session_id"])
+
+    def test_default_definitions(self):
+        """Test the shipped definitions are valid"""
+        with patch.dict(os.environ, {"SLOW_START_TABLE": "slow_start", "SLOW_START_ROLLUP_TABLE": "slow_start_rollup"}):
+            definitions = load_transform_definitions(DEFAULT_DEFINITIONS_PATH)
+
+        self.assertEqual([definition.table for definition in definitions], ["slow_start"])
+        self.assertEqual([definition.rollup_table for definition in definitions], ["slow_start_rollup"])
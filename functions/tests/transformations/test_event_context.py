@@ -0,0 +1,124 @@
+import json
+import os
+import unittest
+from unittest.mock import patch
+
+from transformations.event_context import EventContext
+from transformations.index import get_transformations
+from transformations.transform_definition import get_transform_definitions
+
+JSON_DATA = """[
+    {
+        "event": {"type": "playback_start", "attributes": {"startup_duration_content_ms": 506}},
+        "user_details": {"app_session_id": "5555555", "content_session_id": "98877666544321"},
+        "device": {"browser_name": "Windows Explorer", "os_name": "Windows"}
+    },
+    {
+        "event": {"type": "buffer_start"},
+        "device": {"browser_name": "Chrome"}
+    }
+]"""
+
+
+class TestEventContext(unittest.TestCase):
+    def test_from_json_string(self):
+        """Test JSON string is parsed to events"""
+        context = EventContext.from_json_string(JSON_DATA)
+
+        self.assertEqual(len(context.events), 2)
+
+    def test_from_bad_json_string(self):
+        """Test malformed JSON logs an error and returns an empty event"""
+        with self.assertLogs("EventContext", level="ERROR"):
+            context = EventContext.from_json_string('[{"event: 1}]')
+
+        self.assertEqual(context.events, [{}])
+
+    def test_from_bad_json_string_strict(self):
+        """Test malformed JSON raises in strict mode and a blank string has no events"""
+        with self.assertLogs("EventContext", level="ERROR"):
+            with self.assertRaises(json.decoder.JSONDecodeError):
+                EventContext.from_json_string('[{"event: 1}]', strict=True)
+
+        self.assertEqual(EventContext.from_json_string(" \n", strict=True).events, [])
+
+    def test_normalized_df_is_cached(self):
+        """Test events are only normalized once"""
+        context = EventContext.from_json_string(JSON_DATA)
+
+        with patch("transformations.event_context.pd.json_normalize") as mock_normalize:
+            first = context.get_normalized_df()
+            second = context.get_normalized_df()
+
+        mock_normalize.assert_called_once_with(context.events)
+        self.assertIs(first, second)
+
+    def test_mapped_df_is_cached_per_paths(self):
+        """Test extraction runs once per set of paths"""
+        context = EventContext.from_json_string(JSON_DATA)
+        paths = ("event.type", "device.browser_name")
+
+        first = context.get_mapped_df(paths)
+
+        self.assertIs(context.get_mapped_df(paths), first)
+        self.assertEqual(first["device.browser_name"].to_list(), ["Windows Explorer", "Chrome"])
+        self.assertEqual(context.get_mapped_df(("event.type",)).columns.to_list(), ["event.type"])
+
+    @patch("transformations.event_context.time.perf_counter", side_effect=[1.0, 1.25, 2.0, 2.5])
+    def test_normalize_time(self, mock_perf_counter):
+        """Test the time of normalizing and extracting is summed up once per cached DataFrame"""
+        context = EventContext.from_json_string(JSON_DATA)
+
+        context.get_normalized_df()
+        context.get_normalized_df()
+        context.get_mapped_df(("event.type",))
+
+        self.assertEqual(context.normalize_ms, 750)
+
+    @patch.dict(os.environ, {"SLOW_START_TABLE": "slow_start"})
+    def test_transforms_share_parsed_events(self):
+        """Test the JSON string is parsed once for many transforms"""
+        get_transform_definitions.cache_clear()
+        self.addCleanup(get_transform_definitions.cache_clear)
+        get_transform_definitions()
+
+        with patch("transformations.event_context.json.loads", wraps=json.loads) as mock_loads:
+            context = EventContext.from_json_string(JSON_DATA)
+            transforms = [transform for _ in range(3) for transform in get_transformations(context)]
+            frames = [transform.get_dataframe() for transform in transforms]
+
+        mock_loads.assert_called_once()
+        self.assertTrue(all(transform.json_data is context.events for transform in transforms))
+        self.assertTrue(all(len(frame.index) == 1 for frame in frames))
+
+    def test_get_events_routes_by_event_type(self):
+        """Test events are partitioned by event.type"""
+        context = EventContext.from_json_string(JSON_DATA)
+
+        self.assertEqual(len(context.get_events()), 2)
+        self.assertEqual(
+            [event["event"]["type"] for event in context.get_events(("playback_start",))],
+            ["playback_start"],
+        )
+        self.assertEqual(len(context.get_events(("playback_start", "buffer_start"))), 2)
+        self.assertEqual(context.get_events(("playback_error",)), [])
+
+    def test_events_are_partitioned_once(self):
+        """Test event types are only looked up in a single pass"""
+        context = EventContext.from_json_string(JSON_DATA)
+
+        with patch.object(
+            EventContext, "_EventContext__get_event_type", wraps=lambda event: event["event"]["type"]
+        ) as mock_get_event_type:
+            context.get_events(("playback_start",))
+            context.get_events(("buffer_start",))
+
+        self.assertEqual(mock_get_event_type.call_count, 2)
+
+    def test_routed_mapped_df(self):
+        """Test only routed events are extracted"""
+        context = EventContext.from_json_string(JSON_DATA)
+
+        mapped_df = context.get_mapped_df(("device.browser_name",), ("buffer_start",))
+
+        self.assertEqual(mapped_df["device.browser_name"].to_list(), ["Chrome"])
@@ -0,0 +1,119 @@
+import unittest
+
+import pandas as pd
+from transformations.rollup import (
+    compute_partial_rollup,
+    compute_rollup,
+    finalize_rollup,
+    merge_partial_rollups,
+)
+from utils.dictionary_encoding import CategoryRegistry
+from utils.quantile_sketch import QuantileSketch, merge_sketches
+
+COLUMNS = ["timestamp", "browser", "country", "event_count", "mean", "p50", "p95", "p99", "sketch"]
+
+
+class TestRollup(unittest.TestCase):
+    def setUp(self) -> None:
+        registry = CategoryRegistry()
+        self.data_frame = pd.DataFrame({
+            "timestamp": pd.to_datetime([0, 1000, 2000, 61000, 3000, None], unit="ms", utc=True),
+            "browser": registry.encode("browser", pd.Series(["Chrome", "Chrome", "Chrome", "Chrome", None, "Chrome"])),
+            "country": ["US", "US", "US", None, "DE", "US"],
+            "duration": [100.0, 300.0, 200.0, 50.0, 10.0, 1.0],
+        })
+
+    def test_compute_rollup(self):
+        """Test rows are aggregated per minute and dimension combination"""
+        rollup_df = compute_rollup(self.data_frame, "duration", ["browser", "country"])
+
+        self.assertEqual(rollup_df.columns.to_list(), COLUMNS)
+        rows = {
+            (row.timestamp.isoformat(), str(row.browser), str(row.country)): (row.event_count, row.mean, row.p50)
+            for row in rollup_df.itertuples()
+        }
+        self.assertEqual(rows, {
+            ("1970-01-01T00:00:00+00:00", "Chrome", "US"): (3, 200.0, 200.0),
+            ("1970-01-01T00:01:00+00:00", "Chrome", "nan"): (1, 50.0, 50.0),
+            ("1970-01-01T00:00:00+00:00", "nan", "DE"): (1, 10.0, 10.0),
+        })
+        chrome_us = rollup_df[(rollup_df["country"] == "US")].iloc[0]
+        self.assertEqual(chrome_us["event_count"], 3)
+        self.assertAlmostEqual(chrome_us["p95"], 290.0)
+        # rows with a missing dimension are kept, rows without timestamp are dropped
+        self.assertEqual(rollup_df["event_count"].sum(), 5)
+        self.assertEqual(rollup_df["browser"].dtype, "category")
+
+    def test_compute_rollup_sketch(self):
+        """Test the sketches of the buckets merge to the sketch of all rows"""
+        rollup_df = compute_rollup(self.data_frame, "duration", ["browser"], bucket="1h")
+
+        sketch = merge_sketches(rollup_df["sketch"])
+        self.assertEqual(sketch.count, 5)
+        chrome = QuantileSketch.from_dict(rollup_df[rollup_df["browser"] == "Chrome"]["sketch"].iloc[0])
+        self.assertEqual(chrome.count, 4)
+        self.assertAlmostEqual(chrome.quantile(1), 300.0)
+
+    def test_compute_rollup_missing_dimension(self):
+        """Test dimensions missing in the rows are returned empty"""
+        rollup_df = compute_rollup(self.data_frame, "duration", ["browser", "city"])
+
+        self.assertTrue(rollup_df["city"].isna().all())
+
+    def test_compute_empty_rollup(self):
+        """Test an empty frame has no rollup rows"""
+        rollup_df = compute_rollup(self.data_frame.iloc[0:0], "duration", ["browser", "country"])
+
+        self.assertTrue(rollup_df.empty)
+        self.assertEqual(rollup_df.columns.to_list(), COLUMNS)
+
+    def test_merge_partial_rollups(self):
+        """Test partial rollups of batches merge to the rollup of all rows"""
+        dimensions = ["browser", "country"]
+        partial_df = None
+        for start in range(0, len(self.data_frame.index), 2):
+            batch_df = compute_partial_rollup(self.data_frame.iloc[start:start + 2], "duration", dimensions)
+            partial_df = merge_partial_rollups([partial_df, batch_df], dimensions)
+        rollup_df = finalize_rollup(partial_df, dimensions)
+
+        self.assertEqual(rollup_df.columns.to_list(), COLUMNS)
+        expected_df = compute_rollup(self.data_frame, "duration", dimensions)
+        key = ["timestamp", *dimensions]
+        rollup_df = rollup_df.astype({column: str for column in dimensions}).sort_values(key, ignore_index=True)
+        expected_df = expected_df.astype({column: str for column in dimensions}).sort_values(key, ignore_index=True)
+        pd.testing.assert_frame_equal(
+            rollup_df[[*key, "event_count", "mean"]], expected_df[[*key, "event_count", "mean"]], check_dtype=False
+        )
+        self.assertEqual(rollup_df["sketch"].to_list(), expected_df["sketch"].to_list())
+        # the quantiles are read from the sketches instead of the rows
+        for row in rollup_df.itertuples():
+            sketch = QuantileSketch.from_dict(row.sketch)
+            self.assertEqual((row.p50, row.p95, row.p99), tuple(sketch.quantile(q) for q in (0.5, 0.95, 0.99)))
+        chrome_us = rollup_df[rollup_df["country"] == "US"].iloc[0]
+        self.assertAlmostEqual(chrome_us["p50"], 200.0, delta=2.0)
+
+    def test_merge_partial_rollups_categories(self):
+        """Test partial rollups with different dimension categories are merged per value"""
+        first_df = pd.DataFrame({
+            "timestamp": pd.to_datetime([0], unit="ms", utc=True),
+            "browser": pd.Categorical(["Chrome"], categories=["Chrome"]),
+            "duration": [100.0],
+        })
+        second_df = first_df.assign(browser=pd.Categorical(["Chrome"], categories=["Edge", "Chrome"]))
+
+        partial_df = merge_partial_rollups(
+            [compute_partial_rollup(frame, "duration", ["browser"]) for frame in (first_df, second_df)], ["browser"]
+        )
+
+        self.assertEqual(len(partial_df.index), 1)
+        self.assertEqual(partial_df["browser"].iloc[0], "Chrome")
+        self.assertEqual(partial_df["event_count"].iloc[0], 2)
+        self.assertEqual(partial_df["sketch"].iloc[0].count, 2)
+
+    def test_merge_empty_partial_rollups(self):
+        """Test merging no rows has no rollup rows"""
+        partial_df = merge_partial_rollups(
+            [None, compute_partial_rollup(self.data_frame.iloc[0:0], "duration", ["browser"])], ["browser"]
+        )
+
+        self.assertTrue(finalize_rollup(partial_df, ["browser"]).empty)
@@ -1,7 +1,15 @@
+import os
 import unittest
+from typing import Union
+from unittest.mock import patch
 
-from transformations.slow_start_transform import SlowStartTransform
-from utils.settings import SLOW_START_TABLE
+import pandas as pd
+
+from transformations.declarative_transform import DeclarativeTransform
+from transformations.index import get_transformations
+from transformations.transform_definition import get_transform_definitions
+
+SLOW_START_TABLE = "slow_start_anomaly_detection"
 
 JSON_DATA = """
 {
@@ -50,41 +58,65 @@ JSON_DATA = """
 """
 
 
+def get_slow_start_transform(json_data: Union[str, list]) -> DeclarativeTransform:
+    """Create the transform of the `slow_start` definition in transformations/definitions.json
+
+    Args:
+        json_data (Union[str, list]): JSON string or list of parsed events
+
+    Returns:
+        DeclarativeTransform: slow start transform
+    """
+    slow_start_transform, = get_transformations(json_data)
+    return slow_start_transform
+
+
+@patch.dict(os.environ, {"SLOW_START_TABLE": SLOW_START_TABLE})
 class TestSlowStartTransformClass(unittest.TestCase):
+    def setUp(self) -> None:
+        # the definitions read their tables from the patched environment
+        get_transform_definitions.cache_clear()
+        self.addCleanup(get_transform_definitions.cache_clear)
+
     def test_has_get_dataframe(self):
         """Check Transform has #get_dataframe"""
-        slow_start_transform = SlowStartTransform("{}")
+        slow_start_transform = get_slow_start_transform("{}")
         self.assertTrue(callable(getattr(slow_start_transform, "get_dataframe", None)))
 
     def test_has_mappings_set(self):
-        """Check SlowStartTransform has mappings property set from Transform Parent Class"""
-        slow_start_transform = SlowStartTransform("{}")
-        self.assertTrue(hasattr(slow_start_transform, "mappings"))
-        self.assertEqual(
-            slow_start_transform.mappings,
-            slow_start_transform.video_slow_start_mappings,
-        )
+        """Check the slow start transform has the mappings of its definition"""
+        slow_start_transform = get_slow_start_transform("{}")
+        self.assertEqual(slow_start_transform.definition.name, "slow_start")
+        self.assertEqual(slow_start_transform.mappings, slow_start_transform.definition.mappings)
+        self.assertEqual(slow_start_transform.mappings["device.browser_name"], "dimension_browser_name")
 
     def test_has_table_set(self):
-        """Check SlowStartTransform has table property set from Transform Parent Class"""
-        slow_start_transform = SlowStartTransform("{}")
-        self.assertTrue(hasattr(slow_start_transform, "table"))
+        """Check the slow start transform reads its table from SLOW_START_TABLE"""
+        slow_start_transform = get_slow_start_transform("{}")
         self.assertEqual(slow_start_transform.table, SLOW_START_TABLE)
+        self.assertIsNone(slow_start_transform.rollup_table)
+
+    @patch.dict(os.environ, {"SLOW_START_ROLLUP_TABLE": "slow_start_rollup"})
+    def test_has_rollup_table_set(self):
+        """Check the startup duration is rolled up into SLOW_START_ROLLUP_TABLE, if set"""
+        slow_start_transform = get_slow_start_transform("{}")
+        self.assertEqual(slow_start_transform.rollup_table, "slow_start_rollup")
+        self.assertEqual(slow_start_transform.rollup_measure, "measurement_startup_duration_content_ms")
 
     def test_get_dataframe(self):
         """Test #getdataframe returns a filtered Dataframe"""
 
-        slow_start_transform = SlowStartTransform(JSON_DATA)
+        slow_start_transform = get_slow_start_transform(JSON_DATA)
         expected_dict = {
             "user_details_content_session_id": "bf8bd09d-8536-4aab-8f20-aba913e62f9b",
             "user_details_app_session_id": "4e39a6f4-4f2a-42d5-acba-7aa1df78145f",
-            "measurement_startup_duration_content_ms": "",
+            "measurement_startup_duration_content_ms": 1344.0,
             "dimension_browser_name": "Chrome",
             "dimension_os_name": "Mac OS X",
             "dimension_country_code": "United States",
             "dimension_city": "Bristol",
             "dimension_asn": "AS7922 Comcast Cable Communications, LLC",
-            "timestamp": "2022-05-31T15:52:40.0000251Z",
+            "timestamp": pd.Timestamp("2022-05-31T15:52:40.0000251Z"),
         }
 
         actual_df = slow_start_transform.get_dataframe()
@@ -95,6 +127,27 @@ class TestSlowStartTransformClass(unittest.TestCase):
             actual_df.values[0][-1], expected_dict["timestamp"]
         )
 
+    def test_get_dataframe_column_types(self):
+        """Test #getdataframe converts the columns to the dtypes of their Kusto types"""
+        json_data = """[
+            {"event": {"type": "playback_start", "formatted_timestamp": 1660176375708,
+                       "attributes": {"startup_duration_content_ms": "506"}},
+             "network": {"asn": 8333}},
+            {"event": {"type": "playback_start", "formatted_timestamp": "2022-05-31T15:52:40Z"}}
+        ]"""
+
+        actual_df = get_slow_start_transform(json_data).get_dataframe()
+
+        self.assertEqual(actual_df["measurement_startup_duration_content_ms"].dtype, "float64")
+        self.assertEqual(str(actual_df["timestamp"].dtype), "datetime64[ns, UTC]")
+        self.assertEqual(actual_df["timestamp"][0], pd.Timestamp(1660176375708, unit="ms", tz="UTC"))
+        self.assertEqual(actual_df["timestamp"][1], pd.Timestamp("2022-05-31T15:52:40Z"))
+        self.assertEqual(actual_df["dimension_asn"][0], "8333")
+        self.assertTrue(pd.isna(actual_df["dimension_asn"][1]))
+        # columns missing in every event are still typed
+        self.assertEqual(actual_df["user_details_app_session_id"].dtype, "string")
+        self.assertEqual(actual_df["dimension_os_name"].dtype, "category")
+
     def test_get_empty_dataframe_bad_json(self):
         """Test #getdataframe returns a filtered Dataframe"""
 
@@ -113,6 +166,19 @@ class TestSlowStartTransformClass(unittest.TestCase):
             },
         }
         """
-        slow_start_transform = SlowStartTransform(bad_json)
+        slow_start_transform = get_slow_start_transform(bad_json)
         actual_df = slow_start_transform.get_dataframe()
         self.assertTrue(actual_df.empty)
+
+    def test_get_dataframe_routes_playback_start(self):
+        """Test only playback_start events reach the Slow Start Table"""
+        json_data = [
+            {"event": {"type": "playback_start"}, "device": {"browser_name": "Chrome"}},
+            {"event": {"type": "buffer_start"}, "device": {"browser_name": "Safari"}},
+            {"device": {"browser_name": "Edge"}},
+        ]
+        slow_start_transform = get_slow_start_transform(json_data)
+
+        self.assertEqual(len(slow_start_transform.get_events()), 1)
+        actual_df = slow_start_transform.get_dataframe()
+        self.assertEqual(actual_df["dimension_browser_name"].to_list(), ["Chrome"])
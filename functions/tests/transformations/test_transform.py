@@ -153,3 +153,28 @@ class TestTransformClass(unittest.TestCase):
         self.assertEqual(
             prepared_df.values[0][3], expected_obj["type"], "Type Should be None"
         )
+
+    def test_create_mapped_df(self):
+        """Test #create_mapped_df only extracts mapped and filter properties"""
+        actual_json = """[
+            {
+                "title": "Italian Restaurant",
+                "location": {
+                    "long": 188,
+                    "lat": 142
+                },
+                "rating": {"stars": 4},
+                "type": "Italian"
+            }
+        ]"""
+        transform = Transform(actual_json, self.table, self.mappings)
+
+        mapped_df = transform.create_mapped_df(filter_properties=["rating.stars"])
+        prepared_df = transform.prepare_result(mapped_df)
+
+        self.assertEqual(
+            mapped_df.columns.to_list(),
+            ["title", "location.long", "location.lat", "type", "rating.stars"],
+        )
+        self.assertEqual(prepared_df.columns.to_list(), list(self.mappings.values()))
+        self.assertEqual(prepared_df.values[0][1], 188)
@@ -0,0 +1,51 @@
+import unittest
+
+import pandas as pd
+from utils.column_types import coerce_column, coerce_dataframe, to_datetime_column
+
+
+class TestColumnTypes(unittest.TestCase):
+    def test_coerce_numeric_columns(self):
+        """Test decimal and long columns are converted to numeric dtypes"""
+        series = pd.Series([506, "1344", None, "n/a"])
+
+        decimal = coerce_column(series, "decimal")
+        long = coerce_column(series, "long")
+
+        self.assertEqual(str(decimal.dtype), "float64")
+        self.assertEqual(decimal[1], 1344.0)
+        self.assertTrue(pd.isna(decimal[3]))
+        self.assertEqual(str(long.dtype), "Int64")
+        self.assertTrue(pd.isna(long[2]))
+
+    def test_coerce_string_and_dynamic_columns(self):
+        """Test string and dynamic columns"""
+        self.assertEqual(str(coerce_column(pd.Series(["a", None]), "string").dtype), "string")
+        # integers widened to float by a missing value keep their integer text
+        self.assertEqual(coerce_column(pd.Series([8333, None]), "string").to_list(), ["8333", pd.NA])
+        self.assertEqual(coerce_column(pd.Series([1.5, None]), "string").to_list(), ["1.5", pd.NA])
+        self.assertEqual(
+            coerce_column(pd.Series([{"a": 1}, None, "x"]), "dynamic").to_list(),
+            ['{"a": 1}', None, "x"],
+        )
+
+    def test_to_datetime_column(self):
+        """Test epoch milliseconds and ISO strings are converted to UTC datetimes"""
+        series = pd.Series([1660176375708, "2022-05-31T15:52:40.0000251Z", None])
+
+        actual = to_datetime_column(series)
+
+        self.assertEqual(str(actual.dtype), "datetime64[ns, UTC]")
+        self.assertEqual(actual[0], pd.Timestamp("2022-08-11T00:06:15.708Z"))
+        self.assertEqual(actual[1], pd.Timestamp("2022-05-31T15:52:40.0000251Z"))
+        self.assertTrue(pd.isna(actual[2]))
+
+    def test_coerce_dataframe(self):
+        """Test only typed columns present in the DataFrame are converted"""
+        data_frame = pd.DataFrame({"duration": ["1", "2"], "other": [1, 2]})
+
+        actual = coerce_dataframe(data_frame, {"duration": "real", "missing": "string"})
+
+        self.assertEqual(str(actual["duration"].dtype), "float64")
+        self.assertEqual(str(actual["other"].dtype), "int64")
+        self.assertEqual(str(data_frame["duration"].dtype), "object")
@@ -0,0 +1,111 @@
+import gzip
+import io
+import os
+import unittest
+
+from utils.compression import DecompressedStream, decompress, detect_compression
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+DATA = b"".join(b'{"event_id": "%d"}\n' % index for index in range(1000))
+
+
+class TrackingStream(io.BytesIO):
+    """BytesIO recording the size of every read"""
+
+    def __init__(self, data: bytes) -> None:
+        super().__init__(data)
+        self.read_sizes = []
+
+    def read(self, size=-1):
+        self.read_sizes.append(size)
+        return super().read(size)
+
+
+class TestCompression(unittest.TestCase):
+    def read_chunks(self, stream: DecompressedStream, size: int) -> list:
+        """Read a stream to its end
+
+        Args:
+            stream (DecompressedStream): stream to read
+            size (int): bytes per read
+
+        Returns:
+            list: chunks
+        """
+        chunks = []
+        while chunk := stream.read(size):
+            chunks.append(chunk)
+        return chunks
+
+    def test_detect_compression(self):
+        """Test the compression is detected from the magic bytes"""
+        self.assertEqual(detect_compression(gzip.compress(DATA)[:4]), "gzip")
+        self.assertEqual(detect_compression(b"\x28\xb5\x2f\xfd"), "zstd")
+        self.assertIsNone(detect_compression(DATA[:4]))
+        self.assertIsNone(detect_compression(b""))
+
+    def test_uncompressed_passthrough(self):
+        """Test uncompressed data is read unchanged"""
+        stream = DecompressedStream(io.BytesIO(DATA))
+
+        self.assertIsNone(stream.compression)
+        self.assertEqual(b"".join(self.read_chunks(stream, 3)), DATA)
+        self.assertEqual(stream.bytes_read, len(DATA))
+        self.assertEqual(DecompressedStream(io.BytesIO(b"{}")).read(), b"{}")
+        self.assertEqual(DecompressedStream(io.BytesIO(b"")).read(), b"")
+
+    def test_gzip_bounded_reads(self):
+        """Test gzip is decompressed incrementally with bounded reads of both streams"""
+        compressed = gzip.compress(DATA)
+        source = TrackingStream(compressed)
+        stream = DecompressedStream(source, chunk_size=64)
+
+        chunks = self.read_chunks(stream, 100)
+
+        self.assertEqual(stream.compression, "gzip")
+        self.assertEqual(b"".join(chunks), DATA)
+        self.assertTrue(all(len(chunk) <= 100 for chunk in chunks))
+        self.assertTrue(all(0 <= size <= 64 for size in source.read_sizes))
+        self.assertEqual(stream.bytes_read, len(compressed))
+
+    def test_gzip_concatenated_members(self):
+        """Test concatenated gzip members are read as one stream"""
+        compressed = gzip.compress(DATA[:500]) + gzip.compress(DATA[500:])
+
+        self.assertEqual(b"".join(self.read_chunks(DecompressedStream(io.BytesIO(compressed), 7), 50)), DATA)
+        self.assertEqual(decompress(compressed), DATA)
+
+    def test_gzip_truncated(self):
+        """Test a truncated gzip blob is not read as complete"""
+        with self.assertRaises(EOFError):
+            DecompressedStream(io.BytesIO(gzip.compress(DATA)[:-20])).read()
+
+    def test_decompress(self):
+        """Test in memory data is decompressed or returned as is"""
+        self.assertEqual(decompress(gzip.compress(DATA)), DATA)
+        self.assertIs(decompress(DATA), DATA)
+
+    @unittest.skipUnless(zstandard, "zstandard is not installed")
+    def test_zstd_frames(self):
+        """Test zstd frames are decompressed incrementally and read as one stream"""
+        compressor = zstandard.ZstdCompressor()
+        compressed = compressor.compress(DATA[:500]) + compressor.compress(DATA[500:])
+        stream = DecompressedStream(io.BytesIO(compressed), chunk_size=16)
+
+        chunks = self.read_chunks(stream, 100)
+
+        self.assertEqual(stream.compression, "zstd")
+        self.assertEqual(b"".join(chunks), DATA)
+        self.assertTrue(all(len(chunk) <= 100 for chunk in chunks))
+        self.assertEqual(stream.bytes_read, len(compressed))
+        self.assertEqual(decompress(compressed), DATA)
+
+    @unittest.skipIf(zstandard, "zstandard is installed")
+    def test_zstd_not_installed(self):
+        """Test zstd blobs ask for the optional package"""
+        with self.assertRaisesRegex(ImportError, "zstandard"):
+            DecompressedStream(io.BytesIO(b"\x28\xb5\x2f\xfd" + os.urandom(8)))
@@ -0,0 +1,53 @@
+import unittest
+
+import pandas as pd
+from utils.dictionary_encoding import CategoryRegistry, concat_frames, encode_dictionary_columns
+
+
+class TestDictionaryEncoding(unittest.TestCase):
+    def test_encode_interns_categories(self):
+        """Test a value keeps its code across encoded blobs"""
+        registry = CategoryRegistry()
+
+        first = registry.encode("browser", pd.Series(["Chrome", "Firefox", "Chrome"], dtype="string"))
+        second = registry.encode("browser", pd.Series(["Safari", None, "Firefox"], dtype="string"))
+
+        self.assertEqual(first.cat.codes.to_list(), [0, 1, 0])
+        self.assertEqual(second.cat.codes.to_list(), [2, -1, 1])
+        self.assertEqual(second.cat.categories.to_list(), ["Chrome", "Firefox", "Safari"])
+        self.assertEqual(registry.get_stats(), {"browser": 3})
+
+    def test_encode_high_cardinality(self):
+        """Test columns with too many distinct values are left unencoded"""
+        registry = CategoryRegistry(max_categories=2)
+        series = pd.Series(["a", "b", "c"], dtype="string")
+
+        with self.assertLogs("CategoryRegistry", level="WARNING") as context:
+            self.assertIs(registry.encode("city", series), series)
+            self.assertIs(registry.encode("city", series), series)
+
+        self.assertEqual(registry.get_stats(), {"city": 0})
+        # logged once per column
+        self.assertEqual(len(context.output), 1)
+        self.assertIn("Column city exceeds 2 categories", context.output[0])
+
+    def test_encode_dictionary_columns(self):
+        """Test only the listed columns are encoded"""
+        data_frame = pd.DataFrame({"browser": ["Chrome"], "session": ["1"]})
+
+        encoded_df = encode_dictionary_columns(data_frame, ["browser", "missing"])
+
+        self.assertEqual(encoded_df["browser"].dtype, "category")
+        self.assertEqual(encoded_df["session"].dtype, "object")
+
+    def test_concat_frames(self):
+        """Test frames encoded before and after new categories were added stay categorical"""
+        registry = CategoryRegistry()
+        first = pd.DataFrame({"browser": registry.encode("browser", pd.Series(["Chrome"]))})
+        second = pd.DataFrame({"browser": registry.encode("browser", pd.Series(["Firefox", "Chrome"]))})
+
+        combined_df = concat_frames([first, second])
+
+        self.assertEqual(combined_df["browser"].dtype, "category")
+        self.assertEqual(combined_df["browser"].to_list(), ["Chrome", "Firefox", "Chrome"])
+        self.assertEqual(combined_df["browser"].cat.codes.to_list(), [0, 1, 0])
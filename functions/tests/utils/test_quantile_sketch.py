@@ -0,0 +1,55 @@
+import unittest
+
+import numpy as np
+from utils.quantile_sketch import QuantileSketch, merge_sketches
+
+
+class TestQuantileSketch(unittest.TestCase):
+    def setUp(self) -> None:
+        self.values = np.random.default_rng(0).lognormal(mean=7, sigma=1, size=10000)
+
+    def test_quantile_relative_accuracy(self):
+        """Test quantiles are within the relative accuracy of the exact quantiles"""
+        sketch = QuantileSketch.from_values(self.values, relative_accuracy=0.01)
+
+        for q in (0.5, 0.95, 0.99):
+            exact = np.quantile(self.values, q, method="lower")
+            self.assertLessEqual(abs(sketch.quantile(q) - exact) / exact, 0.01)
+        self.assertEqual(sketch.quantile(0), self.values.min())
+        self.assertEqual(sketch.quantile(1), self.values.max())
+
+    def test_merge(self):
+        """Test merged sketches equal the sketch of all values"""
+        first = QuantileSketch.from_values(self.values[:3000])
+        second = QuantileSketch.from_values(self.values[3000:])
+
+        merged = merge_sketches([first.to_json(), second.to_dict(), QuantileSketch()])
+
+        self.assertEqual(merged.to_dict(), QuantileSketch.from_values(self.values).to_dict())
+
+    def test_merge_different_accuracy(self):
+        """Test sketches of different accuracies are not merged"""
+        with self.assertRaises(ValueError):
+            QuantileSketch(0.01).merge(QuantileSketch.from_values([1.0], relative_accuracy=0.02))
+
+    def test_zero_and_negative_values(self):
+        """Test zero, negative and missing values"""
+        sketch = QuantileSketch.from_values([-100.0, 0.0, 0.0, 50.0, np.nan])
+
+        self.assertEqual(sketch.count, 4)
+        self.assertAlmostEqual(sketch.quantile(0), -100.0)
+        self.assertEqual(sketch.quantile(0.5), 0.0)
+        self.assertAlmostEqual(sketch.quantile(1), 50.0)
+
+    def test_round_trip(self):
+        """Test a sketch survives serialization"""
+        sketch = QuantileSketch.from_values(self.values)
+
+        restored = QuantileSketch.from_dict(sketch.to_json())
+
+        self.assertEqual(restored.quantile(0.95), sketch.quantile(0.95))
+
+    def test_empty(self):
+        """Test an empty sketch has no quantiles"""
+        self.assertIsNone(QuantileSketch().quantile(0.5))
+        self.assertIsNone(merge_sketches([]))
@@ -0,0 +1,109 @@
+from functools import lru_cache
+from typing import Union
+
+import pandas as pd
+
+""" Compiled extraction of dotted JSON paths straight into DataFrame columns
+    ### Compile once, extract from many event lists
+    extractor = get_column_extractor(("event.type", "device.os_name"))
+    df = extractor.extract([{"event": {"type": "playback_start"}, "device": {"os_name": "Windows"}}])
+"""
+
+MISSING = object()
+
+
+class ColumnExtractor:
+    def __init__(self, paths: tuple[str, ...]):
+        """Constructor
+
+        Args:
+            paths (tuple[str, ...]): dotted JSON paths, e.g. `event.attributes.startup_duration_content_ms`
+        """
+        self.paths = tuple(dict.fromkeys(paths))
+        self.plan = self.__compile(self.paths)
+
+    def extract(self, json_data: Union[list, dict]) -> pd.DataFrame:
+        """Walk each event once and pull only the compiled paths into columns.
+
+        Columns are named after their dotted path, matching `pd.json_normalize`.
+        Paths that are not present in any event are left out, like `pd.json_normalize` does.
+
+        Args:
+            json_data (Union[list, dict]): list of events or a single event
+
+        Returns:
+            pd.DataFrame: DataFrame with one column per found path
+        """
+        events = [json_data] if isinstance(json_data, dict) else json_data
+        row_count = len(events)
+        columns = [[None] * row_count for _ in self.paths]
+        found = [False] * len(self.paths)
+
+        for row, event in enumerate(events):
+            if isinstance(event, dict):
+                self.__walk(self.plan, event, columns, found, row)
+
+        data = {
+            path: column
+            for path, column, is_found in zip(self.paths, columns, found)
+            if is_found
+        }
+        return pd.DataFrame(data, index=pd.RangeIndex(row_count))
+
+    # PRIVATE
+
+    def __compile(self, paths: tuple[str, ...]) -> dict:
+        """Compile dotted paths into a key tree so shared prefixes are only looked up once
+
+        Args:
+            paths (tuple[str, ...]): dotted JSON paths
+
+        Returns:
+            dict: {key: [column_index or None, child plan or None]}
+        """
+        plan: dict = {}
+        for column_index, path in enumerate(paths):
+            node = plan
+            keys = path.split(".")
+            for depth, key in enumerate(keys):
+                step = node.setdefault(key, [None, None])
+                if depth == len(keys) - 1:
+                    step[0] = column_index
+                else:
+                    if step[1] is None:
+                        step[1] = {}
+                    node = step[1]
+        return plan
+
+    def __walk(self, plan: dict, node: dict, columns: list, found: list, row: int) -> None:
+        """Copy the values of the compiled paths of one event into the columns
+
+        Args:
+            plan (dict): compiled key tree for this nesting level
+            node (dict): event or nested object at this nesting level
+            columns (list): column value lists
+            found (list): flags of columns that received at least one value
+            row (int): row index of the event
+        """
+        for key, (column_index, children) in plan.items():
+            value = node.get(key, MISSING)
+            if value is MISSING:
+                continue
+            if column_index is not None:
+                columns[column_index][row] = value
+                found[column_index] = True
+            if children is not None and isinstance(value, dict):
+                self.__walk(children, value, columns, found, row)
+
+
+@lru_cache(maxsize=None)
+def get_column_extractor(paths: tuple[str, ...]) -> ColumnExtractor:
+    """Get the compiled extractor for a set of paths, compiling it on first use
+
+    Args:
+        paths (tuple[str, ...]): dotted JSON paths
+
+    Returns:
+        ColumnExtractor: compiled extractor
+    """
+    return ColumnExtractor(paths)
@@ -0,0 +1,70 @@
+import logging
+from typing import Union
+
+import pandas as pd
+
+from .event_context import EventContext
+from .transform import Transform
+from .transform_definition import TransformDefinition
+
+logger = logging.getLogger("DeclarativeTransform")
+
+
+class DeclarativeTransform(Transform):
+    """Transform configured by a TransformDefinition instead of a subclass per table.
+
+    Only the events routed to the definition's event types are extracted. Definitions with the
+    same event types share one extraction of their paths from the EventContext, each transform
+    then only renames its columns.
+
+    ### Transform a blob for every definition
+    definitions = get_transform_definitions()
+    shared_paths = get_shared_paths(definitions)
+    transforms = [
+        DeclarativeTransform(context, definition, shared_paths[definition.get_event_types()])
+        for definition in definitions
+    ]
+    """
+
+    def __init__(
+        self,
+        json_data: Union[str, list, EventContext],
+        definition: TransformDefinition,
+        shared_paths: tuple[str, ...],
+    ):
+        """Constructor
+
+        Args:
+            json_data (Union[str, list, EventContext]): JSON string, list of parsed events or shared EventContext
+            definition (TransformDefinition): declarative definition of the table
+            shared_paths (tuple[str, ...]): paths of the definitions with the same event types, see `get_shared_paths`
+        """
+        self.definition = definition
+        self.shared_paths = shared_paths
+        self.event_types = definition.event_types
+        self.column_types = definition.column_types
+        self.dictionary_columns = definition.dictionary_columns
+        self.rollup_measure = definition.rollup_measure
+        self.rollup_dimensions = definition.rollup_dimensions
+        super().__init__(json_data=json_data, table=definition.table, mappings=definition.mappings)
+        self.rollup_table = definition.rollup_table
+
+    def get_dataframe(self) -> pd.DataFrame:
+        """Create the dataframe of the definition's table
+
+        Returns:
+            pd.DataFrame: mapped, filtered and derived columns of the routed events
+        """
+        # cached by the context, the first transform of these event types extracts the shared paths
+        shared_df = self.context.get_mapped_df(self.shared_paths, self.definition.get_event_types())
+
+        if shared_df.empty:
+            logger.info(f"Dataframe does not contain events for {self.definition.name}. Returning Empty Dataframe")
+            return pd.DataFrame({})
+
+        # columns are already converted to their `column_types`
+        result_df = self.prepare_result(shared_df).reset_index(drop=True)
+        for column, expression in self.definition.derived_columns.items():
+            result_df[column] = result_df.eval(expression)
+
+        return result_df
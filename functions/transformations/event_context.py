@@ -0,0 +1,162 @@
+import json
+import logging
+import time
+from typing import Optional, Union
+
+import pandas as pd
+
+from .column_extractor import get_column_extractor
+
+""" Parsed events of one blob, shared by every transform
+    ### Parse once and hand the same context to every transformation
+    context = EventContext.from_json_string('[{}]')
+    transformations = get_transformations(json_data=context)
+
+    ### Events are partitioned by `event.type` in a single pass on first use
+    context.get_events(event_types=("playback_start",))
+
+Args:
+    events (list): json.load result
+"""
+
+logger = logging.getLogger("EventContext")
+
+EventTypes = Optional[tuple[str, ...]]
+
+
+class EventContext:
+    def __init__(self, events: Union[list, dict]):
+        """Constructor
+
+        Args:
+            events (Union[list, dict]): parsed events
+        """
+        self.events = events
+        self.__events_by_type: Optional[dict[str, list]] = None
+        self.__normalized_dfs: dict[EventTypes, pd.DataFrame] = {}
+        self.__mapped_dfs: dict[tuple[tuple[str, ...], EventTypes], pd.DataFrame] = {}
+        # time spent flattening events into DataFrames, shared by all transforms
+        self.normalize_ms = 0.0
+
+    @classmethod
+    def from_json_string(cls, json_string: str, strict: bool = False) -> "EventContext":
+        """Parse a JSON string once
+
+        Args:
+            json_string (str): json string
+            strict (bool): raise on malformed JSON instead of returning a single empty event,
+                a blank string has no events like an empty streamed blob
+
+        Raises:
+            json.decoder.JSONDecodeError: `json_string` is malformed and `strict` is set
+
+        Returns:
+            EventContext: context of the parsed events
+        """
+        if strict and not json_string.strip():
+            return cls([])
+
+        try:
+            events = json.loads(json_string)
+        except json.decoder.JSONDecodeError as err:
+            logger.error(err)
+            if strict:
+                raise
+            events = [{}]
+
+        return cls(events)
+
+    def get_events(self, event_types: EventTypes = None) -> Union[list, dict]:
+        """Get the events of the given `event.type` values
+
+        Args:
+            event_types (EventTypes): event types to route, None for all events
+
+        Returns:
+            Union[list, dict]: routed events
+        """
+        if event_types is None:
+            return self.events
+
+        events_by_type = self.__get_events_by_type()
+        if len(event_types) == 1:
+            return events_by_type.get(event_types[0], [])
+
+        return [
+            event
+            for event_type in event_types
+            for event in events_by_type.get(event_type, [])
+        ]
+
+    def get_normalized_df(self, event_types: EventTypes = None) -> pd.DataFrame:
+        """Normalize the routed events with `pd.json_normalize` on first use.
+        The result is shared between transforms and must not be modified in place.
+
+        Args:
+            event_types (EventTypes): event types to route, None for all events
+
+        Returns:
+            pd.DataFrame: DataFrame
+        """
+        if event_types not in self.__normalized_dfs:
+            events = self.get_events(event_types)
+            start = time.perf_counter()
+            self.__normalized_dfs[event_types] = pd.json_normalize(events)
+            self.normalize_ms += (time.perf_counter() - start) * 1000
+
+        return self.__normalized_dfs[event_types]
+
+    def get_mapped_df(self, paths: tuple[str, ...], event_types: EventTypes = None) -> pd.DataFrame:
+        """Extract dotted paths from the routed events on first use.
+        The result is shared between transforms and must not be modified in place.
+
+        Args:
+            paths (tuple[str, ...]): dotted JSON paths
+            event_types (EventTypes): event types to route, None for all events
+
+        Returns:
+            pd.DataFrame: DataFrame with one column per found path
+        """
+        key = (paths, event_types)
+        if key not in self.__mapped_dfs:
+            events = self.get_events(event_types)
+            start = time.perf_counter()
+            self.__mapped_dfs[key] = get_column_extractor(paths).extract(events)
+            self.normalize_ms += (time.perf_counter() - start) * 1000
+
+        return self.__mapped_dfs[key]
+
+    # PRIVATE
+
+    def __get_events_by_type(self) -> dict[str, list]:
+        """Partition the events by `event.type` in a single pass
+
+        Returns:
+            dict[str, list]: {event_type: events}
+        """
+        if self.__events_by_type is None:
+            events = [self.events] if isinstance(self.events, dict) else self.events
+            events_by_type: dict[str, list] = {}
+            for event in events:
+                event_type = self.__get_event_type(event)
+                events_by_type.setdefault(event_type, []).append(event)
+            self.__events_by_type = events_by_type
+
+        return self.__events_by_type
+
+    @staticmethod
+    def __get_event_type(event) -> Optional[str]:
+        """Get `event.type` of an event
+
+        Args:
+            event (Any): parsed event
+
+        Returns:
+            Optional[str]: event type, None if missing
+        """
+        if isinstance(event, dict):
+            details = event.get("event")
+            if isinstance(details, dict):
+                return details.get("type")
+
+        return None
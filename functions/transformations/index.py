@@ -1,7 +1,23 @@
-from transformations.slow_start_transform import SlowStartTransform
+from typing import Union
+
+from transformations.declarative_transform import DeclarativeTransform
+from transformations.event_context import EventContext
 from transformations.transform import Transform
+from transformations.transform_definition import get_shared_paths, get_transform_definitions
+
 
+def get_transformations(json_data: Union[str, list, EventContext]) -> list[Transform]:
+    # the transforms share the parsed events and their extracted paths
+    if isinstance(json_data, EventContext):
+        context = json_data
+    elif isinstance(json_data, str):
+        context = EventContext.from_json_string(json_data)
+    else:
+        context = EventContext(json_data)
 
-def get_transformations(json_string: str) -> list[Transform]:
-    slow_start_transformation = SlowStartTransform(json_string)
-    return [slow_start_transformation]
+    definitions = get_transform_definitions()
+    shared_paths = get_shared_paths(definitions)
+    return [
+        DeclarativeTransform(context, definition, shared_paths[definition.get_event_types()])
+        for definition in definitions
+    ]
@@ -0,0 +1,215 @@
+from typing import List
+
+import pandas as pd
+from utils.dictionary_encoding import concat_frames
+from utils.quantile_sketch import QuantileSketch, merge_sketches
+
+""" Per time bucket, per dimension aggregates of a measurement column
+    ### Roll slow start rows up to one row per minute and dimension combination
+    rollup_df = compute_rollup(
+        slow_start_df,
+        measure_column="measurement_startup_duration_content_ms",
+        dimension_columns=["dimension_browser_name", "dimension_country_code"],
+    )
+
+    ### Roll a blob up batch by batch, only the aggregates of each bucket are kept
+    partial_df = None
+    for batch_df in batches:
+        batch_partial_df = compute_partial_rollup(batch_df, measure_column, dimension_columns)
+        partial_df = merge_partial_rollups([partial_df, batch_partial_df], dimension_columns)
+    rollup_df = finalize_rollup(partial_df, dimension_columns)
+"""
+
+QUANTILES = {"p50": 0.5, "p95": 0.95, "p99": 0.99}
+
+# Kusto column types of the aggregate columns, see kustotablesetup.kql
+ROLLUP_COLUMN_TYPES = {
+    "timestamp": "datetime",
+    "event_count": "long",
+    "mean": "real",
+    **{name: "real" for name in QUANTILES},
+    "sketch": "dynamic",
+}
+
+# aggregate columns of a partial rollup, `sketch` holds QuantileSketch objects
+PARTIAL_COLUMNS = ["event_count", "sum", "sketch"]
+
+
+def compute_rollup(
+    data_frame: pd.DataFrame,
+    measure_column: str,
+    dimension_columns: list[str],
+    time_column: str = "timestamp",
+    bucket: str = "1min",
+    relative_accuracy: float = 0.01,
+) -> pd.DataFrame:
+    """Aggregate rows per time bucket and dimension combination
+
+    Args:
+        data_frame (pd.DataFrame): typed rows, `time_column` must be datetime64
+        measure_column (str): numeric column to aggregate
+        dimension_columns (list[str]): columns to group by besides the time bucket
+        time_column (str): datetime column
+        bucket (str): pandas frequency of the time buckets, e.g. `1min`
+        relative_accuracy (float): relative accuracy of the quantile sketches
+
+    Returns:
+        pd.DataFrame: `timestamp` (bucket start), the dimensions as categoricals, `event_count`, `mean`,
+            `p50`, `p95`, `p99` and `sketch`, the serialized QuantileSketch of the measure. Unlike the
+            quantiles, sketches of many buckets, blobs or workers can be merged with `merge_sketches`
+    """
+    columns = ["timestamp", *dimension_columns, "event_count", "mean", *QUANTILES, "sketch"]
+    if data_frame.empty or time_column not in data_frame or measure_column not in data_frame:
+        return pd.DataFrame(columns=columns)
+
+    data_frame = data_frame[data_frame[time_column].notna()]
+    dimensions = [column for column in dimension_columns if column in data_frame]
+    keys, categories = _get_group_keys(data_frame, data_frame[time_column].dt.floor(bucket), dimensions)
+    grouped = data_frame[measure_column].groupby(keys, dropna=False, sort=False)
+
+    rollup_df = pd.concat(
+        [
+            grouped.size().rename("event_count"),
+            grouped.mean().rename("mean"),
+            grouped.quantile(list(QUANTILES.values())).unstack().set_axis(list(QUANTILES), axis=1),
+            grouped.agg(lambda values: QuantileSketch.from_values(values, relative_accuracy).to_json()).rename(
+                "sketch"
+            ),
+        ],
+        axis=1,
+    ).reset_index()
+
+    return _restore_dimensions(rollup_df, categories, dimension_columns).loc[:, columns]
+
+
+def compute_partial_rollup(
+    data_frame: pd.DataFrame,
+    measure_column: str,
+    dimension_columns: list[str],
+    time_column: str = "timestamp",
+    bucket: str = "1min",
+    relative_accuracy: float = 0.01,
+) -> pd.DataFrame:
+    """Aggregate rows per time bucket and dimension combination into mergeable aggregates,
+    e.g. the rows of one batch of a blob
+
+    Args:
+        data_frame (pd.DataFrame): typed rows, `time_column` must be datetime64
+        measure_column (str): numeric column to aggregate
+        dimension_columns (list[str]): columns to group by besides the time bucket
+        time_column (str): datetime column
+        bucket (str): pandas frequency of the time buckets, e.g. `1min`
+        relative_accuracy (float): relative accuracy of the quantile sketches
+
+    Returns:
+        pd.DataFrame: `timestamp`, the dimensions, `event_count`, `sum` and `sketch`, the QuantileSketch
+            of the measure, see #merge_partial_rollups and #finalize_rollup
+    """
+    columns = ["timestamp", *dimension_columns, *PARTIAL_COLUMNS]
+    if data_frame.empty or time_column not in data_frame or measure_column not in data_frame:
+        return pd.DataFrame(columns=columns)
+
+    data_frame = data_frame[data_frame[time_column].notna()]
+    dimensions = [column for column in dimension_columns if column in data_frame]
+    keys, categories = _get_group_keys(data_frame, data_frame[time_column].dt.floor(bucket), dimensions)
+    grouped = data_frame[measure_column].groupby(keys, dropna=False, sort=False)
+
+    partial_df = pd.concat(
+        [
+            grouped.size().rename("event_count"),
+            grouped.sum().rename("sum"),
+            grouped.agg(lambda values: QuantileSketch.from_values(values, relative_accuracy)).rename("sketch"),
+        ],
+        axis=1,
+    ).reset_index()
+
+    return _restore_dimensions(partial_df, categories, dimension_columns).loc[:, columns]
+
+
+def merge_partial_rollups(partial_frames: List[pd.DataFrame], dimension_columns: list[str]) -> pd.DataFrame:
+    """Merge partial rollups, the rows of the same bucket and dimensions are combined
+
+    Args:
+        partial_frames (List[pd.DataFrame]): results of #compute_partial_rollup or #merge_partial_rollups,
+            None entries are ignored
+        dimension_columns (list[str]): dimension columns of the partial rollups
+
+    Returns:
+        pd.DataFrame: partial rollup with one row per bucket and dimension combination
+    """
+    columns = ["timestamp", *dimension_columns, *PARTIAL_COLUMNS]
+    partial_frames = [frame for frame in partial_frames if frame is not None and not frame.empty]
+    if not partial_frames:
+        return pd.DataFrame(columns=columns)
+    if len(partial_frames) == 1:
+        return partial_frames[0]
+
+    data_frame = concat_frames(partial_frames)
+    keys, categories = _get_group_keys(data_frame, data_frame["timestamp"], dimension_columns)
+    grouped = data_frame.groupby(keys, dropna=False, sort=False)
+
+    partial_df = pd.concat(
+        [
+            grouped["event_count"].sum(),
+            grouped["sum"].sum(),
+            grouped["sketch"].agg(merge_sketches),
+        ],
+        axis=1,
+    ).reset_index()
+
+    return _restore_dimensions(partial_df, categories, dimension_columns).loc[:, columns]
+
+
+def finalize_rollup(partial_df: pd.DataFrame, dimension_columns: list[str]) -> pd.DataFrame:
+    """Turn a partial rollup into rollup rows, the quantiles are read from the merged sketches
+    and are within their relative accuracy of the exact quantiles of #compute_rollup
+
+    Args:
+        partial_df (pd.DataFrame): result of #compute_partial_rollup or #merge_partial_rollups
+        dimension_columns (list[str]): dimension columns of the partial rollup
+
+    Returns:
+        pd.DataFrame: rollup rows with the columns of #compute_rollup
+    """
+    columns = ["timestamp", *dimension_columns, "event_count", "mean", *QUANTILES, "sketch"]
+    if partial_df.empty:
+        return pd.DataFrame(columns=columns)
+
+    rollup_df = partial_df.loc[:, ["timestamp", *dimension_columns, "event_count"]]
+    rollup_df["mean"] = partial_df["sum"] / partial_df["event_count"]
+    for name, q in QUANTILES.items():
+        rollup_df[name] = [sketch.quantile(q) for sketch in partial_df["sketch"]]
+    rollup_df["sketch"] = [sketch.to_json() for sketch in partial_df["sketch"]]
+
+    return rollup_df.loc[:, columns]
+
+
+# PRIVATE
+
+
+def _get_group_keys(data_frame: pd.DataFrame, buckets: pd.Series, dimensions: list[str]) -> tuple:
+    """Get the group keys of the time buckets and dimensions,
+    dimensions are grouped by their integer codes, -1 keeps rows with a missing value
+
+    Returns:
+        tuple: group key series and the categories of each dimension
+    """
+    codes, categories = {}, {}
+    for column in dimensions:
+        if isinstance(data_frame[column].dtype, pd.CategoricalDtype):
+            codes[column], categories[column] = data_frame[column].cat.codes, data_frame[column].cat.categories
+        else:
+            column_codes, categories[column] = pd.factorize(data_frame[column])
+            codes[column] = pd.Series(column_codes, index=data_frame.index)
+    keys = [buckets.rename("timestamp")] + [codes[column].rename(column) for column in dimensions]
+    return keys, categories
+
+
+def _restore_dimensions(data_frame: pd.DataFrame, categories: dict, dimension_columns: list[str]) -> pd.DataFrame:
+    """Decode the dimension codes of grouped rows to categoricals, missing dimensions are added empty"""
+    for column, column_categories in categories.items():
+        data_frame[column] = pd.Categorical.from_codes(data_frame[column], categories=column_categories)
+    for column in dimension_columns:
+        if column not in data_frame:
+            data_frame[column] = None
+    return data_frame
@@ -1,6 +1,19 @@
-import json
 import logging
+from typing import Optional, Union
+
 import pandas as pd
+from utils.column_types import coerce_dataframe
+from utils.dictionary_encoding import encode_dictionary_columns
+from utils.settings import ROLLUP_BUCKET, SKETCH_RELATIVE_ACCURACY
+
+from .event_context import EventContext
+from .rollup import (
+    ROLLUP_COLUMN_TYPES,
+    compute_partial_rollup,
+    compute_rollup,
+    finalize_rollup,
+    merge_partial_rollups,
+)
 
 # Class for load json payload, filter it by event.type and produce DataFrame
 
@@ -16,21 +29,38 @@ logger = logging.getLogger("TransformClass")
 
 
 class Transform:
-    def __init__(self, json_data: str, table: str, mappings: dict[str, str]):
+    # `event.type` values consumed by the transform, None to receive every event
+    event_types: Optional[list[str]] = None
+    # Kusto column types of the target table, {column_alias: kusto_type}
+    column_types: dict[str, str] = {}
+    # low cardinality columns held as categoricals, e.g. dimensions
+    dictionary_columns: list[str] = []
+    # optional per time bucket aggregates of `rollup_measure` by `rollup_dimensions`, ingested into `rollup_table`
+    rollup_table: Optional[str] = None
+    rollup_measure: Optional[str] = None
+    rollup_dimensions: list[str] = []
+
+    def __init__(
+        self, json_data: Union[str, list, EventContext], table: str, mappings: dict[str, str]
+    ):
         """Constructor
 
         Args:
-            json_data: string
+            json_data: JSON string, list of already parsed events or an EventContext shared between transforms
         """
         self.table = table
 
-        self.json_data = self.__load_json_string(json_data)
+        self.context = self.__get_context(json_data)
+        self.json_data = self.context.events
         self.mappings = mappings
         self.mapping_properties = list(self.mappings.keys())
         self.mapping_aliases = list(self.mappings.values())
 
     def prepare_result(self, data_frame: pd.DataFrame) -> pd.DataFrame:
-        """Prepare a result DF with missed columns from initial JSON
+        """Prepare a result DF with missed columns from initial JSON.
+        Columns listed in `column_types` are converted to the dtype of their Kusto type,
+        e.g. epoch milliseconds to datetime64 and numeric strings to float64,
+        and `dictionary_columns` are dictionary encoded as categoricals.
 
         Args:
             data_frame (pd.DataFrame): DataFrame
@@ -47,7 +77,8 @@ class Transform:
         for target_column in self.mapping_aliases:
             if target_column not in transformed_df:
                 transformed_df[target_column] = None
-        return transformed_df.loc[:, self.mapping_aliases]
+        typed_df = coerce_dataframe(transformed_df.loc[:, self.mapping_aliases], self.column_types)
+        return encode_dictionary_columns(typed_df, self.dictionary_columns)
 
     def get_dataframe(self) -> pd.DataFrame:
         """#get_dataframe is a required method on an inherited class
@@ -61,19 +92,104 @@ class Transform:
 
         raise NotImplementedError("Must Implement #get_dataframe in Child Class")
 
+    def get_rollup_dataframe(self, data_frame: pd.DataFrame) -> pd.DataFrame:
+        """Aggregate the result of #get_dataframe per `ROLLUP_BUCKET` and `rollup_dimensions`
+
+        Args:
+            data_frame (pd.DataFrame): result of #get_dataframe
+
+        Returns:
+            pd.DataFrame: rollup rows for `rollup_table`, see transformations/rollup.py
+        """
+        return compute_rollup(
+            data_frame,
+            measure_column=self.rollup_measure,
+            dimension_columns=self.rollup_dimensions,
+            bucket=ROLLUP_BUCKET,
+            relative_accuracy=SKETCH_RELATIVE_ACCURACY,
+        )
+
+    def get_partial_rollup_dataframe(
+        self, data_frame: pd.DataFrame, partial_df: Optional[pd.DataFrame] = None
+    ) -> pd.DataFrame:
+        """Aggregate a batch of rows like #get_rollup_dataframe into mergeable aggregates
+
+        Args:
+            data_frame (pd.DataFrame): result of #get_dataframe for a batch of events
+            partial_df (Optional[pd.DataFrame]): aggregates of the previous batches, merged into the result
+
+        Returns:
+            pd.DataFrame: partial rollup, see #finalize_rollup_dataframe
+        """
+        batch_df = compute_partial_rollup(
+            data_frame,
+            measure_column=self.rollup_measure,
+            dimension_columns=self.rollup_dimensions,
+            bucket=ROLLUP_BUCKET,
+            relative_accuracy=SKETCH_RELATIVE_ACCURACY,
+        )
+        return merge_partial_rollups([partial_df, batch_df], self.rollup_dimensions)
+
+    def finalize_rollup_dataframe(self, partial_df: pd.DataFrame) -> pd.DataFrame:
+        """Get the rollup rows of merged partial rollups, the quantiles are read from the sketches
+
+        Args:
+            partial_df (pd.DataFrame): result of #get_partial_rollup_dataframe
+
+        Returns:
+            pd.DataFrame: rollup rows for `rollup_table`, see transformations/rollup.py
+        """
+        return finalize_rollup(partial_df, self.rollup_dimensions)
+
+    def get_rollup_column_types(self) -> dict[str, str]:
+        """Get the Kusto column types of `rollup_table`
+
+        Returns:
+            dict[str, str]: {column_name: kusto_type}
+        """
+        return {
+            **{column: self.column_types.get(column, "string") for column in self.rollup_dimensions},
+            **ROLLUP_COLUMN_TYPES,
+        }
+
+    def get_events(self) -> Union[list, dict]:
+        """Get the parsed events routed to this transform by `event_types`
+
+        Returns:
+            Union[list, dict]: events
+        """
+        return self.context.get_events(self.__get_event_types())
+
     def create_normalized_df(self) -> pd.DataFrame:
-        """It takes a JSON, normalizes it, and returns a dataframe
+        """It takes the routed events of the JSON, normalizes them, and returns a dataframe
 
         Returns:
             DataFrame
         """
         # Turn data to normalized dataframe
-        norm_df = pd.json_normalize(self.json_data)
+        norm_df = self.context.get_normalized_df(self.__get_event_types())
         if norm_df.empty:
             return self.__get_empty_df()
 
         return norm_df
 
+    def create_mapped_df(self, filter_properties: Optional[list[str]] = None) -> pd.DataFrame:
+        """Extract only the mapped JSON properties (plus `filter_properties`) into a dataframe.
+        Cheaper than #create_normalized_df as unmapped attributes are never flattened.
+
+        Args:
+            filter_properties (Optional[list[str]]): additional JSON properties needed to filter rows, e.g. `event.type`
+
+        Returns:
+            DataFrame
+        """
+        paths = tuple(self.mapping_properties + (filter_properties or []))
+        mapped_df = self.context.get_mapped_df(paths, self.__get_event_types())
+        if mapped_df.empty:
+            return self.__get_empty_df()
+
+        return mapped_df
+
     # PRIVATE
 
     def __transform(self, dataframe: pd.DataFrame) -> pd.DataFrame:
@@ -93,22 +209,32 @@ class Transform:
         renamed = filtered_df.rename(columns=self.mappings)
         return filtered_df.rename(columns=self.mappings)
 
-    def __load_json_string(self, json_data: str) -> list:
-        """Load String to DF
+    def __get_event_types(self) -> Optional[tuple[str, ...]]:
+        """Get `event_types` as a hashable tuple
+
+        Returns:
+            Optional[tuple[str, ...]]: event types, None for all events
+        """
+        if self.event_types is None:
+            return None
+
+        return tuple(self.event_types)
+
+    def __get_context(self, json_data: Union[str, list, EventContext]) -> EventContext:
+        """Get the shared EventContext, parsing the JSON string if one is given
 
         Args:
-            json_data (string): json string
+            json_data (Union[str, list, EventContext]): json string, parsed events or context
 
         Returns:
-            List: loaded List
+            EventContext: context of the parsed events
         """
-        try:
-            json_variable = json.loads(json_data)
-        except json.decoder.JSONDecodeError as err:
-            logger.error(err)
-            json_variable = [{}]
+        if isinstance(json_data, EventContext):
+            return json_data
+        if isinstance(json_data, str):
+            return EventContext.from_json_string(json_data)
 
-        return json_variable
+        return EventContext(json_data)
 
     def __get_empty_df(self) -> pd.DataFrame:
         """Return empty DF
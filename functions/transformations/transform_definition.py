@@ -0,0 +1,178 @@
+import json
+import logging
+import os
+from functools import lru_cache
+from typing import Optional
+
+from utils.settings import TRANSFORM_DEFINITIONS_PATH
+
+from .event_context import EventTypes
+
+""" Declarative transform definitions, loaded once per worker from a JSON file
+    ### A definition in transformations/definitions.json
+    {
+        "name": "slow_start",
+        "table_setting": "SLOW_START_TABLE",
+        "event_types": ["playback_start"],
+        "mappings": {"event.attributes.startup_duration_content_ms": "measurement_startup_duration_content_ms",
+                     "device.browser_name": "dimension_browser_name"},
+        "column_types": {"measurement_startup_duration_content_ms": "decimal"},
+        "derived_columns": {"measurement_startup_duration_content_s": "measurement_startup_duration_content_ms / 1000"},
+        "dictionary_columns": ["dimension_browser_name"],
+        "rollup_table_setting": "SLOW_START_ROLLUP_TABLE",
+        "rollup_measure": "measurement_startup_duration_content_ms",
+        "rollup_dimensions": ["dimension_browser_name"]
+    }
+
+    The destination table is read from the env variable named by `table_setting`, or given
+    directly as `table`. Definitions without a configured table are skipped. The optional
+    rollup table is configured the same way with `rollup_table_setting` or `rollup_table`.
+"""
+
+logger = logging.getLogger("TransformDefinition")
+
+DEFAULT_DEFINITIONS_PATH = os.path.join(os.path.dirname(__file__), "definitions.json")
+
+
+class TransformDefinition:
+    def __init__(
+        self,
+        name: str,
+        table: str,
+        mappings: dict[str, str],
+        event_types: Optional[list[str]] = None,
+        column_types: Optional[dict[str, str]] = None,
+        derived_columns: Optional[dict[str, str]] = None,
+        dictionary_columns: Optional[list[str]] = None,
+        rollup_table: Optional[str] = None,
+        rollup_measure: Optional[str] = None,
+        rollup_dimensions: Optional[list[str]] = None,
+    ):
+        """Constructor
+
+        Args:
+            name (str): name of the definition
+            table (str): destination table
+            mappings (dict[str, str]): dotted JSON paths to their column names
+            event_types (Optional[list[str]]): `event.type` values routed to the table, None for every event
+            column_types (Optional[dict[str, str]]): Kusto column types, {column_name: kusto_type}
+            derived_columns (Optional[dict[str, str]]): columns computed with `DataFrame.eval`,
+                {column_name: expression over the mapped column names}
+            dictionary_columns (Optional[list[str]]): low cardinality columns held as categoricals
+            rollup_table (Optional[str]): table of the per time bucket aggregates of `rollup_measure`, None for no rollup
+            rollup_measure (Optional[str]): numeric column aggregated into `rollup_table`
+            rollup_dimensions (Optional[list[str]]): columns the rollup is grouped by
+        """
+        self.name = name
+        self.table = table
+        self.mappings = mappings
+        self.event_types = event_types
+        self.column_types = column_types or {}
+        self.derived_columns = derived_columns or {}
+        self.dictionary_columns = dictionary_columns or []
+        self.rollup_table = rollup_table
+        self.rollup_measure = rollup_measure
+        self.rollup_dimensions = rollup_dimensions or []
+
+    def get_event_types(self) -> EventTypes:
+        """Get `event_types` as a hashable tuple
+
+        Returns:
+            EventTypes: event types, None for all events
+        """
+        return None if self.event_types is None else tuple(self.event_types)
+
+    @classmethod
+    def from_dict(cls, definition: dict) -> Optional["TransformDefinition"]:
+        """Validate a definition of the JSON file
+
+        Args:
+            definition (dict): definition
+
+        Raises:
+            ValueError: the definition is invalid
+
+        Returns:
+            Optional[TransformDefinition]: definition, None if its table is not configured
+        """
+        name = definition.get("name")
+        if not name:
+            raise ValueError(f"Transform definition without name: {definition}")
+
+        mappings = definition.get("mappings")
+        if not isinstance(mappings, dict) or not mappings:
+            raise ValueError(f"Transform definition {name} needs a `mappings` object")
+
+        aliases = list(mappings.values()) + list(definition.get("derived_columns", {}).keys())
+        duplicates = sorted({alias for alias in aliases if aliases.count(alias) > 1})
+        if duplicates:
+            raise ValueError(f"Transform definition {name} has duplicate columns: {', '.join(duplicates)}")
+
+        event_types = definition.get("event_types")
+        if event_types is not None and not isinstance(event_types, list):
+            raise ValueError(f"Transform definition {name} needs `event_types` as a list")
+
+        table = definition.get("table") or os.getenv(definition.get("table_setting", ""))
+        if not table:
+            logger.info(f"Skipping transform definition {name}, its table is not configured")
+            return None
+
+        rollup_table = definition.get("rollup_table") or os.getenv(definition.get("rollup_table_setting", ""))
+        if rollup_table and definition.get("rollup_measure") not in aliases:
+            raise ValueError(f"Transform definition {name} needs a mapped or derived `rollup_measure`")
+
+        return cls(
+            name=name,
+            table=table,
+            mappings=mappings,
+            event_types=event_types,
+            column_types=definition.get("column_types"),
+            derived_columns=definition.get("derived_columns"),
+            dictionary_columns=definition.get("dictionary_columns"),
+            rollup_table=rollup_table or None,
+            rollup_measure=definition.get("rollup_measure"),
+            rollup_dimensions=definition.get("rollup_dimensions"),
+        )
+
+
+def load_transform_definitions(path: str) -> list[TransformDefinition]:
+    """Load and validate the definitions of a JSON file
+
+    Args:
+        path (str): JSON file with a `transforms` list
+
+    Returns:
+        list[TransformDefinition]: definitions with a configured table
+    """
+    with open(path, encoding="utf-8") as file:
+        definitions = json.load(file).get("transforms", [])
+
+    loaded = [TransformDefinition.from_dict(definition) for definition in definitions]
+    return [definition for definition in loaded if definition is not None]
+
+
+@lru_cache(maxsize=None)
+def get_transform_definitions() -> tuple[TransformDefinition, ...]:
+    """Get the definitions of `TRANSFORM_DEFINITIONS_PATH`, loaded on first use and kept for the worker's lifetime
+
+    Returns:
+        tuple[TransformDefinition, ...]: definitions
+    """
+    return tuple(load_transform_definitions(TRANSFORM_DEFINITIONS_PATH or DEFAULT_DEFINITIONS_PATH))
+
+
+def get_shared_paths(definitions: tuple[TransformDefinition, ...]) -> dict[EventTypes, tuple[str, ...]]:
+    """Get the JSON paths needed by the definitions of each set of event types.
+    The routed events of a set are extracted once for all of its definitions.
+
+    Args:
+        definitions (tuple[TransformDefinition, ...]): definitions
+
+    Returns:
+        dict[EventTypes, tuple[str, ...]]: mapped paths of the definitions, by their event types
+    """
+    paths: dict[EventTypes, list[str]] = {}
+    for definition in definitions:
+        paths.setdefault(definition.get_event_types(), []).extend(definition.mappings.keys())
+
+    return {event_types: tuple(dict.fromkeys(group_paths)) for event_types, group_paths in paths.items()}
@@ -0,0 +1,105 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+""" Coerce DataFrame columns to the pandas dtype of their Kusto column type
+    ### Column types follow the `.create table` statements in IaC/bicep/kustotablesetup.kql
+    coerce_dataframe(df, {"measurement_startup_duration_content_ms": "decimal", "timestamp": "datetime"})
+"""
+
+FLOAT_TYPES = ["decimal", "real", "double"]
+INTEGER_TYPES = ["int", "long"]
+STRING_TYPES = ["string", "guid"]
+
+
+def coerce_column(series: pd.Series, kusto_type: str) -> pd.Series:
+    """Convert a column to the pandas dtype matching a Kusto column type
+
+    Args:
+        series (pd.Series): column
+        kusto_type (str): Kusto column type, e.g. `string`, `decimal`, `datetime`
+
+    Returns:
+        pd.Series: converted column, unknown types are returned unchanged
+    """
+    if kusto_type in FLOAT_TYPES:
+        return pd.to_numeric(series, errors="coerce").astype("float64")
+    if kusto_type in INTEGER_TYPES:
+        return pd.to_numeric(series, errors="coerce").round().astype("Int64")
+    if kusto_type in STRING_TYPES:
+        return to_string_column(series)
+    if kusto_type == "bool":
+        return series.astype("boolean")
+    if kusto_type == "datetime":
+        return to_datetime_column(series)
+    if kusto_type == "dynamic":
+        return series.map(lambda value: value if value is None or isinstance(value, str) else json.dumps(value))
+
+    return series
+
+
+def coerce_dataframe(data_frame: pd.DataFrame, column_types: dict[str, str]) -> pd.DataFrame:
+    """Convert the typed columns of a DataFrame
+
+    Args:
+        data_frame (pd.DataFrame): DataFrame
+        column_types (dict[str, str]): {column_name: kusto_type}
+
+    Returns:
+        pd.DataFrame: new DataFrame with converted columns
+    """
+    converted = {
+        column: coerce_column(data_frame[column], kusto_type)
+        for column, kusto_type in column_types.items()
+        if column in data_frame
+    }
+    if not converted:
+        return data_frame
+
+    return data_frame.assign(**converted)
+
+
+def to_string_column(series: pd.Series) -> pd.Series:
+    """Convert a column to the pandas string dtype
+
+    Args:
+        series (pd.Series): column
+
+    Returns:
+        pd.Series: string or unchanged categorical column, integers that pandas widened to float because of
+            missing values keep their integer text, e.g. `8333` instead of `8333.0`
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # dictionary encoded, see utils/dictionary_encoding.py
+        return series
+    if pd.api.types.is_float_dtype(series):
+        values = series.dropna()
+        if np.isfinite(values).all() and (values == values.round()).all():
+            return series.astype("Int64").astype("string")
+
+    return series.astype("string")
+
+
+def to_datetime_column(series: pd.Series) -> pd.Series:
+    """Convert epoch milliseconds and ISO 8601 strings to UTC datetimes
+
+    Args:
+        series (pd.Series): column of epoch milliseconds and/or datetime strings
+
+    Returns:
+        pd.Series: datetime64[ns, UTC] column
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.dt.tz_localize("UTC") if series.dt.tz is None else series.dt.tz_convert("UTC")
+
+    epoch_ms = pd.to_numeric(series, errors="coerce")
+    # missing values are NaN in `epoch_ms` and become NaT
+    with np.errstate(invalid="ignore"):
+        result = pd.to_datetime(epoch_ms, unit="ms", utc=True)
+
+    is_text = epoch_ms.isna() & series.notna()
+    if is_text.any():
+        result[is_text] = pd.to_datetime(series[is_text], utc=True, errors="coerce")
+
+    return result
@@ -0,0 +1,190 @@
+import zlib
+from typing import IO, Optional
+
+""" Transparent decompression of gzip and zstd compressed blobs
+    ### Read the decompressed bytes of a blob, compressed or not
+    stream = DecompressedStream(blob_input)
+    chunk = stream.read(2 ** 20)
+
+    ### Decompress a blob already held in memory
+    data = decompress(blob_bytes)
+"""
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+# file name extensions of compressed event files
+COMPRESSED_EXTENSIONS = (".gz", ".zst")
+# gzip header and trailer, not zlib or raw deflate
+GZIP_WBITS = zlib.MAX_WBITS | 16
+
+
+def detect_compression(header: bytes) -> Optional[str]:
+    """Detect the compression of a blob from its first bytes
+
+    Args:
+        header (bytes): first 4 bytes of the blob
+
+    Returns:
+        Optional[str]: `gzip`, `zstd` or None if not compressed
+    """
+    if header.startswith(GZIP_MAGIC):
+        return "gzip"
+    if header.startswith(ZSTD_MAGIC):
+        return "zstd"
+    return None
+
+
+def decompress(data: bytes) -> bytes:
+    """Decompress a gzip or zstd compressed blob, uncompressed data is returned as is
+
+    Args:
+        data (bytes): blob content
+
+    Returns:
+        bytes: decompressed content
+    """
+    if detect_compression(data[: len(ZSTD_MAGIC)]) is None:
+        return data
+    return DecompressedStream(_BytesReader(data)).read()
+
+
+class DecompressedStream:
+    """Readable binary stream of the decompressed content of a blob.
+
+    The compression is detected from the magic bytes of the stream, so plain JSON passes
+    through unchanged. The compressed stream is read `chunk_size` bytes at a time and
+    `read(size)` decompresses at most `size` bytes, so neither the compressed nor the
+    decompressed blob is held in memory. Concatenated gzip members and zstd frames are
+    read as one stream. zstd needs the optional `zstandard` package.
+    """
+
+    def __init__(self, stream: IO[bytes], chunk_size: int = 2 ** 20) -> None:
+        """Constructor
+
+        Args:
+            stream (IO[bytes]): readable binary stream, e.g. func.InputStream
+            chunk_size (int): compressed bytes read from the stream at a time
+
+        Raises:
+            ImportError: the blob is zstd compressed and `zstandard` is not installed
+        """
+        header = stream.read(len(ZSTD_MAGIC)) or b""
+        self.source = _CountingReader(stream, header)
+        self.compression = detect_compression(header)
+        if self.compression == "gzip":
+            self.__reader = _GzipReader(self.source, chunk_size)
+        elif self.compression == "zstd":
+            self.__reader = _get_zstd_reader(self.source, chunk_size)
+        else:
+            self.__reader = self.source
+
+    @property
+    def bytes_read(self) -> int:
+        """Bytes read from the underlying stream, the compressed size of the blob once fully read"""
+        return self.source.bytes_read
+
+    def read(self, size: int = -1) -> bytes:
+        """Read decompressed bytes
+
+        Args:
+            size (int): maximum bytes to return, -1 to read to the end of the stream
+
+        Returns:
+            bytes: decompressed bytes, empty at the end of the stream
+        """
+        return self.__reader.read(size)
+
+
+# PRIVATE
+
+
+class _BytesReader:
+    """Minimal binary stream over bytes held in memory"""
+
+    def __init__(self, data: bytes) -> None:
+        self.data = memoryview(data)
+        self.position = 0
+
+    def read(self, size: int = -1) -> bytes:
+        end = len(self.data) if size is None or size < 0 else self.position + size
+        chunk = bytes(self.data[self.position:end])
+        self.position += len(chunk)
+        return chunk
+
+
+class _CountingReader:
+    """Binary stream that first returns the already read header and counts the bytes read from the source"""
+
+    def __init__(self, stream: IO[bytes], header: bytes) -> None:
+        self.stream = stream
+        self.header = header
+        self.bytes_read = len(header)
+
+    def read(self, size: int = -1) -> bytes:
+        head = b""
+        if self.header:
+            if size is not None and 0 <= size < len(self.header):
+                head, self.header = self.header[:size], self.header[size:]
+                return head
+            head, self.header = self.header, b""
+            if size is not None and size >= 0:
+                size -= len(head)
+            if size == 0:
+                return head
+
+        data = self.stream.read(size) or b""
+        self.bytes_read += len(data)
+        return head + data
+
+
+class _GzipReader:
+    """Incremental gzip decompression with bounded output per read"""
+
+    def __init__(self, source: _CountingReader, chunk_size: int) -> None:
+        self.source = source
+        self.chunk_size = max(1, chunk_size)
+        self.__decompressor = zlib.decompressobj(GZIP_WBITS)
+
+    def read(self, size: int = -1) -> bytes:
+        chunks = []
+        length = 0
+        while size is None or size < 0 or length < size:
+            decompressor = self.__decompressor
+            if decompressor.eof:
+                # the next member of a concatenated gzip stream
+                data = decompressor.unused_data or self.source.read(self.chunk_size)
+                if not data:
+                    break
+                self.__decompressor = decompressor = zlib.decompressobj(GZIP_WBITS)
+            else:
+                data = decompressor.unconsumed_tail or self.source.read(self.chunk_size)
+                if not data:
+                    raise EOFError("Compressed blob ended before the end of the gzip stream")
+
+            # max_length 0 is unbounded, the rest of the input is kept in unconsumed_tail
+            chunk = decompressor.decompress(data, size - length if size is not None and size >= 0 else 0)
+            chunks.append(chunk)
+            length += len(chunk)
+
+        return b"".join(chunks)
+
+
+def _get_zstd_reader(source: _CountingReader, chunk_size: int):
+    """Get a streaming zstd decompressor, importing the optional zstandard package
+
+    Args:
+        source (_CountingReader): compressed stream
+        chunk_size (int): compressed bytes read at a time
+
+    Raises:
+        ImportError: zstandard is not installed
+
+    Returns:
+        zstandard.ZstdDecompressionReader: readable decompressed stream
+    """
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError("Blob is zstd compressed, install the zstandard package to read it") from e
+
+    return zstandard.ZstdDecompressor().stream_reader(source, read_size=max(1, chunk_size), read_across_frames=True)
@@ -0,0 +1,140 @@
+import logging
+import threading
+from typing import Dict, List, Set
+
+import pandas as pd
+from utils.settings import DICTIONARY_MAX_CATEGORIES
+
+""" Dictionary encoding of low cardinality columns as pandas categoricals
+    ### Categories are interned per column for the lifetime of the worker
+    df = encode_dictionary_columns(df, ["dimension_browser_name", "dimension_os_name"])
+    combined_df = concat_frames([first_batch_df, second_batch_df])
+"""
+
+logger = logging.getLogger("CategoryRegistry")
+
+
+class CategoryRegistry:
+    """Process wide, append only categories of dictionary encoded columns.
+
+    Every blob of a worker encodes a column with the same (growing) categories, so the
+    codes of a value never change and frames of different blobs or batches can be
+    combined without decoding them. Once a column reaches `max_categories`, batches with
+    new values of it are left unencoded for the lifetime of the worker, which is logged once.
+    """
+
+    def __init__(self, max_categories: int = 10000) -> None:
+        """Constructor
+
+        Args:
+            max_categories (int): columns with more distinct values are left unencoded
+        """
+        self.max_categories = max_categories
+        self.__codes: Dict[str, Dict[str, int]] = {}
+        self.__dtypes: Dict[str, pd.CategoricalDtype] = {}
+        self.__abandoned: Set[str] = set()
+        self.__lock = threading.Lock()
+
+    def encode(self, column: str, series: pd.Series) -> pd.Series:
+        """Dictionary encode a column with its interned categories
+
+        Args:
+            column (str): column name, categories are shared by all columns of this name
+            series (pd.Series): string column
+
+        Returns:
+            pd.Series: categorical column, or `series` if the column has too many distinct values
+        """
+        values = series.dropna().unique()
+        with self.__lock:
+            codes = self.__codes.setdefault(column, {})
+            new_values = [value for value in values if value not in codes]
+            if len(codes) + len(new_values) > self.max_categories:
+                if column not in self.__abandoned:
+                    self.__abandoned.add(column)
+                    logger.warning(
+                        f"Column {column} exceeds {self.max_categories} categories, its new values are no longer "
+                        "dictionary encoded. Remove it from the dictionary columns or raise DICTIONARY_MAX_CATEGORIES"
+                    )
+                return series
+
+            if new_values or column not in self.__dtypes:
+                for value in new_values:
+                    codes[value] = len(codes)
+                self.__dtypes[column] = pd.CategoricalDtype(list(codes))
+            dtype = self.__dtypes[column]
+
+        return series.astype(dtype)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get the number of categories per column
+
+        Returns:
+            Dict[str, int]: {column: categories}
+        """
+        with self.__lock:
+            return {column: len(codes) for column, codes in self.__codes.items()}
+
+    def clear(self) -> None:
+        """Drop all categories"""
+        with self.__lock:
+            self.__codes.clear()
+            self.__dtypes.clear()
+            self.__abandoned.clear()
+
+
+category_registry = CategoryRegistry(DICTIONARY_MAX_CATEGORIES)
+
+
+def encode_dictionary_columns(data_frame: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+    """Dictionary encode the given columns of a DataFrame
+
+    Args:
+        data_frame (pd.DataFrame): DataFrame
+        columns (List[str]): low cardinality columns, e.g. dimensions
+
+    Returns:
+        pd.DataFrame: new DataFrame with categorical columns
+    """
+    encoded = {
+        column: category_registry.encode(column, data_frame[column])
+        for column in columns
+        if column in data_frame
+    }
+    if not encoded:
+        return data_frame
+
+    return data_frame.assign(**encoded)
+
+
+def concat_frames(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate DataFrames keeping categorical columns categorical.
+    `pd.concat` decodes a categorical column to object if its categories differ between frames,
+    e.g. when a later batch added categories to the registry.
+
+    Args:
+        frames (List[pd.DataFrame]): DataFrames
+
+    Returns:
+        pd.DataFrame: concatenated DataFrame
+    """
+    if len(frames) < 2:
+        return pd.concat(frames, ignore_index=True)
+
+    aligned = {}
+    for column, dtype in frames[0].dtypes.items():
+        if not isinstance(dtype, pd.CategoricalDtype):
+            continue
+        dtypes = [frame[column].dtype if column in frame else None for frame in frames]
+        if not all(isinstance(frame_dtype, pd.CategoricalDtype) for frame_dtype in dtypes):
+            continue
+        # the categories of a registry are append only, so the union keeps the codes of the frames encoded
+        # by this process. Frames of other processes are recoded, encode_dictionary_columns restores the codes
+        # of this process' registry
+        categories = pd.Index([]).append([frame_dtype.categories for frame_dtype in dtypes]).unique()
+        aligned[column] = pd.CategoricalDtype(categories)
+
+    if aligned:
+        frames = [frame.astype(aligned) for frame in frames]
+
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,211 @@
+import json
+import math
+from typing import Dict, Iterable, Optional, Union
+
+import numpy as np
+
+""" Mergeable quantile sketch with relative accuracy guarantees (DDSketch)
+    ### Sketch the values of a blob, persist it and merge the sketches of many blobs later
+    sketch = QuantileSketch.from_values(df["measurement_startup_duration_content_ms"])
+    serialized = sketch.to_json()
+    p99 = merge_sketches([serialized, other_serialized]).quantile(0.99)
+"""
+
+
+class QuantileSketch:
+    """Values are counted in logarithmic bins, `bin(x) = ceil(log(x) / log(gamma))` with
+    `gamma = (1 + relative_accuracy) / (1 - relative_accuracy)`, so every quantile is returned
+    within `relative_accuracy` of the exact value. The bins only depend on the accuracy, which
+    makes sketches of the same accuracy mergeable by adding their bin counts. Their number grows
+    with the logarithm of the value range, not with the number of values.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01) -> None:
+        """Constructor
+
+        Args:
+            relative_accuracy (float): maximum relative error of the quantiles, between 0 and 1
+        """
+        if not 0 < relative_accuracy < 1:
+            raise ValueError(f"relative_accuracy must be between 0 and 1, got {relative_accuracy}")
+
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.__log_gamma = math.log(self.gamma)
+        self.positive: Dict[int, int] = {}
+        self.negative: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    @classmethod
+    def from_values(cls, values: Iterable[float], relative_accuracy: float = 0.01) -> "QuantileSketch":
+        """Create a sketch of values
+
+        Args:
+            values (Iterable[float]): values, missing values are ignored
+            relative_accuracy (float): maximum relative error of the quantiles
+
+        Returns:
+            QuantileSketch: sketch
+        """
+        sketch = cls(relative_accuracy)
+        sketch.add_many(values)
+        return sketch
+
+    def add_many(self, values: Iterable[float]) -> None:
+        """Add values to the sketch
+
+        Args:
+            values (Iterable[float]): values, missing values are ignored
+        """
+        array = np.asarray(values, dtype="float64")
+        array = array[np.isfinite(array)]
+        if not array.size:
+            return
+
+        self.__add_bins(self.positive, array[array > 0])
+        self.__add_bins(self.negative, -array[array < 0])
+        self.zero_count += int((array == 0).sum())
+        self.count += int(array.size)
+        self.min = float(array.min()) if self.min is None else min(self.min, float(array.min()))
+        self.max = float(array.max()) if self.max is None else max(self.max, float(array.max()))
+
+    def merge(self, other: "QuantileSketch") -> None:
+        """Add the values of another sketch of the same accuracy
+
+        Args:
+            other (QuantileSketch): sketch
+
+        Raises:
+            ValueError: the sketches have different accuracies
+        """
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError(
+                f"Cannot merge sketches of accuracy {other.relative_accuracy} and {self.relative_accuracy}"
+            )
+        if not other.count:
+            return
+
+        for bins, other_bins in ((self.positive, other.positive), (self.negative, other.negative)):
+            for index, count in other_bins.items():
+                bins[index] = bins.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Get an approximate quantile
+
+        Args:
+            q (float): quantile between 0 and 1
+
+        Returns:
+            Optional[float]: value within `relative_accuracy` of the exact quantile, None for an empty sketch
+        """
+        if not self.count:
+            return None
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+
+        rank = q * (self.count - 1)
+        seen = 0
+        # the most negative values first: the largest negative bins
+        for index in sorted(self.negative, reverse=True):
+            seen += self.negative[index]
+            if seen > rank:
+                return self.__clamp(-self.__get_bin_value(index))
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for index in sorted(self.positive):
+            seen += self.positive[index]
+            if seen > rank:
+                return self.__clamp(self.__get_bin_value(index))
+
+        return self.max
+
+    def to_dict(self) -> dict:
+        """Serialize the sketch to a JSON compatible dict
+
+        Returns:
+            dict: sketch, e.g. stored in a `dynamic` Kusto column
+        """
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "count": self.count,
+            "min": self.min,
+            "max": self.max,
+            "zero_count": self.zero_count,
+            "positive": {str(index): count for index, count in sorted(self.positive.items())},
+            "negative": {str(index): count for index, count in sorted(self.negative.items())},
+        }
+
+    def to_json(self) -> str:
+        """Serialize the sketch to JSON
+
+        Returns:
+            str: JSON object, see #to_dict
+        """
+        return json.dumps(self.to_dict(), separators=(",", ":"))
+
+    @classmethod
+    def from_dict(cls, data: Union[dict, str]) -> "QuantileSketch":
+        """Deserialize a sketch
+
+        Args:
+            data (Union[dict, str]): result of #to_dict or #to_json
+
+        Returns:
+            QuantileSketch: sketch
+        """
+        if isinstance(data, str):
+            data = json.loads(data)
+
+        sketch = cls(data["relative_accuracy"])
+        sketch.positive = {int(index): count for index, count in data.get("positive", {}).items()}
+        sketch.negative = {int(index): count for index, count in data.get("negative", {}).items()}
+        sketch.zero_count = data.get("zero_count", 0)
+        sketch.count = data.get("count", 0)
+        sketch.min = data.get("min")
+        sketch.max = data.get("max")
+        return sketch
+
+    def __add_bins(self, bins: Dict[int, int], values: np.ndarray) -> None:
+        if not values.size:
+            return
+
+        indexes, counts = np.unique(np.ceil(np.log(values) / self.__log_gamma).astype("int64"), return_counts=True)
+        for index, count in zip(indexes.tolist(), counts.tolist()):
+            bins[index] = bins.get(index, 0) + count
+
+    def __get_bin_value(self, index: int) -> float:
+        # the value with the same relative distance to both bin bounds
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def __clamp(self, value: float) -> float:
+        return min(max(value, self.min), self.max)
+
+
+def merge_sketches(sketches: Iterable[Union[QuantileSketch, dict, str]]) -> Optional[QuantileSketch]:
+    """Merge sketches, e.g. the `sketch` column of the rollup rows of a time window
+
+    Args:
+        sketches (Iterable[Union[QuantileSketch, dict, str]]): sketches or their serialized form
+
+    Returns:
+        Optional[QuantileSketch]: merged sketch, None if there are no sketches
+    """
+    merged = None
+    for sketch in sketches:
+        if not isinstance(sketch, QuantileSketch):
+            sketch = QuantileSketch.from_dict(sketch)
+        if merged is None:
+            merged = QuantileSketch(sketch.relative_accuracy)
+        merged.merge(sketch)
+
+    return merged
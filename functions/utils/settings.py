@@ -6,4 +6,86 @@ MANAGED_CLIENT_ID = os.getenv("MANAGED_CLIENT_ID")
 
 
 # DYNAMIC CONFIG
-SLOW_START_TABLE = os.environ.get("SLOW_START_TABLE")
+# destination tables are read by the transform definitions from the env variables named by their
+# `table_setting` and `rollup_table_setting`, e.g. SLOW_START_TABLE and SLOW_START_ROLLUP_TABLE
+
+# pandas frequency of the rollup time buckets
+ROLLUP_BUCKET = os.getenv("ROLLUP_BUCKET", "1min")
+# maximum relative error of the quantiles of the mergeable rollup sketches
+SKETCH_RELATIVE_ACCURACY = float(os.getenv("SKETCH_RELATIVE_ACCURACY", 0.01))
+# JSON file of declarative transforms, defaults to transformations/definitions.json
+TRANSFORM_DEFINITIONS_PATH = os.getenv("TRANSFORM_DEFINITIONS_PATH")
+
+# STREAMING BLOB INPUT
+STREAM_BLOB_INPUT = os.getenv("STREAM_BLOB_INPUT", "false").lower() == "true"
+STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", 1024 * 1024))
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", 5000))
+# ingest each batch while the next one is parsed instead of ingesting the whole blob at the end
+STREAM_INGEST_BATCHES = os.getenv("STREAM_INGEST_BATCHES", "false").lower() == "true"
+# transformed batches waiting for ingestion before parsing blocks
+STREAM_QUEUE_SIZE = int(os.getenv("STREAM_QUEUE_SIZE", 2))
+
+# SHARDED TRANSFORMS
+# worker processes transforming the shards of large blobs in parallel, 0 to transform in the host process
+TRANSFORM_POOL_SIZE = int(os.getenv("TRANSFORM_POOL_SIZE", 0))
+# events per shard, smaller blobs are transformed in the host process
+TRANSFORM_SHARD_SIZE = int(os.getenv("TRANSFORM_SHARD_SIZE", 50000))
+TRANSFORM_POOL_START_METHOD = os.getenv("TRANSFORM_POOL_START_METHOD", "spawn")
+
+# KUSTO INGESTION
+# comma separated tables ingested through queued ingestion, all others use streaming ingestion
+QUEUED_INGESTION_TABLES = [
+    table.strip() for table in os.getenv("QUEUED_INGESTION_TABLES", "").split(",") if table.strip()
+]
+# comma separated tables ingested as Parquet, all others are ingested as gzip compressed CSV
+PARQUET_INGESTION_TABLES = [
+    table.strip() for table in os.getenv("PARQUET_INGESTION_TABLES", "").split(",") if table.strip()
+]
+# low cardinality columns with more distinct values per worker are not dictionary encoded
+DICTIONARY_MAX_CATEGORIES = int(os.getenv("DICTIONARY_MAX_CATEGORIES", 10000))
+INGESTION_GZIP_LEVEL = int(os.getenv("INGESTION_GZIP_LEVEL", 6))
+# maximum number of tables ingested concurrently per invocation
+INGESTION_MAX_CONCURRENCY = int(os.getenv("INGESTION_MAX_CONCURRENCY", 4))
+
+# BATCH INGESTION
+# storage account of the source blobs, bound by the triggers as `source_STORAGE`
+SOURCE_STORAGE = os.getenv("source_STORAGE")
+BATCH_SOURCE_CONTAINER = os.getenv("BATCH_SOURCE_CONTAINER", "source")
+# local directory read instead of the storage account, e.g. for local backfills
+BATCH_SOURCE_PATH = os.getenv("BATCH_SOURCE_PATH")
+# events of consecutive blobs transformed and ingested together
+BATCH_MAX_EVENTS = int(os.getenv("BATCH_MAX_EVENTS", 100000))
+BATCH_READ_CONCURRENCY = int(os.getenv("BATCH_READ_CONCURRENCY", 8))
+# stop taking new blobs after this many seconds, 0 for no limit, so a checkpointed backfill answers
+# before the 230 seconds HTTP response timeout of the Azure load balancer
+BATCH_MAX_SECONDS = float(os.getenv("BATCH_MAX_SECONDS", 200))
+
+# DEDUPLICATION
+# drop blobs whose name and length were already ingested by the worker, and only ingest events into
+# the tables that have not ingested their event_id yet
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "false").lower() == "true"
+DEDUP_CAPACITY = int(os.getenv("DEDUP_CAPACITY", 1000000))
+DEDUP_ERROR_RATE = float(os.getenv("DEDUP_ERROR_RATE", 0.001))
+DEDUP_WINDOW_SECONDS = float(os.getenv("DEDUP_WINDOW_SECONDS", 3600))
+# blob identities are few, they are kept in an exact set for one window so a new blob is never skipped
+DEDUP_BLOB_CAPACITY = int(os.getenv("DEDUP_BLOB_CAPACITY", 10000))
+
+# INGESTION COALESCING
+# ingest the rows of concurrent invocations of a worker together, each invocation waits until its rows are ingested
+COALESCE_INGESTION = os.getenv("COALESCE_INGESTION", "false").lower() == "true"
+COALESCE_MAX_ROWS = int(os.getenv("COALESCE_MAX_ROWS", 50000))
+COALESCE_MAX_BYTES = int(os.getenv("COALESCE_MAX_BYTES", 16 * 1024 * 1024))
+COALESCE_MAX_SECONDS = float(os.getenv("COALESCE_MAX_SECONDS", 2))
+
+# METRICS ADVISOR HOOK
+FEED_NAME_CACHE_MAX_SIZE = int(os.getenv("FEED_NAME_CACHE_MAX_SIZE", 1024))
+FEED_NAME_CACHE_TTL_SECONDS = float(os.getenv("FEED_NAME_CACHE_TTL_SECONDS", 3600))
+# list all data feeds in one call to fill the feed name cache once per TTL
+FEED_NAME_CACHE_WARM_UP = os.getenv("FEED_NAME_CACHE_WARM_UP", "false").lower() == "true"
+
+# INVOCATION METRICS
+# comma separated sinks of the per invocation metrics record: log, file, otel
+METRICS_SINKS = [
+    sink.strip() for sink in os.getenv("METRICS_SINKS", "log").split(",") if sink.strip()
+]
+METRICS_FILE_PATH = os.getenv("METRICS_FILE_PATH", "invocation_metrics.jsonl")